@@ -0,0 +1,250 @@
+import os
+import sys
+import json
+import glob
+import argparse
+
+# 每次从文件读取的字符数，内存占用约为该值加上单条课程数据的大小
+CHUNK_SIZE = 1 << 16
+
+# 可用的处理阶段，按此顺序执行
+STAGES = ["nulls", "ctsm", "project", "dedup"]
+DEFAULT_STAGES = ["nulls", "ctsm", "dedup"]
+
+_decoder = json.JSONDecoder()
+
+
+class RecordReader:
+    """
+    增量读取课程数据文件
+
+    顶层对象的键值逐个解析，aaData 数组中的课程逐条产出，其他键的值直接跳过，
+    缓冲区只保留尚未解析的内容
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return
+        self.buffer = self.buffer[self.pos :] + data
+        self.pos = 0
+
+    def peek(self):
+        """跳过空白后返回下一个字符，文件结束时返回空字符串"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos : self.pos + 1]
+            self._fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"位置 {self.pos} 处应为 {char!r}")
+        self.pos += 1
+
+    def value(self):
+        """解析下一个 JSON 值，缓冲区中的内容不完整时继续读取"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # 数字可能被缓冲区截断，后面还有字符时才能确定已经完整
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def records(self):
+        """逐条产出 aaData 中的课程数据"""
+        self.expect("{")
+        while self.peek() != "}":
+            key = self.value()
+            self.expect(":")
+            if key != "aaData":
+                self.value()
+            else:
+                self.expect("[")
+                while self.peek() != "]":
+                    yield self.value()
+                    if self.peek() == ",":
+                        self.pos += 1
+                self.pos += 1
+            if self.peek() == ",":
+                self.pos += 1
+
+
+def iter_file_records(file_path):
+    """逐条读取单个文件中的课程数据"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        yield from RecordReader(f).records()
+
+
+def remove_nulls(obj):
+    """递归删除字典和列表中的 null 值"""
+    if isinstance(obj, dict):
+        return {
+            key: remove_nulls(value) for key, value in obj.items() if value is not None
+        }
+    if isinstance(obj, list):
+        return [remove_nulls(item) for item in obj if item is not None]
+    return obj
+
+
+def clear_ctsm(obj):
+    """递归将 ctsm（冲突说明）清空为空列表"""
+    if isinstance(obj, dict):
+        return {
+            key: [] if key == "ctsm" else clear_ctsm(value)
+            for key, value in obj.items()
+        }
+    if isinstance(obj, list):
+        return [clear_ctsm(item) for item in obj]
+    return obj
+
+
+def collect_last_positions(files):
+    """
+    第一遍扫描：记录每个 jx0404id 最后一次出现的位置
+
+    只保存 jx0404id 和位置，内存占用与教学班数量成正比，与课程数据大小无关
+    """
+    positions = {}
+    for file_index, file_path in enumerate(files):
+        for position, record in enumerate(iter_file_records(file_path)):
+            if isinstance(record, dict) and record.get("jx0404id"):
+                positions[record["jx0404id"]] = (file_index, position)
+    return positions
+
+
+def run_pipeline(files, output_path, stages=DEFAULT_STAGES, keys=None, keep="last"):
+    """
+    按顺序读取多个课程数据文件，逐条处理后写入一个紧凑的输出文件
+
+    Args:
+        files: 输入文件列表
+        output_path: 输出文件，可以是输入文件之一，处理完成后才替换
+        stages: 执行的处理阶段，见 STAGES
+        keys: project 阶段保留的字段
+        keep: dedup 阶段同一 jx0404id 保留 "first" 第一次还是 "last" 最后一次出现的数据，
+            "last" 与 merge_json.py 一致，需要额外扫描一遍输入
+
+    Returns:
+        dict: 各阶段统计
+    """
+    stages = [stage for stage in STAGES if stage in stages]
+    dedup = "dedup" in stages
+    last_positions = collect_last_positions(files) if dedup and keep == "last" else {}
+    seen = set()
+    stats = {"read": 0, "written": 0, "duplicates": 0, "skipped": 0}
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write('{"aaData":[')
+        for file_index, file_path in enumerate(files):
+            for position, record in enumerate(iter_file_records(file_path)):
+                stats["read"] += 1
+                if not isinstance(record, dict):
+                    stats["skipped"] += 1
+                    continue
+                if dedup:
+                    course_id = record.get("jx0404id")
+                    if not course_id:
+                        stats["skipped"] += 1
+                        continue
+                    if keep == "last":
+                        duplicate = last_positions[course_id] != (file_index, position)
+                    else:
+                        duplicate = course_id in seen
+                        seen.add(course_id)
+                    if duplicate:
+                        stats["duplicates"] += 1
+                        continue
+                if "nulls" in stages:
+                    record = remove_nulls(record)
+                if "ctsm" in stages:
+                    record = clear_ctsm(record)
+                if "project" in stages and keys:
+                    record = {key: record[key] for key in keys if key in record}
+
+                if stats["written"]:
+                    out.write(",")
+                out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+                stats["written"] += 1
+        out.write(
+            f'],"iTotalRecords":{stats["written"]},'
+            f'"iTotalDisplayRecords":{stats["written"]}}}'
+        )
+    os.replace(tmp_path, output_path)
+    return stats
+
+
+def expand_inputs(inputs, output_path):
+    """展开输入路径，目录取其中的 JSON 文件，输出文件不作为输入"""
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.json"))))
+        else:
+            files.append(path)
+    if len(files) > 1:
+        output = os.path.abspath(output_path)
+        files = [path for path in files if os.path.abspath(path) != output]
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="流式处理课程数据：合并、删除 null 值、清空 ctsm、字段筛选、按 jx0404id 去重"
+    )
+    parser.add_argument(
+        "inputs", nargs="*", default=["./"], help="输入文件或目录，默认当前目录"
+    )
+    parser.add_argument("-o", "--output", default="all_courses.json", help="输出文件")
+    parser.add_argument(
+        "--stages",
+        default=",".join(DEFAULT_STAGES),
+        help=f"处理阶段，逗号分隔，可选: {','.join(STAGES)}",
+    )
+    parser.add_argument("--keys", default="", help="project 阶段保留的字段，逗号分隔")
+    parser.add_argument(
+        "--keep",
+        choices=["first", "last"],
+        default="last",
+        help="重复的 jx0404id 保留第一次还是最后一次出现的数据",
+    )
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"未知的处理阶段: {', '.join(sorted(unknown))}")
+    keys = [key for key in args.keys.split(",") if key]
+    if keys and "project" not in stages:
+        stages.append("project")
+
+    files = expand_inputs(args.inputs, args.output)
+    if not files:
+        print("没有找到 JSON 文件")
+        sys.exit(1)
+    stats = run_pipeline(files, args.output, stages, keys, args.keep)
+    print(
+        f"处理完成，读取 {stats['read']} 条，写入 {stats['written']} 条，"
+        f"重复 {stats['duplicates']} 条，跳过 {stats['skipped']} 条"
+    )
+    print(f"结果已保存至: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
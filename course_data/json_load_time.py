@@ -1,3 +1,5 @@
+import os
+import sys
 import json
 import time
 import ujson  # 需要先安装: pip install ujson
@@ -32,6 +34,40 @@ def test_json_read(parser_name="json"):
     print("-" * 40)
 
 
+def test_first_lookup():
+    """从启动到完成第一次课程查找的耗时：解析 JSON 建立索引 vs 打开预先生成的课程目录"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from src.data.course_catalog import build_catalog, ensure_catalog
+    from src.data.local_course_index import LocalCourseIndex, MappedCourseIndex
+
+    with open("all_courses.json", "r", encoding="utf-8") as f:
+        row = json.load(f)["aaData"][-1]
+    course = {"course_id_or_name": row["kch"], "teacher_name": row.get("skls", "")}
+
+    start_time = time.perf_counter()
+    with open("all_courses.json", "r", encoding="utf-8") as f:
+        index = LocalCourseIndex(json.load(f)["aaData"])
+    result = index.find(course)
+    json_duration = (time.perf_counter() - start_time) * 1000
+
+    start_time = time.perf_counter()
+    build_catalog("all_courses.json")
+    build_duration = (time.perf_counter() - start_time) * 1000
+
+    start_time = time.perf_counter()
+    mapped_result = MappedCourseIndex(ensure_catalog("all_courses.json")).find(course)
+    mapped_duration = (time.perf_counter() - start_time) * 1000
+
+    print("启动到第一次查找:")
+    print(f"解析JSON并建立索引: {json_duration}ms")
+    print(f"生成课程目录（只在课程数据变化时执行）: {build_duration}ms")
+    print(f"打开课程目录并通过哈希索引查找: {mapped_duration}ms")
+    print(f"查找结果一致: {result == mapped_result}")
+    print("-" * 40)
+
+
 # 测试所有解析器
 for parser in ["json", "ujson", "rapidjson"]:
     test_json_read(parser)
+
+test_first_lookup()
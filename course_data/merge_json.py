@@ -1,5 +1,23 @@
 import json
 import os
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# 合并结果文件，不作为合并的输入
+OUTPUT_NAME = "all_courses.json"
+# 记录每个输入文件哈希和所含教学班的清单，用于增量合并
+MANIFEST_NAME = ".merge_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(file_path):
+    """计算文件的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
 def load_json_file(file_path):
@@ -13,22 +31,146 @@ def load_json_file(file_path):
         return []
 
 
-def merge_json_files(directory):
-    """合并指定目录下所有JSON文件的aaData内容"""
-    # 用于存储所有课程数据的集合，使用jx0404id作为唯一标识
-    merged_data = {}
+def parse_course_file(file_path):
+    """解析单个输入文件，返回以jx0404id为键的课程数据，同一文件中重复的以最后一条为准"""
+    return {
+        course["jx0404id"]: course
+        for course in load_json_file(file_path)
+        if course.get("jx0404id")
+    }
+
+
+def parse_files(directory, filenames, workers=None):
+    """在进程池中并行解析多个输入文件"""
+    paths = [os.path.join(directory, filename) for filename in filenames]
+    if len(paths) <= 1:
+        return dict(zip(filenames, map(parse_course_file, paths)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(filenames, executor.map(parse_course_file, paths)))
+
+
+def load_manifest(directory):
+    """读取合并清单，不存在或版本不符时返回None"""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def get_owners(files, ids_by_file):
+    """每个jx0404id的数据来源文件，多个文件包含同一教学班时以排在后面的文件为准"""
+    owners = {}
+    for filename in files:
+        for course_id in ids_by_file[filename]:
+            owners[course_id] = filename
+    return owners
+
+
+def merge_json_files(directory, full=False, workers=None):
+    """
+    合并指定目录下所有JSON文件的aaData内容
 
-    # 遍历目录下的所有JSON文件
-    for filename in os.listdir(directory):
-        if filename.endswith(".json"):
-            file_path = os.path.join(directory, filename)
-            aaData = load_json_file(file_path)
+    默认增量合并：根据清单中记录的文件哈希只重新解析有变化的文件，其余教学班沿用
+    已有的 all_courses.json。清单不存在、all_courses.json 被修改过或 full 为True时
+    重新解析全部文件。
 
-            # 使用jx0404id作为唯一标识符合并数据
-            for course in aaData:
-                course_id = course.get("jx0404id")
-                if course_id:
-                    merged_data[course_id] = course
+    Args:
+        directory: JSON文件所在的目录
+        full: 是否重新解析全部文件
+        workers: 解析文件的进程数，默认为CPU核数
+
+    Returns:
+        dict: 新增、更新、删除的教学班数量和重新解析的文件数量
+    """
+    output_path = os.path.join(directory, OUTPUT_NAME)
+    files = sorted(
+        filename
+        for filename in os.listdir(directory)
+        if filename.endswith(".json") and filename not in (OUTPUT_NAME, MANIFEST_NAME)
+    )
+    if not files:
+        print(f"目录 {directory} 下没有需要合并的JSON文件")
+        return {"added": 0, "updated": 0, "removed": 0, "parsed": 0}
+    hashes = {
+        filename: file_sha256(os.path.join(directory, filename)) for filename in files
+    }
+
+    manifest = None if full else load_manifest(directory)
+    if manifest and (
+        not os.path.exists(output_path)
+        or manifest.get("output_sha256") != file_sha256(output_path)
+    ):
+        print(f"{OUTPUT_NAME} 与合并清单不一致，重新解析全部文件")
+        manifest = None
+    known_files = manifest["files"] if manifest else {}
+
+    # 只解析新增或内容有变化的文件
+    changed = [
+        filename
+        for filename in files
+        if known_files.get(filename, {}).get("sha256") != hashes[filename]
+    ]
+    removed_files = [filename for filename in known_files if filename not in hashes]
+    if manifest and not changed and not removed_files:
+        print("输入文件没有变化，无需合并")
+        return {"added": 0, "updated": 0, "removed": 0, "parsed": 0}
+
+    old_courses = {}
+    if os.path.exists(output_path):
+        old_courses = parse_course_file(output_path)
+
+    parsed = parse_files(directory, changed, workers)
+    ids_by_file = {
+        filename: (
+            list(parsed[filename])
+            if filename in parsed
+            else known_files[filename]["ids"]
+        )
+        for filename in files
+    }
+    owners = get_owners(files, ids_by_file)
+
+    # 来源文件发生变化的教学班（如原来的来源文件被删除）需要从新的来源文件读取
+    previous_owners = get_owners(
+        list(known_files),
+        {filename: entry["ids"] for filename, entry in known_files.items()},
+    )
+    stale = sorted(
+        {
+            filename
+            for course_id, filename in owners.items()
+            if filename not in parsed
+            and (
+                previous_owners.get(course_id) != filename
+                or course_id not in old_courses
+            )
+        }
+    )
+    parsed.update(parse_files(directory, stale, workers))
+
+    # 保持已有教学班的顺序，新增的教学班追加在后面
+    merged_data = {}
+    for course_id in list(old_courses) + list(owners):
+        if course_id in owners and course_id not in merged_data:
+            owner = owners[course_id]
+            merged_data[course_id] = (
+                parsed[owner][course_id] if owner in parsed else old_courses[course_id]
+            )
+
+    stats = {
+        "added": sum(1 for course_id in merged_data if course_id not in old_courses),
+        "updated": sum(
+            1
+            for course_id, course in merged_data.items()
+            if course_id in old_courses and course != old_courses[course_id]
+        ),
+        "removed": sum(1 for course_id in old_courses if course_id not in merged_data),
+        "parsed": len(parsed),
+    }
 
     # 将合并后的数据转换为列表
     result = {
@@ -38,15 +180,37 @@ def merge_json_files(directory):
     }
 
     # 保存合并后的数据
-    output_path = os.path.join(directory, "all_courses.json")
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(result, f, ensure_ascii=False, indent=2)
 
-    print(f"合并完成，共处理 {len(merged_data)} 条课程数据")
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "output_sha256": file_sha256(output_path),
+        "files": {
+            filename: {"sha256": hashes[filename], "ids": ids_by_file[filename]}
+            for filename in files
+        },
+    }
+    with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    print(
+        f"合并完成，共 {len(merged_data)} 条课程数据，重新解析 {stats['parsed']} 个文件，"
+        f"新增 {stats['added']} 条，更新 {stats['updated']} 条，删除 {stats['removed']} 条"
+    )
     print(f"结果已保存至: {output_path}")
+    return stats
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="合并各分类的课程数据为 all_courses.json"
+    )
     # 指定JSON文件所在的目录
-    directory = "./"
-    merge_json_files(directory)
+    parser.add_argument("directory", nargs="?", default="./", help="JSON文件所在的目录")
+    parser.add_argument(
+        "--full", action="store_true", help="忽略合并清单，重新解析全部文件"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="解析文件的进程数")
+    args = parser.parse_args()
+    merge_json_files(args.directory, args.full, args.workers)
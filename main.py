@@ -4,30 +4,71 @@ import os
 import json
 import time
 import logging
+import argparse
 import datetime
 import colorlog
-from typing import Tuple, List, Dict
-from dataclasses import dataclass
+from typing import Tuple, List, Dict, Optional
+from dataclasses import dataclass, asdict
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from src.utils.captcha_ocr import get_ocr_res
+from requests.cookies import RequestsCookieJar
+from src.utils.captcha_ocr import get_ocr_service, start_ocr_service
 from src.core.course_selector import get_jx0502zbid
-from src.core.search_and_select_course import search_and_select_course
-from src.utils.session_manager import init_session, get_session
+from src.core.login import (
+    BASE_URL,
+    URLS,
+    LOGIN_HEADERS,
+    generate_encoded_string,
+    build_login_data,
+    check_login_response,
+    LoginAttempts,
+)
+from src.core.concurrent_selector import MODE_INTERVALS, run_concurrent_selection
+from src.core.course_state import DEFAULT_STATE_PATH, CourseTracker
+from src.data.get_course_jx02id_and_jx0404id import (
+    get_course_jx02id_and_jx0404id,
+    resolve_courses_by_api_batch,
+)
+from src.utils.category_cache import get_oper_category, get_search_category
+from src.data.local_course_index import (
+    DEFAULT_COURSE_DATA_PATH,
+    set_course_data_path,
+    resolve_courses_locally,
+)
+from src.utils.session_manager import (
+    get_session,
+    create_session,
+    use_session,
+    set_max_inflight_requests,
+    merge_inflight_limits,
+    configure_connection_pool,
+    prewarm_connections,
+    get_connection_stats,
+    invalidate_entered_pages,
+)
+from src.core.search_and_select_course import SELECTION_METHODS
+from src.core.snipe import run_snipe_selection
+from src.utils.scheduler import wait_until, record_trigger_skew
+from src.utils.clock_sync import DEFAULT_SAMPLES, calibrate_clock
+from src.utils.metrics import log_metrics
+from src.utils.notifier import start_notifier, stop_notifier, get_notifier_stats
+from src.utils.rate_controller import (
+    DEFAULT_RATE_FLOOR,
+    DEFAULT_RATE_CEILING,
+    configure_rate_controller,
+    get_rate_controller,
+)
 
 # 常量配置
-BASE_URL = "http://zhjw.qfnu.edu.cn"
-URLS = {
-    "rand_code": f"{BASE_URL}/verifycode.servlet",
-    "login": f"{BASE_URL}/Logon.do?method=logonLdap",
-    "init_data": f"{BASE_URL}/Logon.do?method=logon&flag=sess",
-    "main_page": f"{BASE_URL}/jsxsd/framework/xsMain.jsp",
-    "course_selection": f"{BASE_URL}/jsxsd/xsxk/xklc_list",
-}
-
 RETRY_ATTEMPTS = 3
 RETRY_DELAY = 1
 REQUEST_TIMEOUT = 10
+# 单次选课尝试（搜索+选课）的默认时间预算（秒）
+DEFAULT_ATTEMPT_TIMEOUT = 15
+
+# 选课开始前多少秒预先建立保持连接，过早建立的连接可能被服务器因空闲关闭
+PREWARM_LEAD_SECONDS = 3
 
 
 @dataclass
@@ -48,6 +89,22 @@ class UserConfig:
     select_semester: str
     mode: str = "fast"
     courses: List[CourseConfig] = None
+    max_workers: int = 0
+    race_mode: bool = False
+    course_data_path: str = DEFAULT_COURSE_DATA_PATH
+    course_state_path: str = DEFAULT_STATE_PATH
+    trigger_offset_ms: float = 0
+    clock_sync: bool = True
+    clock_sync_samples: int = DEFAULT_SAMPLES
+    max_inflight_requests: int = 0
+    pool_maxsize: int = 0
+    prewarm_connections: int = 0
+    http_backend: str = "sync"
+    attempt_timeout: float = DEFAULT_ATTEMPT_TIMEOUT
+    rate_floor: float = DEFAULT_RATE_FLOOR
+    rate_ceiling: float = DEFAULT_RATE_CEILING
+    captcha_min_confidence: float = 0
+    captcha_prefetch: bool = False
 
 
 def setup_logger() -> logging.Logger:
@@ -113,8 +170,13 @@ def retry(exceptions=Exception, attempts=3, delay=1):
     return decorator
 
 
-def load_config() -> UserConfig:
-    """加载并验证配置文件"""
+def load_configs() -> List[UserConfig]:
+    """
+    加载并验证配置文件
+
+    配置了 accounts 时，每个账号生成一份配置，账号中未填写的字段沿用顶层配置；
+    否则使用顶层的 user_account 和 user_password 生成单账号配置
+    """
     config_path = "config.json"
     if not os.path.exists(config_path):
         create_default_config(config_path)
@@ -124,19 +186,53 @@ def load_config() -> UserConfig:
     with open(config_path, "r", encoding="utf-8") as f:
         raw_config = json.load(f)
 
-    validate_required_fields(raw_config)
+    accounts = raw_config.get("accounts")
+    if not accounts:
+        validate_required_fields(raw_config)
+        return [build_user_config(raw_config)]
+
+    validate_required_fields(raw_config, ["schedule_time"])
+    configs = []
+    for account in accounts:
+        account_config = {**raw_config, **account}
+        validate_required_fields(account_config)
+        configs.append(build_user_config(account_config))
+    validate_shared_fields(configs)
+    return configs
+
+
+def build_user_config(raw_config: dict) -> UserConfig:
+    """根据单个账号的配置字典生成用户配置"""
     courses = [
         CourseConfig(**course) for course in raw_config.get("courses", [])
     ]
     validate_courses(courses)
 
-    return UserConfig(
+    config = UserConfig(
         user_account=raw_config["user_account"],
         user_password=raw_config["user_password"],
         select_semester=raw_config.get("select_semester", ""),
         mode=raw_config.get("mode", "fast"),
-        courses=courses
+        courses=courses,
+        max_workers=int(raw_config.get("max_workers", 0)),
+        race_mode=bool(raw_config.get("race_mode", False)),
+        course_data_path=raw_config.get("course_data_path", DEFAULT_COURSE_DATA_PATH),
+        course_state_path=raw_config.get("course_state_path", DEFAULT_STATE_PATH),
+        trigger_offset_ms=float(raw_config.get("trigger_offset_ms", 0)),
+        clock_sync=bool(raw_config.get("clock_sync", True)),
+        clock_sync_samples=int(raw_config.get("clock_sync_samples", DEFAULT_SAMPLES)),
+        max_inflight_requests=int(raw_config.get("max_inflight_requests", 0)),
+        pool_maxsize=int(raw_config.get("pool_maxsize", 0)),
+        prewarm_connections=int(raw_config.get("prewarm_connections", 0)),
+        http_backend=raw_config.get("http_backend", "sync"),
+        attempt_timeout=float(raw_config.get("attempt_timeout", DEFAULT_ATTEMPT_TIMEOUT)),
+        rate_floor=float(raw_config.get("rate_floor", DEFAULT_RATE_FLOOR)),
+        rate_ceiling=float(raw_config.get("rate_ceiling", DEFAULT_RATE_CEILING)),
+        captcha_min_confidence=float(raw_config.get("captcha_min_confidence", 0)),
+        captcha_prefetch=bool(raw_config.get("captcha_prefetch", False)),
     )
+    validate_connection_fields(config)
+    return config
 
 
 def create_default_config(path: str):
@@ -152,14 +248,28 @@ def create_default_config(path: str):
         json.dump(default_config, f, indent=4)
 
 
-def validate_required_fields(config: dict):
+def validate_required_fields(config: dict, required: List[str] = None):
     """验证必填字段"""
-    required = ["schedule_time","user_account", "user_password"]
+    required = required or ["schedule_time", "user_account", "user_password"]
     missing = [field for field in required if not config.get(field)]
     if missing:
         raise ValueError(f"缺少必填字段: {', '.join(missing)}")
 
 
+def validate_connection_fields(config: UserConfig):
+    """验证连接池相关字段，0 表示按选课并发数自动设置"""
+    for field in ["pool_maxsize", "prewarm_connections"]:
+        if getattr(config, field) < 0:
+            raise ValueError(f"{field} 不能为负数")
+
+
+def validate_shared_fields(configs: List[UserConfig]):
+    """验证所有账号必须相同的字段，所有账号在同一种请求后端中执行"""
+    backends = sorted({config.http_backend for config in configs})
+    if len(backends) > 1:
+        raise ValueError(f"所有账号的 http_backend 必须相同，当前配置了: {', '.join(backends)}")
+
+
 def validate_courses(courses: List[CourseConfig]):
     """验证课程配置"""
     for course in courses:
@@ -170,71 +280,53 @@ def validate_courses(courses: List[CourseConfig]):
 
 
 @retry(Exception, attempts=RETRY_ATTEMPTS, delay=RETRY_DELAY)
-def get_initial_session() -> str:
-    """初始化会话并获取初始数据"""
-    session = init_session()
+def get_initial_session(session=None) -> str:
+    """初始化会话并获取初始数据，未指定会话时使用当前上下文的会话"""
+    session = session or get_session()
     response = session.get(URLS["init_data"], timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
     return response.text
 
 
-@retry(Exception, attempts=3, delay=1)
-def handle_captcha() -> str:
-    """处理验证码识别"""
-    session = get_session()
+def fetch_captcha_image(session=None) -> Image.Image:
+    """获取验证码图片，未指定会话时使用当前上下文的会话"""
+    session = session or get_session()
     response = session.get(URLS["rand_code"], timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
+    return Image.open(BytesIO(response.content))
 
-    try:
-        image = Image.open(BytesIO(response.content))
-        return get_ocr_res(image)
-    except Exception as e:
-        logger.error(f"验证码处理失败: {str(e)}")
-        raise
 
+def handle_captcha(image: Image.Image = None) -> Tuple[str, Optional[float]]:
+    """识别验证码，未传入图片时先获取验证码图片，返回识别结果和置信度"""
+    if image is None:
+        image = fetch_captcha_image()
+    return get_ocr_service().recognize_with_confidence(image)
 
-def generate_encoded_string(data_str: str, account: str, password: str) -> str:
-    """生成加密字符串"""
-    code, sxh = data_str.split("#")[:2]
-    data = f"{account}%%%{password}"
-    encoded = []
-    code_idx = 0
 
-    for i in range(min(20, len(data))):
-        encoded.append(data[i])
-        encoded.extend([code[code_idx + j] for j in range(int(sxh[i]))])
-        code_idx += int(sxh[i])
+def prefetch_login_page() -> Tuple[RequestsCookieJar, str, Image.Image]:
+    """
+    在独立cookie的新会话中获取登录初始数据和验证码
 
-    if len(data) > 20:
-        encoded.append(data[20:])
+    验证码与会话绑定，在新会话中获取不会替换当前会话正在提交的验证码
 
-    return "".join(encoded)
+    Returns:
+        tuple: (新会话的cookie, 登录初始数据, 验证码图片)
+    """
+    with create_session() as session:
+        data_str = get_initial_session(session)
+        image = fetch_captcha_image(session)
+        return session.cookies, data_str, image
 
 
-@retry(Exception, attempts=3, delay=1)
 def login(account: str, password: str, code: str, encoded: str) -> bool:
-    """执行登录操作"""
+    """执行登录操作，验证码错误时抛出 ValueError，密码错误时抛出 PermissionError"""
     session = get_session()
-    headers = {
-        "Referer": BASE_URL,
-        "Origin": BASE_URL,
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.116 Safari/537.36"
-    }
-    data = {
-        "userAccount": account,
-        "userPassword": password,
-        "RANDOMCODE": code,
-        "encoded": encoded
-    }
+    headers = LOGIN_HEADERS
+    data = build_login_data(account, password, code, encoded)
 
     response = session.post(URLS["login"], headers=headers, data=data, timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
-
-    if "验证码错误" in response.text:
-        raise ValueError("验证码错误")
-    if "密码错误" in response.text:
-        raise PermissionError("用户名或密码错误")
-    return True
+    return check_login_response(response.text)
 
 
 def print_welcome():
@@ -245,41 +337,102 @@ def print_welcome():
     logger.info("免责声明: 本脚本仅供学习研究用途，使用者需自行承担风险")
 
 
-def select_courses_strategy(courses: List[CourseConfig], mode: str):
-    """选课策略分发"""
-    strategies = {
-        "fast": lambda: [search_and_select_course(course) for course in courses],
-        "normal": lambda: [search_and_select_course(course) or time.sleep(5) for course in courses],
-        "snipe": lambda: (search_and_select_course(course) for course in courses) or time.sleep(2)
-    }
-
-    strategy = strategies.get(mode, strategies["snipe"])
-    while True:
-        strategy()
-        logger.info(f"{mode}模式执行完成，等待下次循环")
+def select_courses_strategy(
+    courses: List[dict],
+    mode: str,
+    max_workers: int = 0,
+    race_mode: bool = False,
+    attempt_timeout: float = 0,
+    tracker: CourseTracker = None,
+):
+    """
+    选课策略分发，尝试速率由共享的速率控制器自适应调整
+
+    fast、normal 模式下所有课程并发反复发送选课请求，normal 模式下同一课程两次尝试之间至少
+    间隔 MODE_INTERVALS["normal"] 秒；snipe 模式下轮询选课列表的剩余人数，出现空余名额时才
+    发送选课请求。课程选课成功后即退出循环，所有课程都成功或放弃后返回
+    """
+    if mode not in MODE_INTERVALS:
+        logger.warning(f"未知的选课模式 {mode}，使用 snipe 模式")
+        mode = "snipe"
+
+    if mode == "snipe":
+        # 截胡模式：轮询剩余人数，出现空余名额时才发送选课请求
+        results = run_snipe_selection(
+            courses,
+            max_workers=max_workers,
+            race=race_mode,
+            rate_controller=get_rate_controller(),
+            tracker=tracker,
+        )
+    else:
+        results = run_concurrent_selection(
+            courses,
+            max_workers=max_workers,
+            interval=MODE_INTERVALS[mode],
+            race=race_mode,
+            attempt_timeout=attempt_timeout,
+            rate_controller=get_rate_controller(),
+            tracker=tracker,
+        )
+    succeeded = sum(result.success for result in results.values())
+    logger.info(f"{mode}模式执行完成，成功 {succeeded}/{len(results)} 门课程")
+    if get_rate_controller():
+        stats = get_rate_controller().stats()
+        logger.info(
+            f"速率控制统计: 当前速率 {stats['rate']:.2f} 次/秒，正常响应 {stats['successes']} 次，"
+            f"过载信号 {stats['overloads']} 次"
+        )
+    return results
 
 
-def main_flow(config: UserConfig):
-    """主业务流程"""
-    print_welcome()
+def login_flow(config: UserConfig):
+    """
+    登录教务系统并进入选课页面
 
+    是否提交识别结果、失败后是否重试由 LoginAttempts 判定。开启 captcha_prefetch 时在提交登录的
+    同时用独立cookie的新会话获取下一组登录初始数据和验证码，登录失败时换用该会话的cookie重试，
+    省去一次获取验证码的往返
+    """
+    attempts = LoginAttempts(config.captcha_min_confidence)
     # 初始化会话
     data_str = get_initial_session()
-    encoded = generate_encoded_string(data_str, config.user_account, config.user_password)
 
     # 登录流程
-    for _ in range(RETRY_ATTEMPTS):
-        try:
-            captcha = handle_captcha()
-            logger.info(f"验证码识别结果: {captcha}")
-            if login(config.user_account, config.user_password, captcha, encoded):
-                logger.info("登录成功")
-                break
-        except Exception as e:
-            logger.error(f"登录失败: {str(e)}")
-            time.sleep(RETRY_DELAY)
-    else:
-        raise Exception("登录超过最大重试次数")
+    prefetched = None
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="captcha") if config.captcha_prefetch else None
+    try:
+        while attempts.remaining():
+            try:
+                image = None
+                if prefetched:
+                    future, prefetched = prefetched, None
+                    cookies, data_str, image = future.result()
+                    # 验证码和初始数据属于预取的会话，换用其cookie提交登录
+                    get_session().cookies.update(cookies)
+                captcha = attempts.accept(*handle_captcha(image))
+                if captcha is None:
+                    continue
+
+                if executor:
+                    prefetched = executor.submit(prefetch_login_page)
+                encoded = generate_encoded_string(data_str, config.user_account, config.user_password)
+                if login(config.user_account, config.user_password, captcha, encoded):
+                    break
+            except Exception as e:
+                delay = attempts.retry_delay(e)
+                if delay:
+                    time.sleep(delay)
+        else:
+            attempts.fail()
+    finally:
+        # 登录成功或放弃时丢弃尚未使用的预取结果
+        if prefetched:
+            prefetched.cancel()
+        if executor:
+            executor.shutdown(wait=False)
+
+    attempts.succeed()
 
     # 访问必要页面
     session = get_session()
@@ -287,20 +440,288 @@ def main_flow(config: UserConfig):
         response = session.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
 
-    # 获取选课编号并执行选课
+
+def enter_course_selection(config: UserConfig) -> str:
+    """获取选课编号并进入选课页面"""
+    session = get_session()
     jx0502zbid = get_jx0502zbid(session, config.select_semester)
     if not jx0502zbid:
         raise ValueError("获取选课编号失败")
 
     logger.info(f"选课编号: {jx0502zbid}")
-    session.get(f"{BASE_URL}/jsxsd/xsxk/xsxk_index?jx0502zbid={jx0502zbid}")
-    select_courses_strategy(config.courses, config.mode)
+    session.get(f"{BASE_URL}/jsxsd/xsxk/xsxk_index?jx0502zbid={jx0502zbid}", timeout=REQUEST_TIMEOUT)
+    # 进入新的选课轮次后，之前进入过的分类页面需要重新进入
+    invalidate_entered_pages(session)
+    return jx0502zbid
+
+
+def resolve_courses(courses: List[dict], tracker: CourseTracker = None):
+    """
+    预先获取所有课程的jx02id和jx0404id，先查本地课程数据，未找到再通过API搜索
+
+    本地未找到的课程有多门时，先按分类批量拉取课程列表在内存中匹配，仍未找到的再逐门搜索。
+    通过API搜索到的课程会记录所在分类，选课时优先向该分类发送请求
+    """
+    if tracker:
+        tracker.begin_resolving(courses)
+    resolved = resolve_courses_locally(courses)
+    logger.info(f"通过本地课程数据获取了 {resolved}/{len(courses)} 门课程的jx02id和jx0404id")
+
+    pending = sum(1 for course in courses if not (course.get("jx02id") and course.get("jx0404id")))
+    if pending > 1:
+        resolved = resolve_courses_by_api_batch(courses)
+        logger.info(f"通过批量查询课程列表获取了 {resolved}/{pending} 门课程的jx02id和jx0404id")
+
+    for course in courses:
+        if course.get("jx02id") and course.get("jx0404id"):
+            continue
+        result = get_course_jx02id_and_jx0404id(course)
+        if result:
+            course.update(result)
+        else:
+            logger.warning(
+                f"预先获取课程【{course['course_id_or_name']}-{course['teacher_name']}】的jx02id和jx0404id失败，选课时将重新搜索"
+            )
+
+    if tracker:
+        tracker.end_resolving(courses)
+
+    for course in courses:
+        if course.get("jx0404id"):
+            category = get_oper_category(course["jx0404id"]) or get_search_category(course)
+            logger.info(
+                f"课程【{course['course_id_or_name']}-{course['teacher_name']}】jx0404id: {course['jx0404id']}，"
+                f"优先选课分类: {category or '未知'}"
+            )
+
+
+def warmup_phase(config: UserConfig) -> Tuple[List[dict], CourseTracker]:
+    """
+    预热阶段：登录、获取选课编号、获取所有课程的jx02id和jx0404id
+
+    从课程状态文件恢复上次运行的进度，上次已选课成功的课程不再参与，所有课程都已成功时不登录
+    """
+    timings = {}
+    phase_start = time.perf_counter()
+
+    courses = [asdict(course) for course in config.courses]
+    tracker = CourseTracker(config.course_state_path, config.user_account, config.select_semester, courses)
+    courses = tracker.active(courses)
+    if not courses:
+        logger.info("所有课程均已选课成功，无需选课")
+        return courses, tracker
+    set_course_data_path(config.course_data_path)
+
+    step_start = time.perf_counter()
+    login_flow(config)
+    timings["登录"] = time.perf_counter() - step_start
+
+    step_start = time.perf_counter()
+    enter_course_selection(config)
+    timings["获取选课编号"] = time.perf_counter() - step_start
+
+    step_start = time.perf_counter()
+    resolve_courses(courses, tracker)
+    timings["获取课程编号"] = time.perf_counter() - step_start
+
+    timings["预热阶段总计"] = time.perf_counter() - phase_start
+    logger.info("预热阶段耗时: " + "，".join(f"{name} {seconds:.3f}秒" for name, seconds in timings.items()))
+    return courses, tracker
+
+
+def fire_phase(config: UserConfig, courses: List[dict], tracker: CourseTracker = None):
+    """选课阶段：只发送选课请求"""
+    phase_start = time.perf_counter()
+    results = select_courses_strategy(
+        courses,
+        config.mode,
+        config.max_workers,
+        config.race_mode,
+        config.attempt_timeout,
+        tracker,
+    )
+    logger.info(f"选课阶段耗时: {time.perf_counter() - phase_start:.3f}秒")
+    if tracker:
+        logger.info("课程状态统计: " + "，".join(f"{state} {count}" for state, count in tracker.counts().items()))
+
+    stats = get_connection_stats(get_session())
+    logger.info(
+        f"连接复用统计: 请求 {stats['requests']} 次，新建连接 {stats['connections']} 个，"
+        f"复用连接 {stats['reused']} 次"
+    )
+    log_metrics()
+    stats = get_notifier_stats()
+    logger.info(
+        f"通知统计: 已发送 {stats['sent']} 条（其中失败汇总 {stats['digests']} 条），"
+        f"合并失败消息 {stats['coalesced']} 条，丢弃 {stats['dropped']} 条，队列中 {stats['queue_depth']} 条"
+    )
+    return results
+
+
+def get_expected_concurrency(config: UserConfig) -> int:
+    """估计选课阶段同时进行的请求数"""
+    workers = config.max_workers or len(config.courses)
+    return workers * (len(SELECTION_METHODS) if config.race_mode else 1)
+
+
+def prewarm_before_fire(config: UserConfig, fire_at: datetime.datetime = None):
+    """在选课开始前预先建立保持连接，连接数默认与选课阶段的并发请求数相同"""
+    count = config.prewarm_connections or get_expected_concurrency(config)
+    if fire_at:
+        prewarm_at = fire_at - datetime.timedelta(seconds=PREWARM_LEAD_SECONDS)
+        if prewarm_at > datetime.datetime.now():
+            wait_until(prewarm_at)
+    prewarm_connections(get_session(), BASE_URL, count)
+
+
+def wait_for_fire_time(target: datetime.datetime, offset_ms: float = 0):
+    """预热完成后高精度等待到选课时间，offset_ms 为负数时提前触发"""
+    fire_at = target + datetime.timedelta(milliseconds=offset_ms)
+    remaining = (fire_at - datetime.datetime.now()).total_seconds()
+    if remaining <= 0:
+        logger.warning(f"预热阶段结束时已超过选课时间 {-remaining:.3f}秒，立即开始选课")
+        return
+    logger.info(f"预热完成，等待 {remaining:.3f}秒 后于 {fire_at.strftime('%H:%M:%S.%f')[:-3]} 开始选课")
+    skew = wait_until(fire_at)
+    record_trigger_skew(fire_at, skew, offset_ms)
+
+
+def align_to_server_clock(target: datetime.datetime, samples: int) -> datetime.datetime:
+    """
+    将服务器时间下的选课时间换算为本地触发时间
+
+    扣除时钟偏差和单程延迟，使选课请求在服务器时间到达选课时间时送达
+    """
+    clock = calibrate_clock(get_session(), BASE_URL, samples)
+    if clock is None:
+        return target
+    local_target = target - datetime.timedelta(seconds=clock.offset + clock.one_way_latency)
+    logger.info(
+        f"按服务器时钟校准后，本地触发时间为 {local_target.strftime('%H:%M:%S.%f')[:-3]}"
+    )
+    return local_target
+
+
+def main_flow(config: UserConfig, fire_at: datetime.datetime = None):
+    """
+    主业务流程，分为预热阶段和选课阶段
+
+    Args:
+        config: 用户配置
+        fire_at: 选课开始时间，预热完成后等待到该时间再发送选课请求，为None时预热后立即选课
+    """
+    courses, tracker = warmup_phase(config)
+    if not courses:
+        return
+    if fire_at:
+        if config.clock_sync:
+            fire_at = align_to_server_clock(fire_at, config.clock_sync_samples)
+        prewarm_before_fire(config, fire_at)
+        wait_for_fire_time(fire_at, config.trigger_offset_ms)
+    else:
+        prewarm_before_fire(config)
+    fire_phase(config, courses, tracker)
+
+
+def run_account(config: UserConfig, fire_at: datetime.datetime = None):
+    """在独立的会话中执行单个账号的选课流程"""
+    with use_session(create_session()):
+        try:
+            main_flow(config, fire_at)
+        except Exception as e:
+            logger.error(f"账号 {config.user_account} 选课异常终止: {str(e)}")
+
+
+def get_initial_rate(config: UserConfig) -> Optional[float]:
+    """
+    单个账号按选课模式的间隔尝试时的速率，间隔为0时返回None（从速率上限开始）
+
+    fast、normal 模式下每门课程各自尝试，速率为课程数/间隔；snipe 模式下一轮查询覆盖所有课程，
+    速率为 1/间隔
+    """
+    interval = MODE_INTERVALS.get(config.mode, MODE_INTERVALS["snipe"])
+    if not interval:
+        return None
+    if config.mode not in ("fast", "normal"):
+        return 1 / interval
+    return len(config.courses) / interval
+
+
+def setup_rate_controller(configs: List[UserConfig]):
+    """
+    根据选课模式创建所有账号共享的速率控制器
+
+    多账号的选课模式或速率配置不同时取最保守的设置：速率上限、下限和初始速率均取各账号的最小值
+    """
+    ceiling = min(config.rate_ceiling for config in configs)
+    floor = min(min(config.rate_floor for config in configs), ceiling)
+    rates = [rate for rate in map(get_initial_rate, configs) if rate is not None]
+    initial = min(rates) if rates else None
+    return configure_rate_controller(floor, ceiling, initial)
+
+
+def run_accounts(configs: List[UserConfig], fire_at: datetime.datetime = None):
+    """执行所有账号的选课流程，选课期间的通知由后台线程发送，结束前发送剩余的通知"""
+    print_welcome()
+    # 验证码识别模型在后台加载和预热，与登录前的网络请求并行；start.py 已在倒计时前启动时不会重复加载
+    start_ocr_service()
+    setup_rate_controller(configs)
+    start_notifier()
+    try:
+        run_accounts_with_backend(configs, fire_at)
+    finally:
+        # 等待后台通知线程发送剩余的通知和失败汇总
+        stop_notifier()
+
+
+def run_accounts_with_backend(configs: List[UserConfig], fire_at: datetime.datetime = None):
+    """
+    按配置的请求后端执行所有账号的选课流程
+
+    单账号时直接在当前线程执行；多账号时每个账号在独立线程和独立会话中并发执行，
+    共享同一个验证码识别模型，并受 max_inflight_requests 限制所有账号的在途请求总数，
+    各账号配置不同时取最严格的上限。http_backend 为 async 时改为在单个事件循环中执行所有账号的全部请求
+    """
+    if configs[0].http_backend == "async":
+        # 按需导入，未安装 aiohttp 时同步后端仍可使用
+        from src.core.async_backend import run_async_accounts
+
+        logger.info(f"使用异步后端，共 {len(configs)} 个账号")
+        run_async_accounts(configs, fire_at)
+        return
+
+    set_max_inflight_requests(merge_inflight_limits(config.max_inflight_requests for config in configs))
+    pool_maxsize = max(
+        config.pool_maxsize or get_expected_concurrency(config) for config in configs
+    )
+    configure_connection_pool(pool_maxsize=max(pool_maxsize, 10))
+    if len(configs) == 1:
+        main_flow(configs[0], fire_at)
+        return
+
+    logger.info(f"多账号模式，共 {len(configs)} 个账号")
+    with ThreadPoolExecutor(max_workers=len(configs), thread_name_prefix="account") as executor:
+        for config in configs:
+            executor.submit(run_account, config, fire_at)
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="曲阜师范大学教务系统抢课脚本")
+    parser.add_argument(
+        "--fire-at",
+        type=datetime.datetime.fromisoformat,
+        default=None,
+        help="选课开始时间（ISO格式），预热完成后等待到该时间再选课",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
     try:
-        config = load_config()
-        main_flow(config)
+        args = parse_args()
+        configs = load_configs()
+        run_accounts(configs, args.fire_at)
     except Exception as e:
         logger.critical(f"程序异常终止: {str(e)}")
         exit(1)
\ No newline at end of file
@@ -0,0 +1,940 @@
+import time
+import asyncio
+import logging
+import datetime
+from io import BytesIO
+from http.cookies import SimpleCookie
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+from PIL import Image
+from yarl import URL
+
+from src.core.login import (
+    BASE_URL,
+    URLS,
+    LOGIN_HEADERS,
+    generate_encoded_string,
+    build_login_data,
+    check_login_response,
+    LoginAttempts,
+)
+from src.core.course_selector import parse_jx0502zbid
+from src.core.send_course_data import (
+    OPER_CATEGORIES,
+    build_oper_request,
+    parse_oper_response,
+)
+from src.core.search_and_select_course import SELECTION_METHODS, learn_oper_category
+from src.core.concurrent_selector import (
+    MODE_INTERVALS,
+    CourseSelectionResult,
+    get_course_key,
+)
+from src.core.course_state import CourseTracker, mark_selection_result
+from src.core.snipe import (
+    DEFAULT_POLL_INTERVAL,
+    SNIPE_BATCH_MAX_PAGES,
+    get_capacities,
+    get_failure_reason,
+    has_capacity,
+    pop_unknown_capacity,
+    record_batch_rows,
+    record_fire_failure,
+    should_batch,
+)
+from src.data.get_course_jx02id_and_jx0404id import (
+    SEARCH_METHODS,
+    SEARCH_CATEGORIES,
+    SEARCH_PAGE_SIZE,
+    BATCH_PAGE_SIZE,
+    build_search_request,
+    is_context_lost,
+    parse_search_response,
+    find_course_jx02id_and_jx0404id,
+)
+from src.data.local_course_index import (
+    LocalCourseIndex,
+    set_course_data_path,
+    resolve_courses_locally,
+    get_course_jx02id_and_jx0404id_by_local,
+)
+from src.utils.category_cache import (
+    get_oper_category,
+    get_search_category,
+    record_search_category,
+    is_category_miss,
+    prefer_category,
+)
+from src.utils.captcha_ocr import get_ocr_service
+from src.utils.clock_sync import calibrate_clock
+from src.utils.notifier import notify_failure, notify_success
+from src.utils.deadline import DEFAULT_REQUEST_TIMEOUT
+from src.utils.metrics import increment, log_metrics
+from src.utils.rate_controller import (
+    get_rate_controller,
+    is_overloaded_error,
+    is_overloaded_response,
+)
+from src.utils.scheduler import SPIN_THRESHOLD, wait_until, record_trigger_skew
+from src.utils.session_manager import (
+    DEFAULT_HEADERS,
+    create_session,
+    is_page_entered,
+    mark_page_entered,
+    invalidate_entered_pages,
+    merge_inflight_limits,
+)
+
+
+def create_trace_config():
+    """创建请求追踪配置，每次请求结束后将耗时和响应交给共享的速率控制器"""
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        controller = get_rate_controller()
+        if controller is None:
+            return
+        controller.record(
+            time.perf_counter() - context.start,
+            is_overloaded_response(
+                params.response.status,
+                params.response.headers.get("Content-Type", ""),
+                params.headers.get("X-Requested-With") == "XMLHttpRequest",
+            ),
+        )
+
+    async def on_request_exception(session, context, params):
+        controller = get_rate_controller()
+        if controller is None:
+            return
+        if isinstance(params.exception, aiohttp.ClientConnectionError) or (
+            is_overloaded_error(params.exception)
+        ):
+            controller.record(time.perf_counter() - context.start, True)
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
+
+
+def create_async_session(connector=None):
+    """
+    创建异步会话，拥有独立的cookie
+
+    Args:
+        connector: 共享的连接器，多个账号共用一个连接器时，其连接数上限即所有账号的在途请求总数上限
+    """
+    return aiohttp.ClientSession(
+        headers=DEFAULT_HEADERS,
+        connector=connector,
+        connector_owner=connector is None,
+        timeout=aiohttp.ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT),
+        trace_configs=[create_trace_config()],
+    )
+
+
+async def async_get_initial_data(session) -> str:
+    """获取登录所需的初始数据"""
+    async with session.get(URLS["init_data"]) as response:
+        response.raise_for_status()
+        return await response.text()
+
+
+async def async_fetch_captcha(session) -> bytes:
+    """获取验证码图片"""
+    async with session.get(URLS["rand_code"]) as response:
+        response.raise_for_status()
+        return await response.read()
+
+
+async def async_recognize_captcha(image_bytes: bytes) -> Tuple[str, Optional[float]]:
+    """在验证码识别线程中识别验证码，避免阻塞事件循环，返回识别结果和置信度"""
+    return await asyncio.wrap_future(
+        get_ocr_service().submit(Image.open(BytesIO(image_bytes)), probability=True)
+    )
+
+
+async def async_prefetch_login_page(session) -> Tuple[SimpleCookie, str, bytes]:
+    """
+    在独立cookie的新会话中获取登录初始数据和验证码，与 main.prefetch_login_page 一致
+
+    新会话与 session 共用连接器
+
+    Returns:
+        tuple: (新会话的cookie, 登录初始数据, 验证码图片)
+    """
+    async with create_async_session(session.connector) as prefetch_session:
+        data_str = await async_get_initial_data(prefetch_session)
+        image_bytes = await async_fetch_captcha(prefetch_session)
+        return (
+            prefetch_session.cookie_jar.filter_cookies(URL(BASE_URL)),
+            data_str,
+            image_bytes,
+        )
+
+
+async def async_login(
+    session, account: str, password: str, min_confidence=0.0, prefetch=False
+) -> bool:
+    """
+    登录教务系统，验证码识别错误时重新获取验证码重试，重试判定与 main.login_flow 一致
+
+    prefetch 为True时在提交登录的同时用独立cookie的新会话获取下一组登录初始数据和验证码，
+    登录失败时换用该会话的cookie重试
+    """
+    attempts = LoginAttempts(min_confidence)
+    data_str = await async_get_initial_data(session)
+
+    prefetched = None
+    try:
+        while attempts.remaining():
+            try:
+                if prefetched:
+                    task, prefetched = prefetched, None
+                    cookies, data_str, image_bytes = await task
+                    # 验证码和初始数据属于预取的会话，换用其cookie提交登录
+                    session.cookie_jar.update_cookies(cookies, URL(BASE_URL))
+                else:
+                    image_bytes = await async_fetch_captcha(session)
+                captcha = attempts.accept(*await async_recognize_captcha(image_bytes))
+                if captcha is None:
+                    continue
+
+                if prefetch:
+                    prefetched = asyncio.create_task(async_prefetch_login_page(session))
+                async with session.post(
+                    URLS["login"],
+                    headers=LOGIN_HEADERS,
+                    data=build_login_data(
+                        account,
+                        password,
+                        captcha,
+                        generate_encoded_string(data_str, account, password),
+                    ),
+                ) as response:
+                    response.raise_for_status()
+                    check_login_response(await response.text())
+                break
+            except Exception as e:
+                delay = attempts.retry_delay(e)
+                if delay:
+                    await asyncio.sleep(delay)
+        else:
+            attempts.fail()
+    finally:
+        # 登录成功或放弃时取消尚未使用的预取，并等待其关闭预取的会话
+        if prefetched:
+            prefetched.cancel()
+            await asyncio.gather(prefetched, return_exceptions=True)
+
+    attempts.succeed()
+    return True
+
+
+async def async_get_jx0502zbid(session, select_semester):
+    """获取选课轮次编号"""
+    async with session.get(URLS["course_selection"]) as response:
+        response.raise_for_status()
+        return parse_jx0502zbid(await response.text(), select_semester)
+
+
+async def async_enter_course_selection(session, select_semester) -> str:
+    """访问必要页面，获取选课编号并进入选课页面"""
+    for url in [URLS["main_page"], URLS["course_selection"]]:
+        async with session.get(url) as response:
+            response.raise_for_status()
+
+    jx0502zbid = await async_get_jx0502zbid(session, select_semester)
+    if not jx0502zbid:
+        raise ValueError("获取选课编号失败")
+
+    logging.info(f"选课编号: {jx0502zbid}")
+    async with session.get(
+        f"{BASE_URL}/jsxsd/xsxk/xsxk_index?jx0502zbid={jx0502zbid}"
+    ) as response:
+        await response.read()
+    invalidate_entered_pages(session)
+    return jx0502zbid
+
+
+async def async_enter_category_page(session, category, page_url):
+    """进入分类的选课页面，同一会话每个页面只访问一次"""
+    page = SEARCH_CATEGORIES[category]["page"]
+    if is_page_entered(session, page):
+        return
+    async with session.get(page_url) as response:
+        await response.read()
+        logging.info(
+            f"获取{SEARCH_CATEGORIES[category]['name']}页面响应值: {response.status}"
+        )
+    mark_page_entered(session, page)
+
+
+async def async_post_category_list(session, category, page_url, list_url, params, data):
+    """请求分类的列表数据，与 post_category_list 一致，丢失选课上下文时重新进入页面后重试一次"""
+    name = SEARCH_CATEGORIES[category]["name"]
+    for retry in range(2):
+        if retry:
+            logging.warning(f"{name}的选课上下文已丢失，重新进入选课页面")
+            invalidate_entered_pages(session)
+        await async_enter_category_page(session, category, page_url)
+        async with session.post(list_url, params=params, data=data) as response:
+            text = await response.text()
+            logging.info(f"获取{name}列表数据响应值: {response.status}")
+        if not is_context_lost(text):
+            break
+    return text
+
+
+async def async_search_course(
+    session, category, course=None, display_length=SEARCH_PAGE_SIZE
+):
+    """在指定分类中搜索课程，返回列表数据，course 为None时获取该分类的全部课程"""
+    name = SEARCH_CATEGORIES[category]["name"]
+    try:
+        page_url, list_url, params, data = build_search_request(
+            category, course, display_length=display_length
+        )
+        text = await async_post_category_list(
+            session, category, page_url, list_url, params, data
+        )
+        return parse_search_response(category, text)
+    except asyncio.TimeoutError:
+        increment("request_timeouts")
+        logging.error(f"获取{name}的jx02id和jx0404id超时")
+        return None
+    except Exception as e:
+        logging.error(f"获取{name}的jx02id和jx0404id失败: {e}")
+        return None
+
+
+async def async_fetch_category_courses(
+    session, category, page_size=BATCH_PAGE_SIZE, max_pages=0
+):
+    """分页获取指定分类的全部课程，与 fetch_category_courses 一致"""
+    name = SEARCH_CATEGORIES[category]["name"]
+    rows = []
+    pages = 0
+    try:
+        page_url, list_url, params, data = build_search_request(
+            category, display_length=page_size
+        )
+        while True:
+            text = await async_post_category_list(
+                session, category, page_url, list_url, params, data
+            )
+            response_data = parse_search_response(category, text)
+            if not response_data:
+                break
+            rows.extend(response_data["aaData"])
+            pages += 1
+            if len(rows) >= int(response_data.get("iTotalRecords") or 0) or (
+                max_pages and pages >= max_pages
+            ):
+                break
+            data["iDisplayStart"] = len(rows)
+        logging.info(f"获取{name}课程列表 {len(rows)} 条")
+    except asyncio.TimeoutError:
+        increment("request_timeouts")
+        logging.error(f"获取{name}课程列表超时")
+    except Exception as e:
+        logging.error(f"获取{name}课程列表失败: {e}")
+    return rows
+
+
+async def async_resolve_courses_batch(session, courses):
+    """批量通过API获取课程的jx02id和jx0404id，与 resolve_courses_by_api_batch 一致"""
+    pending = [
+        course
+        for course in courses
+        if not (course.get("jx02id") and course.get("jx0404id"))
+    ]
+    # 各分类的课程列表并发拉取
+    categories = [category for category, _ in SEARCH_METHODS]
+    all_rows = await asyncio.gather(
+        *(async_fetch_category_courses(session, category) for category in categories)
+    )
+    resolved = 0
+    for category, rows in zip(categories, all_rows):
+        index = LocalCourseIndex(rows)
+        for course in list(pending):
+            result = index.find(course)
+            if not result:
+                continue
+            course.update(result)
+            record_search_category(course, category, result["jx0404id"])
+            pending.remove(course)
+            resolved += 1
+    return resolved
+
+
+async def async_get_course_jx02id_and_jx0404id(session, course):
+    """获取课程的jx02id和jx0404id，优先从本地课程数据查找，未找到时通过API搜索"""
+    # 本地查找可能需要加载或重新生成课程目录，在线程池中执行，不阻塞事件循环
+    result = await asyncio.get_running_loop().run_in_executor(
+        None, get_course_jx02id_and_jx0404id_by_local, course
+    )
+    if result:
+        return result
+
+    for category, _ in prefer_category(SEARCH_METHODS, get_search_category(course)):
+        response_data = await async_search_course(session, category, course)
+        if response_data:
+            result = find_course_jx02id_and_jx0404id(course, response_data["aaData"])
+            if result:
+                record_search_category(course, category, result["jx0404id"])
+                return result
+
+    logging.warning(
+        f"未能找到课程: 【{course['course_id_or_name']}-{course['teacher_name']}】的jx02id和jx0404id"
+    )
+    return None
+
+
+async def async_send_oper(session, category, course_name, course_jx02id_and_jx0404id):
+    """发送指定分类的选课请求"""
+    try:
+        url, params, headers = build_oper_request(category, course_jx02id_and_jx0404id)
+        async with session.get(url, params=params, headers=headers) as response:
+            response_json = await response.json(content_type=None)
+            return parse_oper_response(
+                category, course_name, response.status, response_json
+            )
+    except asyncio.TimeoutError:
+        increment("request_timeouts")
+        logging.error(
+            f"发送【{course_name}】的{OPER_CATEGORIES[category][0]}请求数据超时"
+        )
+        return None, "请求超时"
+    except Exception as e:
+        error_msg = str(e) or type(e).__name__
+        logging.error(
+            f"发送【{course_name}】的{OPER_CATEGORIES[category][0]}请求数据失败: {error_msg}"
+        )
+        return None, error_msg
+
+
+async def async_send_selection_sequential(
+    session, course_name, course_jx02id_and_jx0404id, preferred_category=None
+):
+    """
+    按顺序依次尝试各个选课方式，成功后立即返回
+
+    优先的分类明确返回失败、且消息不表示课程不在该分类时，不再尝试其他分类；请求超时或
+    异常时继续尝试其他分类
+    """
+    outcomes = []
+    for category, method_name, _ in prefer_category(
+        SELECTION_METHODS, preferred_category
+    ):
+        result, message = await async_send_oper(
+            session, category, course_name, course_jx02id_and_jx0404id
+        )
+        outcomes.append((category, method_name, result, message))
+        if result is True:
+            return True, outcomes
+        if (
+            category == preferred_category
+            and result is False
+            and not is_category_miss(message)
+        ):
+            return False, outcomes
+    return False, outcomes
+
+
+async def async_send_selection_race(
+    session, course_name, course_jx02id_and_jx0404id, preferred_category=None
+):
+    """
+    同时向所有选课方式发送请求，第一个成功的请求胜出，其余请求被取消
+
+    指定优先的分类时先单独向该分类发送请求，选课成功或明确返回失败、且消息不表示课程不在
+    该分类时直接返回，否则（包括请求超时或异常）再同时向其余分类发送请求
+    """
+    first_outcomes = []
+    methods = SELECTION_METHODS
+    for category, method_name, _ in SELECTION_METHODS:
+        if category != preferred_category:
+            continue
+        result, message = await async_send_oper(
+            session, category, course_name, course_jx02id_and_jx0404id
+        )
+        first_outcomes = [(category, method_name, result, message)]
+        if result is True or (result is False and not is_category_miss(message)):
+            return result is True, first_outcomes
+        methods = [method for method in methods if method[0] != category]
+
+    tasks = {
+        asyncio.ensure_future(
+            async_send_oper(session, category, course_name, course_jx02id_and_jx0404id)
+        ): (category, method_name)
+        for category, method_name, _ in methods
+    }
+    results = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                category, method_name = tasks[task]
+                result, message = task.result()
+                results[category] = (result, message)
+                if result is True:
+                    logging.info(f"【{course_name}】并发选课由【{method_name}】胜出")
+                    return True, first_outcomes + [
+                        (category, method_name, result, message)
+                    ]
+    finally:
+        for task in pending:
+            task.cancel()
+
+    outcomes = [
+        (category, method_name, *results[category])
+        for category, method_name, _ in methods
+        if category in results
+    ]
+    return False, first_outcomes + outcomes
+
+
+async def async_send_course_selection(session, course, race=False):
+    """
+    获取课程的jx02id和jx0404id并发送选课请求
+
+    Returns:
+        tuple: (jx0404id, 是否成功, 选课结果列表)，未找到课程时返回 (None, False, [])
+    """
+    if course.get("jx02id") and course.get("jx0404id"):
+        course_jx02id_and_jx0404id = course
+    else:
+        course_jx02id_and_jx0404id = await async_get_course_jx02id_and_jx0404id(
+            session, course
+        )
+    if not course_jx02id_and_jx0404id:
+        return None, False, []
+
+    jx0404id = course_jx02id_and_jx0404id["jx0404id"]
+    preferred_category = get_oper_category(jx0404id) or get_search_category(course)
+    send_selection = (
+        async_send_selection_race if race else async_send_selection_sequential
+    )
+    success, outcomes = await send_selection(
+        session,
+        course["course_id_or_name"],
+        course_jx02id_and_jx0404id,
+        preferred_category,
+    )
+    return jx0404id, success, outcomes
+
+
+async def async_search_and_select_course(
+    session, course, race=False, attempt_timeout=0
+):
+    """
+    搜索并选择课程，与 search_and_select_course 的流程和返回值一致
+
+    搜索和选课请求共享 attempt_timeout 秒的时间预算，超出预算时取消未完成的请求，
+    为0时不限制
+    """
+    course_key = get_course_key(course)
+    try:
+        try:
+            jx0404id, success, outcomes = await asyncio.wait_for(
+                async_send_course_selection(session, course, race),
+                attempt_timeout if attempt_timeout > 0 else None,
+            )
+        except asyncio.TimeoutError:
+            increment("deadline_exceeded")
+            logging.error(
+                f"课程【{course_key}】本次尝试超出时间预算 {attempt_timeout}秒"
+            )
+            return False
+        if jx0404id is None:
+            return False
+
+        learn_oper_category(jx0404id, outcomes)
+        if success:
+            notify_success(
+                course_key, "选课成功 🎉 ✨ 🌟 🎊", f"课程【{course_key}】选课成功！"
+            )
+            return True
+
+        error_messages = []
+        for _, method_name, result, message in outcomes:
+            if result is False:
+                error_messages.append(f"【{method_name}】失败: {message}")
+            elif result is None:
+                error_messages.append(f"【{method_name}】发生异常: {message}")
+        if error_messages:
+            notify_failure(course_key, "\n\n".join(error_messages))
+        return False
+    except Exception as e:
+        error_msg = str(e)
+        logging.error(f"搜索选课失败: {error_msg}")
+        notify_failure(course_key, f"选课过程发生异常：{error_msg}")
+        return False
+
+
+async def async_select_courses(
+    session,
+    courses: List[dict],
+    max_concurrency: int = 0,
+    race: bool = False,
+    attempt_timeout: float = 0,
+    tracker: CourseTracker = None,
+    interval: float = 0,
+) -> Dict[str, CourseSelectionResult]:
+    """
+    在事件循环中并发执行所有课程的搜索与选课，课程成功后不再重试，
+    所有尝试按共享速率控制器的当前速率排队发出
+
+    Args:
+        max_concurrency: 同时进行的选课尝试数上限，为0时不限制
+        attempt_timeout: 单次尝试的时间预算（秒），为0时不限制
+        interval: 同一课程两次尝试之间的间隔（秒）
+        tracker: 课程状态机，课程成功时更新其状态
+    """
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+    rate_controller = get_rate_controller()
+    start_time = time.perf_counter()
+    results = {
+        get_course_key(course): CourseSelectionResult(get_course_key(course))
+        for course in courses
+    }
+
+    async def attempt(course):
+        if semaphore is None:
+            return await async_search_and_select_course(
+                session, course, race, attempt_timeout
+            )
+        async with semaphore:
+            return await async_search_and_select_course(
+                session, course, race, attempt_timeout
+            )
+
+    async def run_course(course):
+        result = results[get_course_key(course)]
+        while not result.success:
+            if result.attempts and interval > 0:
+                await asyncio.sleep(interval)
+            if rate_controller is not None:
+                await asyncio.sleep(rate_controller.reserve())
+            result.success = await attempt(course)
+            result.attempts += 1
+            result.elapsed = time.perf_counter() - start_time
+        mark_selection_result(tracker, course, True)
+        logging.critical(
+            f"课程【{result.course_key}】选课成功，尝试次数: {result.attempts}，耗时: {result.elapsed:.3f}秒"
+        )
+
+    await asyncio.gather(*(run_course(course) for course in courses))
+    return results
+
+
+async def async_poll_capacities(session, category, courses, rate_controller=None):
+    """
+    查询一个分类中目标教学班的剩余人数，与 snipe.poll_capacities 的查询方式一致
+
+    指定速率控制器时每次列表查询前各预约一个发送时刻
+    """
+    jx0404ids = {course["jx0404id"] for course in courses}
+    capacities = {}
+    if should_batch(category, courses):
+        if rate_controller is not None:
+            await asyncio.sleep(rate_controller.reserve())
+        rows = await async_fetch_category_courses(
+            session, category, max_pages=SNIPE_BATCH_MAX_PAGES
+        )
+        record_batch_rows(category, rows)
+        capacities = get_capacities(rows, jx0404ids)
+
+    for course in courses:
+        if course["jx0404id"] in capacities:
+            continue
+        if rate_controller is not None:
+            await asyncio.sleep(rate_controller.reserve())
+        response = await async_search_course(session, category, course)
+        if response:
+            capacities.update(get_capacities(response["aaData"], jx0404ids))
+    return capacities
+
+
+async def async_locate_course(session, course):
+    """确定课程所在的选课分类，与 snipe.locate_course 一致"""
+    category = get_oper_category(course["jx0404id"]) or get_search_category(course)
+    if category:
+        return category
+    for category, _ in SEARCH_METHODS:
+        response = await async_search_course(session, category, course)
+        if response and get_capacities(response["aaData"], {course["jx0404id"]}):
+            record_search_category(course, category, course["jx0404id"])
+            return category
+    return None
+
+
+async def async_fire_course(session, course, category, race=False):
+    """
+    教学班出现空余名额时立即发送选课请求，与 snipe.fire_course 一致
+
+    Returns:
+        tuple: (是否成功, 明确失败时的消息)
+    """
+    course_key = get_course_key(course)
+    if race:
+        success, outcomes = await async_send_selection_race(
+            session, course["course_id_or_name"], course, category
+        )
+    else:
+        method_name = next(
+            name for key, name, _ in SELECTION_METHODS if key == category
+        )
+        result, message = await async_send_oper(
+            session, category, course["course_id_or_name"], course
+        )
+        success, outcomes = result is True, [(category, method_name, result, message)]
+    learn_oper_category(course["jx0404id"], outcomes)
+    if success:
+        notify_success(
+            course_key, "选课成功 🎉 ✨ 🌟 🎊", f"课程【{course_key}】截胡成功！"
+        )
+        return True, None
+    return False, get_failure_reason(outcomes)
+
+
+async def async_snipe_courses(
+    session, courses: List[dict], race: bool = False, tracker: CourseTracker = None
+) -> Dict[str, CourseSelectionResult]:
+    """
+    截胡模式：轮询剩余人数，出现空余名额时立即选课，与 snipe.run_snipe_selection 一致
+
+    列表数据中没有剩余人数的课程改为按普通模式选课，与截胡并发进行；出现空余名额时选课
+    仍连续 SNIPE_MAX_FAILURES 次明确失败的课程放弃截胡
+    """
+    rate_controller = get_rate_controller()
+    results = {
+        get_course_key(course): CourseSelectionResult(get_course_key(course))
+        for course in courses
+    }
+    start_time = time.perf_counter()
+
+    groups = {}
+    for course in courses:
+        result = results[get_course_key(course)]
+        if not (course.get("jx02id") and course.get("jx0404id")):
+            result.last_error = "未获取到jx02id和jx0404id"
+            mark_selection_result(tracker, course, False, result.last_error)
+            logging.warning(f"课程【{result.course_key}】未获取到jx0404id，无法截胡")
+            continue
+        category = await async_locate_course(session, course)
+        if not category:
+            result.last_error = "未在任何分类的选课列表中找到该教学班"
+            mark_selection_result(tracker, course, False, result.last_error)
+            logging.warning(f"课程【{result.course_key}】{result.last_error}，无法截胡")
+            continue
+        groups.setdefault(category, []).append(course)
+
+    polls = 0
+    fallbacks = []
+    failures = {}
+    while groups:
+        if rate_controller is None and polls:
+            await asyncio.sleep(DEFAULT_POLL_INTERVAL)
+        polls += 1
+
+        categories = list(groups)
+        all_capacities = await asyncio.gather(
+            *(
+                async_poll_capacities(
+                    session, category, groups[category], rate_controller
+                )
+                for category in categories
+            )
+        )
+        for category, capacities in zip(categories, all_capacities):
+            unknown = pop_unknown_capacity(groups[category], capacities)
+            if unknown:
+                fallbacks.append(
+                    asyncio.ensure_future(
+                        async_select_courses(
+                            session, unknown, race=race, tracker=tracker
+                        )
+                    )
+                )
+        targets = [
+            (category, course)
+            for category, capacities in zip(categories, all_capacities)
+            for course in groups[category]
+            if course["jx0404id"] in capacities
+            and has_capacity(capacities[course["jx0404id"]])
+        ]
+        outcomes = await asyncio.gather(
+            *(
+                async_fire_course(session, course, category, race)
+                for category, course in targets
+            )
+        )
+        for (category, course), (success, reason) in zip(targets, outcomes):
+            result = results[get_course_key(course)]
+            result.attempts += 1
+            result.elapsed = time.perf_counter() - start_time
+            if success:
+                result.success = True
+                groups[category].remove(course)
+                mark_selection_result(tracker, course, True)
+                logging.critical(
+                    f"课程【{result.course_key}】截胡成功，查询轮数: {polls}，耗时: {result.elapsed:.3f}秒"
+                )
+            elif record_fire_failure(failures, result, course, reason, tracker):
+                groups[category].remove(course)
+        groups = {category: group for category, group in groups.items() if group}
+
+    logging.info(f"截胡结束，共查询 {polls} 轮")
+    for fallback_results in await asyncio.gather(*fallbacks):
+        results.update(fallback_results)
+    return results
+
+
+async def async_wait_until(target: datetime.datetime, offset_ms: float = 0):
+    """
+    在事件循环中等待到选课时间
+
+    大部分时间通过 asyncio.sleep 等待，最后不足 SPIN_THRESHOLD 的忙等待和触发偏差的记录
+    在线程池中执行，不阻塞事件循环中其他账号的协程
+    """
+    fire_at = target + datetime.timedelta(milliseconds=offset_ms)
+    remaining = (fire_at - datetime.datetime.now()).total_seconds()
+    if remaining <= 0:
+        logging.warning(
+            f"预热阶段结束时已超过选课时间 {-remaining:.3f}秒，立即开始选课"
+        )
+        return
+    logging.info(f"预热完成，等待 {remaining:.3f}秒 后开始选课")
+    if remaining > SPIN_THRESHOLD:
+        await asyncio.sleep(remaining - SPIN_THRESHOLD)
+    loop = asyncio.get_running_loop()
+    skew = await loop.run_in_executor(None, wait_until, fire_at)
+    await loop.run_in_executor(None, record_trigger_skew, fire_at, skew, offset_ms)
+
+
+async def async_main_flow(config, fire_at=None, connector=None):
+    """
+    单个账号的异步选课流程，与同步实现一样分为预热阶段和选课阶段
+
+    Args:
+        config: 用户配置（main.UserConfig）
+        fire_at: 选课开始时间，为None时预热后立即选课
+        connector: 多个账号共享的连接器
+    """
+    courses = [dict(vars(course)) for course in config.courses]
+    tracker = CourseTracker(
+        config.course_state_path, config.user_account, config.select_semester, courses
+    )
+    courses = tracker.active(courses)
+    if not courses:
+        logging.info(f"账号 {config.user_account} 的所有课程均已选课成功，无需选课")
+        return {}
+
+    async with create_async_session(connector) as session:
+        phase_start = time.perf_counter()
+        await async_login(
+            session,
+            config.user_account,
+            config.user_password,
+            config.captcha_min_confidence,
+            config.captcha_prefetch,
+        )
+        await async_enter_course_selection(session, config.select_semester)
+
+        set_course_data_path(config.course_data_path)
+        tracker.begin_resolving(courses)
+        # 首次加载课程目录时可能需要校验哈希并重新生成，在线程池中执行，不阻塞其他账号的协程
+        await asyncio.get_running_loop().run_in_executor(
+            None, resolve_courses_locally, courses
+        )
+        unresolved = [
+            course
+            for course in courses
+            if not (course.get("jx02id") and course.get("jx0404id"))
+        ]
+        if len(unresolved) > 1:
+            await async_resolve_courses_batch(session, unresolved)
+            unresolved = [course for course in unresolved if not course.get("jx0404id")]
+        resolved = await asyncio.gather(
+            *(
+                async_get_course_jx02id_and_jx0404id(session, course)
+                for course in unresolved
+            )
+        )
+        for course, result in zip(unresolved, resolved):
+            if result:
+                course.update(result)
+        tracker.end_resolving(courses)
+        logging.info(f"预热阶段耗时: {time.perf_counter() - phase_start:.3f}秒")
+
+        if fire_at:
+            if config.clock_sync:
+                loop = asyncio.get_running_loop()
+                clock = await loop.run_in_executor(
+                    None,
+                    calibrate_clock,
+                    create_session(),
+                    BASE_URL,
+                    config.clock_sync_samples,
+                )
+                if clock:
+                    fire_at = fire_at - datetime.timedelta(
+                        seconds=clock.offset + clock.one_way_latency
+                    )
+            await async_wait_until(fire_at, config.trigger_offset_ms)
+
+        phase_start = time.perf_counter()
+        if config.mode == "snipe":
+            results = await async_snipe_courses(
+                session, courses, config.race_mode, tracker
+            )
+        else:
+            results = await async_select_courses(
+                session,
+                courses,
+                config.max_workers,
+                config.race_mode,
+                config.attempt_timeout,
+                tracker,
+                MODE_INTERVALS.get(config.mode, 0),
+            )
+        logging.info(f"选课阶段耗时: {time.perf_counter() - phase_start:.3f}秒")
+        log_metrics()
+        return results
+
+
+async def async_run_accounts(configs, fire_at=None):
+    """
+    在同一个事件循环中并发执行所有账号的选课流程，所有账号共享一个连接器
+
+    连接器的连接数上限取各账号 max_inflight_requests 中最严格的一个
+    """
+    connector = aiohttp.TCPConnector(
+        limit=merge_inflight_limits(config.max_inflight_requests for config in configs)
+    )
+    try:
+        outcomes = await asyncio.gather(
+            *(async_main_flow(config, fire_at, connector) for config in configs),
+            return_exceptions=True,
+        )
+    finally:
+        await connector.close()
+
+    for config, outcome in zip(configs, outcomes):
+        if isinstance(outcome, Exception):
+            logging.error(f"账号 {config.user_account} 选课异常终止: {str(outcome)}")
+
+
+def run_async_accounts(configs, fire_at=None):
+    """使用异步后端执行所有账号的选课流程"""
+    asyncio.run(async_run_accounts(configs, fire_at))
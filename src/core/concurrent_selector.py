@@ -0,0 +1,176 @@
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.core.search_and_select_course import (
+    configure_race_pool,
+    search_and_select_course,
+)
+from src.core.course_state import CourseTracker, mark_selection_result
+from src.utils.category_cache import get_course_cache_key
+from src.utils.session_manager import submit_with_context
+from src.utils.deadline import deadline_scope
+from src.utils.rate_controller import RateController
+
+# 各选课模式下同一课程两次尝试（snipe 模式下为两轮剩余人数查询）之间的间隔（秒）
+# normal 模式下始终保持该间隔，速率控制器只能在此之下降速；其余模式只用于计算速率控制器的
+# 初始速率，之后由控制器根据服务器的响应情况自适应调整，间隔为0时从速率上限开始
+MODE_INTERVALS = {"fast": 0, "normal": 5, "snipe": 2}
+
+
+@dataclass
+class CourseSelectionResult:
+    """单门课程的选课结果"""
+
+    course_key: str
+    success: bool = False
+    attempts: int = 0
+    elapsed: float = 0.0
+    last_error: str = ""
+
+
+def get_course_key(course):
+    """
+    生成课程的唯一标识，与课程状态文件的键相同
+
+    同一课程同一教师不同上课时间的教学班分别配置时各自独立记录选课结果
+    """
+    return get_course_cache_key(course)
+
+
+def _attempt_course(course, delay, stop_event, race, attempt_timeout, rate_controller):
+    """
+    执行一次课程的搜索与选课，delay 为本次尝试前的等待时间
+
+    本次尝试的搜索和选课请求共享 attempt_timeout 秒的时间预算，超出预算的请求被放弃；
+    指定 rate_controller 时按控制器的当前速率排队发出
+    """
+    if delay > 0 and stop_event.wait(delay):
+        return None
+    if rate_controller is not None and not rate_controller.acquire(stop_event):
+        return None
+    with deadline_scope(attempt_timeout):
+        return search_and_select_course(course, race=race)
+
+
+def run_concurrent_selection(
+    courses: List[dict],
+    max_workers: int = 0,
+    interval: float = 0,
+    max_attempts: int = 0,
+    stop_event: Optional[threading.Event] = None,
+    race: bool = False,
+    attempt_timeout: float = 0,
+    rate_controller: Optional[RateController] = None,
+    tracker: Optional[CourseTracker] = None,
+) -> Dict[str, CourseSelectionResult]:
+    """
+    并发执行所有课程的搜索与选课
+
+    每门课程的每次尝试作为一个独立任务提交到线程池，失败后重新排队，
+    成功后不再提交该课程的任务，所有课程都成功（或达到尝试上限）后返回。
+
+    Args:
+        courses: 课程信息字典列表
+        max_workers: 最大并发数，为0时与课程数量相同
+        interval: 同一课程两次尝试之间的间隔（秒）
+        max_attempts: 单门课程的最大尝试次数，为0时不限制
+        stop_event: 外部停止信号，设置后不再提交新的尝试
+        race: 是否同时向所有选课方式发送请求
+        attempt_timeout: 单次尝试的时间预算（秒），为0时不限制
+        rate_controller: 自适应速率控制器，所有课程的尝试共享其速率
+        tracker: 课程状态机，课程成功或放弃时更新其状态
+
+    Returns:
+        Dict[str, CourseSelectionResult]: 以课程标识为键的选课结果
+    """
+    stop_event = stop_event or threading.Event()
+    results = {
+        get_course_key(course): CourseSelectionResult(get_course_key(course))
+        for course in courses
+    }
+    if not courses:
+        return results
+
+    max_workers = max_workers if max_workers > 0 else len(courses)
+    if race:
+        configure_race_pool(max_workers)
+    start_time = time.perf_counter()
+    logging.info(f"开始并发选课，课程数: {len(courses)}，最大并发数: {max_workers}")
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="course"
+    ) as executor:
+        futures = {
+            submit_with_context(
+                executor,
+                _attempt_course,
+                course,
+                0,
+                stop_event,
+                race,
+                attempt_timeout,
+                rate_controller,
+            ): course
+            for course in courses
+        }
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                course = futures.pop(future)
+                result = results[get_course_key(course)]
+
+                try:
+                    success = future.result()
+                except Exception as e:
+                    success = False
+                    result.last_error = str(e)
+                    logging.error(f"课程【{result.course_key}】选课任务异常: {str(e)}")
+
+                if success is None:
+                    continue
+
+                result.attempts += 1
+                result.elapsed = time.perf_counter() - start_time
+
+                if success:
+                    result.success = True
+                    mark_selection_result(tracker, course, True)
+                    logging.critical(
+                        f"课程【{result.course_key}】选课成功，尝试次数: {result.attempts}，耗时: {result.elapsed:.3f}秒"
+                    )
+                    continue
+
+                if stop_event.is_set():
+                    continue
+                if max_attempts and result.attempts >= max_attempts:
+                    mark_selection_result(
+                        tracker, course, False, f"已达到最大尝试次数 {max_attempts}"
+                    )
+                    logging.warning(
+                        f"课程【{result.course_key}】已达到最大尝试次数 {max_attempts}，停止选课"
+                    )
+                    continue
+
+                futures[
+                    submit_with_context(
+                        executor,
+                        _attempt_course,
+                        course,
+                        interval,
+                        stop_event,
+                        race,
+                        attempt_timeout,
+                        rate_controller,
+                    )
+                ] = course
+
+    for result in results.values():
+        logging.info(
+            f"课程【{result.course_key}】: {'成功' if result.success else '未成功'}，"
+            f"尝试次数: {result.attempts}，耗时: {result.elapsed:.3f}秒"
+        )
+    return results
@@ -5,6 +5,55 @@ from bs4 import BeautifulSoup
 from requests.exceptions import RequestException
 
 
+JX0502ZBID_PATTERN = re.compile(r"jx0502zbid=([^&]+)")
+
+
+def parse_jx0502zbid(html, select_semester):
+    """
+    从选课轮次页面中解析选课轮次编号
+    Args:
+        html: 选课轮次页面内容
+        select_semester: 选课学期，如果为空则默认获取第一个可选课程
+    Returns:
+        Optional[str]: 选课轮次编号(jx0502zbid)，如果未找到返回None
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    rows = soup.find_all("tr")
+
+    # 如果没有指定学期，直接获取第一个有效的选课链接
+    if not select_semester:
+        for row in rows[1:]:  # 跳过表头行
+            try:
+                link = row.find("a", href=True)
+                if link and "jx0502zbid" in link["href"]:
+                    match = JX0502ZBID_PATTERN.search(link["href"])
+                    if match:
+                        return match.group(1)
+            except (AttributeError, IndexError) as e:
+                logging.warning(f"解析行数据时出错: {str(e)}")
+                continue
+        return None
+
+    # 如果指定了学期，按学期匹配
+    for row in rows:
+        try:
+            cells = row.find_all("td")
+            if not cells or len(cells) < 2:
+                continue
+
+            if select_semester in cells[1].text.strip():
+                link = row.find("a", href=True)
+                if link and "jx0502zbid" in link["href"]:
+                    match = JX0502ZBID_PATTERN.search(link["href"])
+                    if match:
+                        return match.group(1)
+        except (AttributeError, IndexError) as e:
+            logging.warning(f"解析行数据时出错: {str(e)}")
+            continue
+
+    return None
+
+
 def get_jx0502zbid(session, select_semester):
     """
     获取教务系统中的选课轮次编号
@@ -17,47 +66,11 @@ def get_jx0502zbid(session, select_semester):
         RequestException: 当网络请求失败时
     """
     url = "http://zhjw.qfnu.edu.cn/jsxsd/xsxk/xklc_list"
-    jx0502zbid_pattern = re.compile(r"jx0502zbid=([^&]+)")
 
     try:
         response = session.get(url)
         response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, "html.parser")
-        rows = soup.find_all("tr")
-
-        # 如果没有指定学期，直接获取第一个有效的选课链接
-        if not select_semester:
-            for row in rows[1:]:  # 跳过表头行
-                try:
-                    link = row.find("a", href=True)
-                    if link and "jx0502zbid" in link["href"]:
-                        match = jx0502zbid_pattern.search(link["href"])
-                        if match:
-                            return match.group(1)
-                except (AttributeError, IndexError) as e:
-                    logging.warning(f"解析行数据时出错: {str(e)}")
-                    continue
-            return None
-
-        # 如果指定了学期，按学期匹配
-        for row in rows:
-            try:
-                cells = row.find_all("td")
-                if not cells or len(cells) < 2:
-                    continue
-
-                if select_semester in cells[1].text.strip():
-                    link = row.find("a", href=True)
-                    if link and "jx0502zbid" in link["href"]:
-                        match = jx0502zbid_pattern.search(link["href"])
-                        if match:
-                            return match.group(1)
-            except (AttributeError, IndexError) as e:
-                logging.warning(f"解析行数据时出错: {str(e)}")
-                continue
-
-        return None
+        return parse_jx0502zbid(response.text, select_semester)
 
     except RequestException as e:
         logging.error(f"请求选课页面失败: {str(e)}")
@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import logging
+import threading
+from enum import Enum
+from typing import Dict, List, Optional
+
+from src.utils.category_cache import get_course_cache_key
+
+# 课程状态文件，记录每个账号每门课程的选课进度，重新启动时从中恢复
+DEFAULT_STATE_PATH = "course_state.json"
+
+
+class CourseState(Enum):
+    """单门课程在一次运行中的状态"""
+
+    PENDING = "pending"  # 等待获取jx02id和jx0404id
+    RESOLVING = "resolving"  # 正在获取jx02id和jx0404id
+    RESOLVED = "resolved"  # 已获取jx02id和jx0404id，等待选课
+    SELECTED = "selected"  # 选课成功
+    GIVEN_UP = "given_up"  # 放弃选课，如达到最大尝试次数或无法截胡
+
+
+# 允许的状态转换；获取失败的课程回到 PENDING，选课时再搜索
+TRANSITIONS = {
+    CourseState.PENDING: {
+        CourseState.RESOLVING,
+        CourseState.RESOLVED,
+        CourseState.SELECTED,
+        CourseState.GIVEN_UP,
+    },
+    CourseState.RESOLVING: {CourseState.RESOLVED, CourseState.PENDING},
+    CourseState.RESOLVED: {CourseState.SELECTED, CourseState.GIVEN_UP},
+    CourseState.SELECTED: set(),
+    CourseState.GIVEN_UP: set(),
+}
+
+# 终止状态的课程不再参与选课
+TERMINAL_STATES = {CourseState.SELECTED, CourseState.GIVEN_UP}
+
+# 多个账号共用同一个状态文件，写入时加锁
+_file_lock = threading.Lock()
+
+
+def _load_state_file(path) -> dict:
+    """读取状态文件，文件不存在或损坏时返回空字典"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"读取课程状态文件失败，将重新记录: {str(e)}")
+        return {}
+
+
+class CourseTracker:
+    """
+    单个账号的课程状态机
+
+    每次状态变化立即写入状态文件，重新启动时恢复：已选上的课程不再选课，
+    已获取的jx02id和jx0404id直接使用；中断时正在获取的课程回到 PENDING，
+    上次放弃的课程在新的运行中重新尝试。
+    """
+
+    def __init__(self, path, account, semester, courses: List[dict]):
+        """
+        Args:
+            path: 状态文件路径，为空时不持久化
+            account: 学号，与选课轮次名称一起区分状态文件中的记录
+            semester: 选课轮次名称
+            courses: 课程配置字典列表，恢复的jx02id和jx0404id直接写入字典
+        """
+        self.path = path
+        self.section = f"{account}-{semester}"
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+
+        saved = _load_state_file(path).get(self.section, {}) if path else {}
+        for course in courses:
+            key = get_course_cache_key(course)
+            entry = saved.get(key, {})
+            try:
+                state = CourseState(entry.get("state"))
+            except ValueError:
+                state = CourseState.PENDING
+
+            if state == CourseState.SELECTED:
+                logging.info(f"课程【{key}】上次运行已选课成功，本次跳过")
+            else:
+                if not (course.get("jx02id") and course.get("jx0404id")) and (
+                    entry.get("jx02id") and entry.get("jx0404id")
+                ):
+                    course["jx02id"] = entry["jx02id"]
+                    course["jx0404id"] = entry["jx0404id"]
+                state = (
+                    CourseState.RESOLVED
+                    if course.get("jx02id") and course.get("jx0404id")
+                    else CourseState.PENDING
+                )
+            self._entries[key] = {
+                "state": state.value,
+                "jx02id": course.get("jx02id") or entry.get("jx02id", ""),
+                "jx0404id": course.get("jx0404id") or entry.get("jx0404id", ""),
+                "updated_at": entry.get("updated_at", time.time()),
+            }
+        self._save()
+
+    def state(self, course) -> CourseState:
+        """课程当前的状态"""
+        with self._lock:
+            entry = self._entries.get(get_course_cache_key(course))
+        return CourseState(entry["state"]) if entry else CourseState.PENDING
+
+    def transition(self, course, state: CourseState, reason: str = "") -> bool:
+        """
+        将课程转换到新的状态并写入状态文件
+
+        Returns:
+            bool: 是否转换成功，不允许的转换被忽略
+        """
+        key = get_course_cache_key(course)
+        with self._lock:
+            entry = self._entries.setdefault(key, {"state": CourseState.PENDING.value})
+            current = CourseState(entry["state"])
+            if state == current:
+                return True
+            if state not in TRANSITIONS[current]:
+                logging.warning(
+                    f"课程【{key}】不能从 {current.value} 转换为 {state.value}，已忽略"
+                )
+                return False
+            entry["state"] = state.value
+            entry["jx02id"] = course.get("jx02id") or entry.get("jx02id", "")
+            entry["jx0404id"] = course.get("jx0404id") or entry.get("jx0404id", "")
+            entry["updated_at"] = time.time()
+        logging.info(
+            f"课程【{key}】状态: {current.value} -> {state.value}"
+            + (f"，{reason}" if reason else "")
+        )
+        self._save()
+        return True
+
+    def begin_resolving(self, courses: List[dict]):
+        """开始获取jx02id和jx0404id，PENDING 的课程转换为 RESOLVING"""
+        for course in courses:
+            if self.state(course) == CourseState.PENDING:
+                self.transition(course, CourseState.RESOLVING)
+
+    def end_resolving(self, courses: List[dict]):
+        """获取结束，已获取到jx02id和jx0404id的课程转换为 RESOLVED，其余回到 PENDING"""
+        for course in courses:
+            if self.state(course) == CourseState.RESOLVING:
+                resolved = course.get("jx02id") and course.get("jx0404id")
+                self.transition(
+                    course, CourseState.RESOLVED if resolved else CourseState.PENDING
+                )
+
+    def active(self, courses: List[dict]) -> List[dict]:
+        """未处于终止状态、仍需选课的课程"""
+        return [
+            course for course in courses if self.state(course) not in TERMINAL_STATES
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的课程数量"""
+        counts = {state.value: 0 for state in CourseState}
+        with self._lock:
+            for entry in self._entries.values():
+                counts[entry["state"]] += 1
+        return counts
+
+    def _save(self):
+        """将本账号的课程状态写入状态文件，先写临时文件再替换"""
+        if not self.path:
+            return
+        with _file_lock:
+            with self._lock:
+                entries = {key: dict(entry) for key, entry in self._entries.items()}
+            data = _load_state_file(self.path)
+            data[self.section] = entries
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=4)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logging.warning(f"保存课程状态失败: {str(e)}")
+
+
+def mark_selection_result(tracker: Optional[CourseTracker], course, success, reason=""):
+    """根据选课结果更新课程状态，tracker 为None时忽略"""
+    if tracker is None:
+        return
+    tracker.transition(
+        course, CourseState.SELECTED if success else CourseState.GIVEN_UP, reason
+    )
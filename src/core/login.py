@@ -0,0 +1,159 @@
+import re
+import time
+import logging
+from typing import Optional
+
+from src.utils.metrics import increment
+
+BASE_URL = "http://zhjw.qfnu.edu.cn"
+URLS = {
+    "rand_code": f"{BASE_URL}/verifycode.servlet",
+    "login": f"{BASE_URL}/Logon.do?method=logonLdap",
+    "init_data": f"{BASE_URL}/Logon.do?method=logon&flag=sess",
+    "main_page": f"{BASE_URL}/jsxsd/framework/xsMain.jsp",
+    "course_selection": f"{BASE_URL}/jsxsd/xsxk/xklc_list",
+}
+
+# 教务系统验证码为 4 位小写字母和数字，不符合的识别结果无需提交即可判定为错误
+CAPTCHA_PATTERN = re.compile(r"[0-9a-z]{4}")
+# 提交登录的最大次数，请求异常后重试前的等待时间（秒）
+LOGIN_RETRY_ATTEMPTS = 3
+LOGIN_RETRY_DELAY = 1
+# 识别结果格式不符或置信度过低时直接重新获取验证码，不计入重试次数；连续丢弃该张数时计为一次失败
+MAX_CAPTCHA_REJECTS = 5
+
+LOGIN_HEADERS = {
+    "Referer": BASE_URL,
+    "Origin": BASE_URL,
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.116 Safari/537.36",
+}
+
+
+def generate_encoded_string(data_str: str, account: str, password: str) -> str:
+    """生成加密字符串"""
+    code, sxh = data_str.split("#")[:2]
+    data = f"{account}%%%{password}"
+    encoded = []
+    code_idx = 0
+
+    for i in range(min(20, len(data))):
+        encoded.append(data[i])
+        encoded.extend([code[code_idx + j] for j in range(int(sxh[i]))])
+        code_idx += int(sxh[i])
+
+    if len(data) > 20:
+        encoded.append(data[20:])
+
+    return "".join(encoded)
+
+
+def build_login_data(account: str, password: str, code: str, encoded: str) -> dict:
+    """构造登录表单"""
+    return {
+        "userAccount": account,
+        "userPassword": password,
+        "RANDOMCODE": code,
+        "encoded": encoded,
+    }
+
+
+def check_login_response(text: str) -> bool:
+    """检查登录响应，验证码或密码错误时抛出异常"""
+    if "验证码错误" in text:
+        raise ValueError("验证码错误")
+    if "密码错误" in text:
+        raise PermissionError("用户名或密码错误")
+    return True
+
+
+def normalize_captcha(text: str) -> str:
+    """去掉识别结果首尾的空白并转为小写"""
+    return text.strip().lower()
+
+
+def is_valid_captcha(text: str) -> bool:
+    """检查识别结果是否符合验证码的长度和字符集"""
+    return CAPTCHA_PATTERN.fullmatch(text) is not None
+
+
+class LoginAttempts:
+    """
+    登录过程的重试判定，同步和异步后端共用，后端只负责获取验证码和提交登录
+
+    识别结果不符合验证码格式或置信度低于 min_confidence 时不提交，直接重新获取验证码；
+    验证码错误时立即重试，请求异常时等待 LOGIN_RETRY_DELAY 秒后重试，密码错误时不再重试
+    """
+
+    def __init__(
+        self, min_confidence: float = 0.0, max_attempts: int = LOGIN_RETRY_ATTEMPTS
+    ):
+        self.min_confidence = min_confidence
+        self.max_attempts = max_attempts
+        self.attempts = 0
+        self.rejected = 0
+        # 连续丢弃的验证码张数，达到 MAX_CAPTCHA_REJECTS 时计为一次失败，避免识别异常时无限重试
+        self.streak = 0
+        self.start = time.perf_counter()
+
+    def remaining(self) -> bool:
+        """是否还可以继续尝试登录"""
+        return self.attempts < self.max_attempts
+
+    def accept(self, text: str, confidence: Optional[float]) -> Optional[str]:
+        """
+        判断识别结果是否可以提交，可以提交时计为一次登录尝试
+
+        Returns:
+            str: 规范化后的验证码，不应提交时返回None，应重新获取验证码
+        """
+        captcha = normalize_captcha(text)
+        confidence_text = (
+            f"（置信度 {confidence:.2f}）" if confidence is not None else ""
+        )
+        if not is_valid_captcha(captcha) or (
+            confidence is not None and confidence < self.min_confidence
+        ):
+            self.rejected += 1
+            self.streak += 1
+            increment("captcha_rejected")
+            logging.info(
+                f"验证码识别结果 {captcha}{confidence_text} 格式不符或置信度过低，重新获取验证码"
+            )
+            if self.streak >= MAX_CAPTCHA_REJECTS:
+                logging.warning(f"连续 {self.streak} 张验证码识别结果无效")
+                self.attempts += 1
+                self.streak = 0
+            return None
+
+        logging.info(f"验证码识别结果: {captcha}{confidence_text}")
+        self.streak = 0
+        self.attempts += 1
+        return captcha
+
+    def retry_delay(self, error: Exception) -> float:
+        """
+        登录失败后重试前的等待秒数，密码错误时重新抛出异常
+
+        验证码错误（ValueError）时立即用新的验证码重试，其他请求异常时等待 LOGIN_RETRY_DELAY 秒
+        """
+        if isinstance(error, PermissionError):
+            raise error
+        if isinstance(error, ValueError):
+            logging.warning(f"登录失败: {str(error)}")
+            return 0
+        logging.error(f"登录失败: {str(error)}")
+        return LOGIN_RETRY_DELAY
+
+    def fail(self):
+        """尝试次数用尽时抛出异常"""
+        raise Exception("登录超过最大重试次数")
+
+    def succeed(self) -> float:
+        """记录登录耗时和尝试次数，返回耗时（秒）"""
+        elapsed = time.perf_counter() - self.start
+        increment("login_attempts", self.attempts)
+        increment("login_time_ms", round(elapsed * 1000))
+        logging.info(
+            f"登录成功，耗时 {elapsed:.3f}秒，提交登录 {self.attempts} 次，丢弃验证码 {self.rejected} 张"
+        )
+        return elapsed
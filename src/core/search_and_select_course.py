@@ -6,12 +6,169 @@ from src.core.send_course_data import (
     send_xxxkOper_course_jx02id_and_jx0404id,
     send_fawxkOper_course_jx02id_and_jx0404id,
 )
-from src.utils.dingtalk import dingtalk
-from src.utils.feishu import feishu
+from src.utils.notifier import notify_failure, notify_success
+from src.utils.category_cache import (
+    get_course_cache_key,
+    get_oper_category,
+    get_search_category,
+    record_oper_category,
+    is_category_miss,
+    prefer_category,
+)
+from src.utils.session_manager import submit_with_context
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+import threading
+
+# 依次尝试的选课方式：(分类, 方式名称, 选课函数)
+SELECTION_METHODS = [
+    ("Knjxk", "专业内跨年级选课", send_knjxkOper_course_jx02id_and_jx0404id),
+    ("Bxqjhxk", "本学期计划选课", send_bxqjhxkOper_course_jx02id_and_jx0404id),
+    ("Ggxxkxk", "公选课选课", send_ggxxkxkOper_course_jx02id_and_jx0404id),
+    ("Xxxk", "选修选课", send_xxxkOper_course_jx02id_and_jx0404id),
+    ("Fawxk", "计划外选课", send_fawxkOper_course_jx02id_and_jx0404id),
+]
+
+# 并发选课模式共享的线程池，避免每次尝试都创建和销毁线程
+_race_executor = None
+_race_pool_size = 0
+_race_lock = threading.Lock()
+
+
+def configure_race_pool(workers):
+    """
+    按同时选课的课程数设置并发选课线程池，容量为 len(SELECTION_METHODS) * workers
+
+    已有线程池的容量足够时直接复用，不足时创建更大的线程池替换
+    """
+    global _race_executor, _race_pool_size
+    size = len(SELECTION_METHODS) * max(workers, 1)
+    with _race_lock:
+        if _race_executor is None or size > _race_pool_size:
+            if _race_executor is not None:
+                _race_executor.shutdown(wait=False)
+            _race_executor = ThreadPoolExecutor(
+                max_workers=size, thread_name_prefix="race"
+            )
+            _race_pool_size = size
+        return _race_executor
+
+
+def get_race_executor():
+    """获取并发选课线程池，未设置时按单门课程创建"""
+    with _race_lock:
+        executor = _race_executor
+    return executor or configure_race_pool(1)
 
 
-def search_and_select_course(course):
+def send_selection_sequential(
+    course_name, course_jx02id_and_jx0404id, preferred_category=None
+):
+    """
+    按顺序依次尝试各个选课方式，成功后立即返回
+
+    优先的分类明确返回失败、且消息不表示课程不在该分类时（如人数已满、时间冲突），该分类
+    就是课程所在的分类，不再尝试其他分类；请求超时或异常时继续尝试其他分类
+
+    Args:
+        preferred_category: 优先尝试的分类，通常来自选课分类缓存
+
+    Returns:
+        tuple: (是否成功, 按尝试顺序排列的 (分类, 方式名称, 结果, 消息) 列表)
+    """
+    outcomes = []
+    for category, method_name, method_func in prefer_category(
+        SELECTION_METHODS, preferred_category
+    ):
+        result, message = method_func(course_name, course_jx02id_and_jx0404id)
+        outcomes.append((category, method_name, result, message))
+        if result is True:
+            return True, outcomes
+        if (
+            category == preferred_category
+            and result is False
+            and not is_category_miss(message)
+        ):
+            return False, outcomes
+    return False, outcomes
+
+
+def send_selection_race(
+    course_name, course_jx02id_and_jx0404id, preferred_category=None
+):
+    """
+    同时向所有选课方式发送请求，第一个成功的请求胜出，其余请求的结果被忽略
+
+    指定优先的分类时先单独向该分类发送请求，选课成功或明确返回失败、且消息不表示课程不在
+    该分类时直接返回，否则（包括请求超时或异常）再同时向其余分类发送请求
+
+    Returns:
+        tuple: (是否成功, 按尝试顺序排列的 (分类, 方式名称, 结果, 消息) 列表)
+    """
+    first_outcomes = []
+    methods = SELECTION_METHODS
+    for category, method_name, method_func in SELECTION_METHODS:
+        if category != preferred_category:
+            continue
+        result, message = method_func(course_name, course_jx02id_and_jx0404id)
+        first_outcomes = [(category, method_name, result, message)]
+        if result is True or (result is False and not is_category_miss(message)):
+            return result is True, first_outcomes
+        methods = [method for method in methods if method[0] != category]
+
+    executor = get_race_executor()
+    futures = {
+        submit_with_context(
+            executor, method_func, course_name, course_jx02id_and_jx0404id
+        ): (
+            category,
+            method_name,
+        )
+        for category, method_name, method_func in methods
+    }
+    results = {}
+    try:
+        for future in as_completed(futures):
+            category, method_name = futures[future]
+            try:
+                result, message = future.result()
+            except Exception as e:
+                result, message = None, str(e)
+            results[category] = (result, message)
+            if result is True:
+                logging.info(f"【{course_name}】并发选课由【{method_name}】胜出")
+                return True, first_outcomes + [(category, method_name, result, message)]
+    finally:
+        # 已发出的请求无法撤回，不等待剩余请求完成，直接忽略其结果；尚未开始的请求取消
+        for future in futures:
+            future.cancel()
+
+    outcomes = [
+        (category, method_name, *results[category])
+        for category, method_name, _ in methods
+        if category in results
+    ]
+    return False, first_outcomes + outcomes
+
+
+def learn_oper_category(jx0404id, outcomes):
+    """
+    根据选课结果记录该教学班所在的分类
+
+    选课成功的分类优先记录，并替换缓存中的其他分类；没有成功时，返回的失败消息不表示课程
+    不在该分类（如人数已满、时间冲突）的分类作为推测记录，过期后重新确认
+    """
+    for category, _, result, _ in outcomes:
+        if result is True:
+            record_oper_category(jx0404id, category, confirmed=True)
+            return
+    for category, _, result, message in outcomes:
+        if result is False and not is_category_miss(message):
+            record_oper_category(jx0404id, category)
+            return
+
+
+def search_and_select_course(course, race=False):
     """
     通过依次从公选课选课、本学期计划选课、选修选课、专业内跨年级选课、计划外选课、辅修选课搜索课程
 
@@ -25,6 +182,7 @@ def search_and_select_course(course):
             - course_time: 完整的课程时间信息
             - jx02id: 课程jx02id
             - jx0404id: 课程jx0404id
+        race (bool): 是否同时向所有选课方式发送请求，默认依次尝试
 
     Returns:
         bool: 如果成功找到并选择课程返回True，否则返回False
@@ -37,6 +195,7 @@ def search_and_select_course(course):
             return False
 
         error_messages = []  # 用于收集所有错误信息
+        course_key = get_course_cache_key(course)
 
         # 已手动配置jx02id和jx0404id的情况
         if (
@@ -47,31 +206,7 @@ def search_and_select_course(course):
         ):
             logging.critical(f"已手动配置jx02id和jx0404id，跳过搜索直接选课: {course}")
 
-            # 依次尝试不同的选课方式
-            selection_methods = [
-                ("专业内跨年级选课", send_knjxkOper_course_jx02id_and_jx0404id),
-                ("本学期计划选课", send_bxqjhxkOper_course_jx02id_and_jx0404id),
-                ("公选课选课", send_ggxxkxkOper_course_jx02id_and_jx0404id),
-                ("选修选课", send_xxxkOper_course_jx02id_and_jx0404id),
-                ("计划外选课", send_fawxkOper_course_jx02id_and_jx0404id),
-            ]
-
-            for method_name, method_func in selection_methods:
-                result, message = method_func(course["course_id_or_name"], course)
-                if result is True:
-                    dingtalk(
-                        "选课成功 🎉 ✨ 🌟 🎊",
-                        f"课程【{course['course_id_or_name']}-{course['teacher_name']}】选课成功！",
-                    )
-                    feishu(
-                        "选课成功 🎉 ✨ 🌟 🎊",
-                        f"课程【{course['course_id_or_name']}-{course['teacher_name']}】选课成功！",
-                    )
-                    return True
-                elif result is False:
-                    error_messages.append(f"【{method_name}】失败: {message}")
-                elif result is None:
-                    error_messages.append(f"【{method_name}】发生异常: {message}")
+            course_jx02id_and_jx0404id = course
 
         # 未手动配置jx02id和jx0404id的情况
         else:
@@ -83,53 +218,41 @@ def search_and_select_course(course):
                 )
                 return False
             course_jx02id_and_jx0404id = get_course_jx02id_and_jx0404id(course)
-            if course_jx02id_and_jx0404id:
-                selection_methods = [
-                    ("专业内跨年级选课", send_knjxkOper_course_jx02id_and_jx0404id),
-                    ("本学期计划选课", send_bxqjhxkOper_course_jx02id_and_jx0404id),
-                    ("公选课选课", send_ggxxkxkOper_course_jx02id_and_jx0404id),
-                    ("选修选课", send_xxxkOper_course_jx02id_and_jx0404id),
-                    ("计划外选课", send_fawxkOper_course_jx02id_and_jx0404id),
-                ]
-
-                for method_name, method_func in selection_methods:
-                    result, message = method_func(
-                        course["course_id_or_name"], course_jx02id_and_jx0404id
-                    )
-                    if result is True:
-                        dingtalk(
-                            "选课成功 🎉 ✨ 🌟 🎊",
-                            f"课程【{course['course_id_or_name']}-{course['teacher_name']}】选课成功！",
-                        )
-                        feishu(
-                            "选课成功 🎉 ✨ 🌟 🎊",
-                            f"课程【{course['course_id_or_name']}-{course['teacher_name']}】选课成功！",
-                        )
-                        return True
-                    elif result is False:
-                        error_messages.append(f"【{method_name}】失败: {message}")
-                    elif result is None:
-                        error_messages.append(f"【{method_name}】发生异常: {message}")
-
-        # 如果所有尝试都失败，发送错误汇总
-        if error_messages:
-            error_summary = (
-                f"课程【{course['course_id_or_name']}-{course['teacher_name']}】选课失败，遇到以下错误：\n\n"
-                + "\n\n".join(error_messages)
+
+        if course_jx02id_and_jx0404id:
+            jx0404id = course_jx02id_and_jx0404id["jx0404id"]
+            # 优先使用上次接受选课请求的分类，其次使用搜索到课程的分类
+            preferred_category = get_oper_category(jx0404id) or get_search_category(
+                course
+            )
+            send_selection = send_selection_race if race else send_selection_sequential
+            success, outcomes = send_selection(
+                course["course_id_or_name"],
+                course_jx02id_and_jx0404id,
+                preferred_category,
             )
-            dingtalk("选课失败 😭 😢 😔", error_summary)
-            feishu("选课失败 😭 😢 😔", error_summary)
+            learn_oper_category(jx0404id, outcomes)
+            if success:
+                notify_success(
+                    course_key,
+                    "选课成功 🎉 ✨ 🌟 🎊",
+                    f"课程【{course_key}】选课成功！",
+                )
+                return True
+
+            for _, method_name, result, message in outcomes:
+                if result is False:
+                    error_messages.append(f"【{method_name}】失败: {message}")
+                elif result is None:
+                    error_messages.append(f"【{method_name}】发生异常: {message}")
+
+        # 如果所有尝试都失败，记录错误，与该课程的其他失败合并后定期汇总发送
+        if error_messages:
+            notify_failure(course_key, "\n\n".join(error_messages))
         return False
 
     except Exception as e:
         error_msg = str(e)
         logging.error(f"搜索选课失败: {error_msg}")
-        dingtalk(
-            "选课失败 😭 😢 😔",
-            f"课程【{course['course_id_or_name']}-{course['teacher_name']}】选课过程发生异常：{error_msg}",
-        )
-        feishu(
-            "选课失败 😭 😢 😔",
-            f"课程【{course['course_id_or_name']}-{course['teacher_name']}】选课过程发生异常：{error_msg}",
-        )
+        notify_failure(get_course_cache_key(course), f"选课过程发生异常：{error_msg}")
         return False
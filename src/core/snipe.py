@@ -0,0 +1,391 @@
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.core.concurrent_selector import (
+    CourseSelectionResult,
+    get_course_key,
+    run_concurrent_selection,
+)
+from src.core.course_state import CourseTracker, mark_selection_result
+from src.core.search_and_select_course import (
+    SELECTION_METHODS,
+    configure_race_pool,
+    learn_oper_category,
+    send_selection_race,
+)
+from src.core.send_course_data import send_oper_course_jx02id_and_jx0404id
+from src.data.get_course_jx02id_and_jx0404id import (
+    BATCH_PAGE_SIZE,
+    SEARCH_METHODS,
+    fetch_category_courses,
+    search_course_by_api,
+)
+from src.utils.category_cache import (
+    get_oper_category,
+    get_search_category,
+    is_category_miss,
+    record_search_category,
+)
+from src.utils.notifier import notify_success
+from src.utils.rate_controller import RateController
+from src.utils.session_manager import submit_with_context
+
+# 未指定速率控制器时两轮查询之间的间隔（秒）
+DEFAULT_POLL_INTERVAL = 0.5
+# 多门课程合并查询时最多获取的列表页数，分类的课程超过该页数时改为逐门课程查询
+SNIPE_BATCH_MAX_PAGES = 1
+# 出现空余名额时选课仍明确失败的最大次数，达到后放弃该课程；
+# 时间冲突、已选过、学分超限等原因不会因名额出现而改变，继续截胡只会反复失败
+SNIPE_MAX_FAILURES = 3
+
+# 课程数超过 SNIPE_BATCH_MAX_PAGES 页、不再合并查询的分类
+_large_categories = set()
+
+
+def get_remaining_capacity(row) -> Optional[int]:
+    """
+    从列表数据中读取教学班的剩余人数
+
+    优先使用 syrs（剩余人数），其次用 xxrs（限选人数）- xkrs（已选人数）计算，
+    都没有时返回None
+    """
+    try:
+        if row.get("syrs") not in (None, ""):
+            return int(row["syrs"])
+        if row.get("xxrs") not in (None, "") and row.get("xkrs") not in (None, ""):
+            return int(row["xxrs"]) - int(row["xkrs"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def has_capacity(capacity: Optional[int]) -> bool:
+    """是否有空余名额，列表数据中没有人数字段时无法判断，视为没有名额"""
+    return capacity is not None and capacity > 0
+
+
+def pop_unknown_capacity(group: List[dict], capacities) -> List[dict]:
+    """
+    从分组中移除列表数据中没有人数字段的课程并返回
+
+    这些课程无法通过剩余人数判断是否有名额，改为按普通模式反复发送选课请求
+    """
+    unknown = [
+        course
+        for course in group
+        if course["jx0404id"] in capacities and capacities[course["jx0404id"]] is None
+    ]
+    for course in unknown:
+        group.remove(course)
+        logging.warning(
+            f"课程【{get_course_key(course)}】的列表数据中没有剩余人数，无法截胡，改为普通模式选课"
+        )
+    return unknown
+
+
+def should_batch(category, courses: List[dict]) -> bool:
+    """多门课程且分类的课程不超过 SNIPE_BATCH_MAX_PAGES 页时合并为一次列表查询"""
+    return len(courses) > 1 and category not in _large_categories
+
+
+def record_batch_rows(category, rows):
+    """合并查询获取满 SNIPE_BATCH_MAX_PAGES 页时认为分类较大，之后逐门课程查询"""
+    if len(rows) >= SNIPE_BATCH_MAX_PAGES * BATCH_PAGE_SIZE:
+        _large_categories.add(category)
+        logging.info(f"分类 {category} 的课程较多，之后改为逐门课程查询剩余人数")
+
+
+def get_capacities(rows, jx0404ids) -> Dict[str, Optional[int]]:
+    """从列表数据中提取目标教学班的剩余人数"""
+    return {
+        row["jx0404id"]: get_remaining_capacity(row)
+        for row in rows
+        if row.get("jx0404id") in jx0404ids
+    }
+
+
+def poll_capacities(
+    category,
+    courses: List[dict],
+    rate_controller: Optional[RateController] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> Dict[str, Optional[int]]:
+    """
+    查询一个分类中目标教学班的剩余人数
+
+    多门课程且分类较小时合并为一次不带筛选条件的列表查询（最多 SNIPE_BATCH_MAX_PAGES 页），
+    列表中没有出现的课程再单独按课程查询；只有一门课程或分类较大时直接按课程查询。
+    指定速率控制器时每次列表查询前各取一个发送时刻。
+
+    Returns:
+        Dict[str, Optional[int]]: 以 jx0404id 为键的剩余人数，查询不到的教学班不在结果中
+    """
+    jx0404ids = {course["jx0404id"] for course in courses}
+    capacities = {}
+    if should_batch(category, courses):
+        if rate_controller is not None and not rate_controller.acquire(stop_event):
+            return capacities
+        rows = fetch_category_courses(category, max_pages=SNIPE_BATCH_MAX_PAGES)
+        record_batch_rows(category, rows)
+        capacities = get_capacities(rows, jx0404ids)
+
+    for course in courses:
+        if course["jx0404id"] in capacities:
+            continue
+        if rate_controller is not None and not rate_controller.acquire(stop_event):
+            break
+        response = search_course_by_api(category, course)
+        if response:
+            capacities.update(get_capacities(response["aaData"], jx0404ids))
+    return capacities
+
+
+def locate_course(course) -> Optional[str]:
+    """
+    确定课程所在的选课分类
+
+    优先使用选课分类缓存，没有记录时依次在各分类中按课程查询，找到后写入缓存
+    """
+    category = get_oper_category(course["jx0404id"]) or get_search_category(course)
+    if category:
+        return category
+    for category, _ in SEARCH_METHODS:
+        response = search_course_by_api(category, course)
+        if response and get_capacities(response["aaData"], {course["jx0404id"]}):
+            record_search_category(course, category, course["jx0404id"])
+            return category
+    return None
+
+
+def get_failure_reason(outcomes) -> Optional[str]:
+    """选课请求在课程所在分类明确返回失败时的消息，请求超时或异常时返回None"""
+    messages = [
+        str(message)
+        for _, _, result, message in outcomes
+        if result is False and not is_category_miss(message)
+    ]
+    return messages[-1] if messages else None
+
+
+def record_fire_failure(
+    failures: Dict[str, int],
+    result: CourseSelectionResult,
+    course,
+    reason: Optional[str],
+    tracker: Optional[CourseTracker] = None,
+) -> bool:
+    """
+    记录一次出现空余名额时的选课失败，明确失败达到 SNIPE_MAX_FAILURES 次时放弃该课程
+
+    Args:
+        failures: 以课程标识为键的明确失败次数
+        reason: 选课失败的消息，请求超时或异常时为None，不计入失败次数
+
+    Returns:
+        bool: 是否放弃该课程
+    """
+    if reason is None:
+        return False
+    result.last_error = reason
+    failures[result.course_key] = failures.get(result.course_key, 0) + 1
+    if failures[result.course_key] < SNIPE_MAX_FAILURES:
+        return False
+    mark_selection_result(
+        tracker,
+        course,
+        False,
+        f"出现空余名额时连续 {SNIPE_MAX_FAILURES} 次选课失败: {reason}",
+    )
+    logging.warning(
+        f"课程【{result.course_key}】出现空余名额时连续 {SNIPE_MAX_FAILURES} 次选课失败，"
+        f"停止截胡: {reason}"
+    )
+    return True
+
+
+def fire_course(course, category, race=False) -> Tuple[bool, Optional[str]]:
+    """
+    教学班出现空余名额时立即发送选课请求
+
+    Returns:
+        tuple: (是否成功, 明确失败时的消息)
+    """
+    course_key = get_course_key(course)
+    if race:
+        success, outcomes = send_selection_race(
+            course["course_id_or_name"], course, category
+        )
+    else:
+        method_name = next(
+            name for key, name, _ in SELECTION_METHODS if key == category
+        )
+        result, message = send_oper_course_jx02id_and_jx0404id(
+            category, course["course_id_or_name"], course
+        )
+        success, outcomes = result is True, [(category, method_name, result, message)]
+    learn_oper_category(course["jx0404id"], outcomes)
+
+    if success:
+        notify_success(
+            course_key, "选课成功 🎉 ✨ 🌟 🎊", f"课程【{course_key}】截胡成功！"
+        )
+        return True, None
+    return False, get_failure_reason(outcomes)
+
+
+def start_fallback_selection(
+    courses, results, max_workers, stop_event, race, rate_controller, tracker
+) -> threading.Thread:
+    """在后台线程中按普通模式为无法截胡的课程反复发送选课请求，结果写入 results"""
+    context = contextvars.copy_context()
+
+    def run():
+        results.update(
+            context.run(
+                run_concurrent_selection,
+                courses,
+                max_workers=max_workers,
+                interval=0 if rate_controller is not None else DEFAULT_POLL_INTERVAL,
+                stop_event=stop_event,
+                race=race,
+                rate_controller=rate_controller,
+                tracker=tracker,
+            )
+        )
+
+    thread = threading.Thread(target=run, name="snipe-fallback", daemon=True)
+    thread.start()
+    return thread
+
+
+def run_snipe_selection(
+    courses: List[dict],
+    max_workers: int = 0,
+    stop_event: Optional[threading.Event] = None,
+    race: bool = False,
+    rate_controller: Optional[RateController] = None,
+    tracker: Optional[CourseTracker] = None,
+) -> Dict[str, CourseSelectionResult]:
+    """
+    截胡模式：轮询选课列表中目标教学班的剩余人数，出现空余名额时立即发送选课请求
+
+    相比反复发送选课请求，每轮每个分类只需一次列表查询，请求量低且名额出现后能更快响应。
+    课程需要已获取 jx02id 和 jx0404id；列表数据中没有剩余人数的课程改为按普通模式选课，
+    出现空余名额时选课仍连续 SNIPE_MAX_FAILURES 次明确失败的课程放弃截胡。
+
+    Args:
+        courses: 课程信息字典列表
+        max_workers: 同时发送选课请求的最大线程数，为0时与课程数量相同
+        stop_event: 外部停止信号
+        race: 是否同时向所有选课方式发送请求
+        rate_controller: 自适应速率控制器，每次列表查询占用一个发送时刻
+        tracker: 课程状态机，截胡成功或无法截胡时更新其状态
+
+    Returns:
+        Dict[str, CourseSelectionResult]: 以课程标识为键的选课结果
+    """
+    stop_event = stop_event or threading.Event()
+    results = {
+        get_course_key(course): CourseSelectionResult(get_course_key(course))
+        for course in courses
+    }
+    start_time = time.perf_counter()
+
+    # 按所在分类分组，同一分类的课程合并查询
+    groups = {}
+    for course in courses:
+        result = results[get_course_key(course)]
+        if not (course.get("jx02id") and course.get("jx0404id")):
+            result.last_error = "未获取到jx02id和jx0404id"
+            mark_selection_result(tracker, course, False, result.last_error)
+            logging.warning(f"课程【{result.course_key}】未获取到jx0404id，无法截胡")
+            continue
+        category = locate_course(course)
+        if not category:
+            result.last_error = "未在任何分类的选课列表中找到该教学班"
+            mark_selection_result(tracker, course, False, result.last_error)
+            logging.warning(f"课程【{result.course_key}】{result.last_error}，无法截胡")
+            continue
+        groups.setdefault(category, []).append(course)
+
+    pending = sum(len(group) for group in groups.values())
+    if not pending:
+        return results
+    logging.info(f"开始截胡，课程数: {pending}，查询分类: {', '.join(groups)}")
+
+    if race:
+        configure_race_pool(max_workers or pending)
+    polls = 0
+    fallbacks = []
+    failures = {}
+    with ThreadPoolExecutor(
+        max_workers=max_workers or pending, thread_name_prefix="snipe"
+    ) as executor:
+        while groups and not stop_event.is_set():
+            if (
+                rate_controller is None
+                and polls
+                and stop_event.wait(DEFAULT_POLL_INTERVAL)
+            ):
+                break
+            polls += 1
+
+            futures = {}
+            for category, group in groups.items():
+                capacities = poll_capacities(
+                    category, group, rate_controller, stop_event
+                )
+                unknown = pop_unknown_capacity(group, capacities)
+                if unknown:
+                    fallbacks.append(
+                        start_fallback_selection(
+                            unknown,
+                            results,
+                            max_workers,
+                            stop_event,
+                            race,
+                            rate_controller,
+                            tracker,
+                        )
+                    )
+                for course in group:
+                    if course["jx0404id"] in capacities and has_capacity(
+                        capacities[course["jx0404id"]]
+                    ):
+                        logging.critical(
+                            f"课程【{get_course_key(course)}】出现空余名额: "
+                            f"{capacities[course['jx0404id']]}，立即选课"
+                        )
+                        future = submit_with_context(
+                            executor, fire_course, course, category, race
+                        )
+                        futures[future] = (category, course)
+
+            for future, (category, course) in futures.items():
+                result = results[get_course_key(course)]
+                result.attempts += 1
+                result.elapsed = time.perf_counter() - start_time
+                reason = None
+                try:
+                    result.success, reason = future.result()
+                except Exception as e:
+                    result.last_error = str(e)
+                    logging.error(f"课程【{result.course_key}】截胡选课异常: {str(e)}")
+                if result.success:
+                    groups[category].remove(course)
+                    mark_selection_result(tracker, course, True)
+                    logging.critical(
+                        f"课程【{result.course_key}】截胡成功，查询轮数: {polls}，耗时: {result.elapsed:.3f}秒"
+                    )
+                elif record_fire_failure(failures, result, course, reason, tracker):
+                    groups[category].remove(course)
+            groups = {category: group for category, group in groups.items() if group}
+
+    logging.info(f"截胡结束，共查询 {polls} 轮")
+    for thread in fallbacks:
+        thread.join()
+    return results
@@ -0,0 +1,465 @@
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+CATALOG_VERSION = 2
+
+# 数值列及其存储类型，其余列存为字符串表中的编号
+NUMERIC_COLUMNS = {
+    "xf": np.float32,  # 学分
+    "xxrs": np.int32,  # 限选人数
+    "xkrs": np.int32,  # 已选人数
+    "syrs": np.int32,  # 剩余人数
+    "pkrs": np.int32,  # 排课人数
+    "zxs": np.int32,  # 总学时
+    "jx0504id": np.int64,
+}
+
+# 取值重复度高的分类列，所有字符串列共用一个字符串表，这些列的编号数组尤其紧凑
+CATEGORICAL_COLUMNS = ["dwmc", "xqmc", "kcxzmc", "skls", "kkdw", "szkcflmc"]
+
+# 缺失值：字符串列编号为 -1，整数列为该类型的最小值，浮点列为 NaN
+MISSING_CODE = -1
+
+# 哈希索引：索引名 -> 键的列，构建目录时一并生成
+INDEX_KEYS = {
+    "jx0404id": ("jx0404id",),
+    "kch": ("kch",),
+    "kch_skls": ("kch", "skls"),
+    "kcmc": ("kcmc",),
+}
+
+
+def get_catalog_path(json_path):
+    """课程数据 JSON 文件对应的列式目录，例如 all_courses.json -> all_courses.catalog"""
+    return os.path.splitext(json_path)[0] + ".catalog"
+
+
+def get_source_fingerprint(json_path, with_hash=True) -> dict:
+    """课程数据文件的修改时间、大小和 SHA-256，用于判断目录是否需要重新生成"""
+    stat = os.stat(json_path)
+    fingerprint = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(json_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        fingerprint["sha256"] = digest.hexdigest()
+    return fingerprint
+
+
+def hash_key(values) -> int:
+    """哈希索引的键哈希，多列的键以单元分隔符连接后计算 CRC32，结果不随进程变化"""
+    return zlib.crc32("\x1f".join(values).encode("utf-8"))
+
+
+def _missing_value(dtype):
+    if np.issubdtype(dtype, np.floating):
+        return np.nan
+    return np.iinfo(dtype).min
+
+
+def _to_number(value, dtype):
+    """将原始值转换为数值，无法转换时返回缺失值"""
+    try:
+        if value is None or value == "":
+            return _missing_value(dtype)
+        return dtype(float(value)) if np.issubdtype(dtype, np.floating) else int(value)
+    except (TypeError, ValueError):
+        return _missing_value(dtype)
+
+
+class HashIndex:
+    """
+    以数组存储的哈希索引
+
+    键哈希按桶排序：第 b 个桶的教学班下标为 rows[offsets[b]:offsets[b + 1]]，
+    桶数为 2 的幂。两个数组都可以内存映射，查询时只读取一个桶，
+    再比较候选教学班的实际取值排除哈希冲突。
+    """
+
+    def __init__(self, columns: Tuple[str, ...], offsets, rows):
+        self.columns = tuple(columns)
+        self.offsets = offsets
+        self.rows = rows
+
+    @staticmethod
+    def key_of(catalog: "CourseCatalog", columns, row) -> List[str]:
+        """教学班在索引列上的取值，缺失值按空字符串处理"""
+        return [
+            catalog.string(int(catalog.column(name)[row])) or "" for name in columns
+        ]
+
+    @classmethod
+    def build(cls, catalog: "CourseCatalog", columns) -> "HashIndex":
+        """为目录中的一列或多列建立索引"""
+        hashes = np.fromiter(
+            (
+                hash_key(cls.key_of(catalog, columns, row))
+                for row in range(catalog.size)
+            ),
+            np.uint32,
+            catalog.size,
+        )
+        buckets = 1 << max(catalog.size - 1, 0).bit_length()
+        slots = hashes & np.uint32(buckets - 1)
+        offsets = np.zeros(buckets + 1, dtype=np.int32)
+        np.cumsum(np.bincount(slots, minlength=buckets), out=offsets[1:])
+        rows = np.argsort(slots, kind="stable").astype(np.int32)
+        return cls(columns, offsets, rows)
+
+    def lookup(self, catalog: "CourseCatalog", values) -> np.ndarray:
+        """查找键等于 values 的教学班下标，按原始顺序排列"""
+        values = list(values)
+        buckets = len(self.offsets) - 1
+        bucket = hash_key(values) & (buckets - 1)
+        candidates = self.rows[self.offsets[bucket] : self.offsets[bucket + 1]]
+        return np.array(
+            [
+                row
+                for row in candidates
+                if self.key_of(catalog, self.columns, row) == values
+            ],
+            dtype=np.int64,
+        )
+
+
+class CourseCatalog:
+    """
+    列式存储的课程数据
+
+    每列为一个 numpy 数组：数值列直接存储数值，其他列存储字符串表中的编号，
+    同一字符串（如开课单位、校区、教师）在整个目录中只存一份。字符串表为一段
+    UTF-8 字节加偏移数组，保存为 .npy 文件后可通过内存映射按需读取，
+    加载时不需要解析整个数据集。
+
+    JSON 列（原始值不是字符串的非数值列，如 ctsm）按 JSON 文本存入字符串表，读取时还原。
+    """
+
+    def __init__(self, size, columns, blob, offsets, indexes=None, source=None):
+        """
+        Args:
+            size: 教学班数量
+            columns: 列名 -> (类型, 数组)，类型为 "number"、"string" 或 "json"
+            blob: 字符串表的 UTF-8 字节
+            offsets: 字符串表的偏移数组，第 i 个字符串为 blob[offsets[i]:offsets[i + 1]]
+            indexes: 索引名 -> HashIndex
+            source: 生成目录的课程数据文件指纹，见 get_source_fingerprint
+        """
+        self.size = size
+        self.columns = columns
+        self.blob = blob
+        self.offsets = offsets
+        self.indexes = indexes or {}
+        self.source = source
+        self._codes = None
+
+    def __len__(self):
+        return self.size
+
+    @classmethod
+    def build(cls, records: List[dict]) -> "CourseCatalog":
+        """从课程数据字典列表构建"""
+        names = []
+        for record in records:
+            for name in record:
+                if name not in names:
+                    names.append(name)
+
+        strings = {}
+
+        def intern(value):
+            if value is None:
+                return MISSING_CODE
+            return strings.setdefault(value, len(strings))
+
+        columns = {}
+        for name in names:
+            values = [record.get(name) for record in records]
+            if name in NUMERIC_COLUMNS:
+                dtype = NUMERIC_COLUMNS[name]
+                array = np.array([_to_number(v, dtype) for v in values], dtype=dtype)
+                columns[name] = ("number", array)
+                continue
+            kind = "string"
+            if any(v is not None and not isinstance(v, str) for v in values):
+                kind = "json"
+                values = [
+                    None if v is None else json.dumps(v, ensure_ascii=False)
+                    for v in values
+                ]
+            codes = np.array([intern(v) for v in values], dtype=np.int32)
+            columns[name] = (kind, codes)
+
+        encoded = [value.encode("utf-8") for value in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        catalog = cls(len(records), columns, blob, offsets)
+        catalog._codes = strings
+        return catalog
+
+    @classmethod
+    def from_json(cls, json_path) -> "CourseCatalog":
+        """从 merge_json.py 生成的课程数据文件构建"""
+        with open(json_path, "r", encoding="utf-8") as f:
+            return cls.build(json.load(f).get("aaData", []))
+
+    def save(self, path):
+        """保存为目录，每列一个 .npy 文件，先写入临时目录再替换，避免读到写了一半的目录"""
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        meta = {
+            "version": CATALOG_VERSION,
+            "size": self.size,
+            "source": self.source,
+            "columns": {},
+            "indexes": {},
+        }
+        for index, (name, (kind, array)) in enumerate(self.columns.items()):
+            filename = f"column_{index}.npy"
+            np.save(os.path.join(tmp_path, filename), array)
+            meta["columns"][name] = {"kind": kind, "file": filename}
+        for name, index in self.indexes.items():
+            np.save(os.path.join(tmp_path, f"index_{name}_offsets.npy"), index.offsets)
+            np.save(os.path.join(tmp_path, f"index_{name}_rows.npy"), index.rows)
+            meta["indexes"][name] = list(index.columns)
+        np.save(os.path.join(tmp_path, "strings.npy"), self.blob)
+        np.save(os.path.join(tmp_path, "string_offsets.npy"), self.offsets)
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, mmap=True) -> "CourseCatalog":
+        """从目录加载，mmap 为True时以内存映射方式打开各列，只在访问时读取"""
+        mmap_mode = "r" if mmap else None
+        meta = read_catalog_meta(path)
+        if meta.get("version") != CATALOG_VERSION:
+            raise ValueError(f"不支持的课程目录版本: {meta.get('version')}")
+        columns = {
+            name: (
+                column["kind"],
+                np.load(os.path.join(path, column["file"]), mmap_mode=mmap_mode),
+            )
+            for name, column in meta["columns"].items()
+        }
+        indexes = {
+            name: HashIndex(
+                index_columns,
+                np.load(
+                    os.path.join(path, f"index_{name}_offsets.npy"), mmap_mode=mmap_mode
+                ),
+                np.load(
+                    os.path.join(path, f"index_{name}_rows.npy"), mmap_mode=mmap_mode
+                ),
+            )
+            for name, index_columns in meta["indexes"].items()
+        }
+        return cls(
+            meta["size"],
+            columns,
+            np.load(os.path.join(path, "strings.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, "string_offsets.npy"), mmap_mode=mmap_mode),
+            indexes,
+            meta.get("source"),
+        )
+
+    def build_indexes(self, keys=None):
+        """建立哈希索引，keys 为索引名 -> 键的列，默认为 INDEX_KEYS 中列都存在的索引"""
+        for name, columns in (keys or INDEX_KEYS).items():
+            if all(
+                self.columns.get(column, ("",))[0] == "string" for column in columns
+            ):
+                self.indexes[name] = HashIndex.build(self, columns)
+
+    def lookup(self, index_name, *values) -> np.ndarray:
+        """
+        通过哈希索引查找教学班，不需要读取整个目录
+
+        例如 catalog.lookup("kch_skls", "g20200010", "张三")
+
+        Returns:
+            np.ndarray: 键等于 values 的教学班下标，按原始顺序排列
+        """
+        return self.indexes[index_name].lookup(self, values)
+
+    def string(self, code) -> Optional[str]:
+        """按编号读取字符串表中的字符串"""
+        if code < 0:
+            return None
+        start, end = self.offsets[code], self.offsets[code + 1]
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+    def code_of(self, value) -> Optional[int]:
+        """字符串在字符串表中的编号，不存在时返回None，首次调用时建立反查表"""
+        if self._codes is None:
+            self._codes = {
+                self.string(code): code for code in range(len(self.offsets) - 1)
+            }
+        return self._codes.get(value)
+
+    def column(self, name) -> np.ndarray:
+        """原始列数组，字符串列为编号数组"""
+        return self.columns[name][1]
+
+    def _decode(self, kind, raw):
+        if kind == "number":
+            return raw.item()
+        value = self.string(int(raw))
+        if kind == "json" and value is not None:
+            return json.loads(value)
+        return value
+
+    def get(self, index, names=None) -> dict:
+        """读取第 index 个教学班，names 指定只读取部分列，缺失的值不包含在结果中"""
+        record = {}
+        for name in names or self.columns:
+            kind, array = self.columns[name]
+            raw = array[index]
+            if kind == "number":
+                if np.issubdtype(array.dtype, np.floating):
+                    if np.isnan(raw):
+                        continue
+                elif raw == _missing_value(array.dtype):
+                    continue
+            elif raw < 0:
+                continue
+            record[name] = self._decode(kind, raw)
+        return record
+
+    def records(self, indices=None, names=None) -> List[dict]:
+        """读取多个教学班，indices 为None时读取全部"""
+        if indices is None:
+            indices = range(self.size)
+        return [self.get(int(index), names) for index in indices]
+
+    def mask(self, name, condition) -> np.ndarray:
+        """
+        计算单列条件的布尔数组
+
+        Args:
+            condition: 字符串列为取值或取值列表；数值列为取值、取值列表或
+                (最小值, 最大值) 闭区间，区间一端为None时不限制
+        """
+        kind, array = self.columns[name]
+        if kind == "number":
+            if isinstance(condition, tuple):
+                low, high = condition
+                result = np.ones(self.size, dtype=bool)
+                if low is not None:
+                    result &= array >= low
+                if high is not None:
+                    result &= array <= high
+                return result
+            if isinstance(condition, (list, set)):
+                return np.isin(array, list(condition))
+            return array == condition
+
+        values = condition if isinstance(condition, (list, set)) else [condition]
+        if kind == "json":
+            values = [json.dumps(value, ensure_ascii=False) for value in values]
+        codes = [self.code_of(value) for value in values]
+        codes = [code for code in codes if code is not None]
+        if not codes:
+            return np.zeros(self.size, dtype=bool)
+        return np.isin(array, codes)
+
+    def where(self, **conditions) -> np.ndarray:
+        """
+        按多列条件筛选，返回满足所有条件的教学班下标
+
+        例如 catalog.where(xqmc="曲阜校区", kcxzmc="公共选修课", syrs=(1, None))
+        """
+        result = np.ones(self.size, dtype=bool)
+        for name, condition in conditions.items():
+            if name not in self.columns:
+                return np.zeros(0, dtype=np.int64)
+            result &= self.mask(name, condition)
+        return result.nonzero()[0]
+
+    def memory_usage(self) -> Dict[str, int]:
+        """各部分占用的字节数"""
+        usage = {name: array.nbytes for name, (_, array) in self.columns.items()}
+        usage["strings"] = self.blob.nbytes + self.offsets.nbytes
+        for name, index in self.indexes.items():
+            usage[f"index_{name}"] = index.offsets.nbytes + index.rows.nbytes
+        return usage
+
+
+def read_catalog_meta(path) -> dict:
+    """读取目录的 meta.json"""
+    with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_catalog(json_path, catalog_path=None) -> CourseCatalog:
+    """将课程数据 JSON 文件转换为列式目录，建立哈希索引并保存"""
+    catalog_path = catalog_path or get_catalog_path(json_path)
+    start = time.perf_counter()
+    source = get_source_fingerprint(json_path)
+    catalog = CourseCatalog.from_json(json_path)
+    catalog.build_indexes()
+    catalog.source = source
+    catalog.save(catalog_path)
+    logging.info(
+        f"已生成课程目录 {catalog_path}，共 {len(catalog)} 个教学班，"
+        f"{len(catalog.offsets) - 1} 个不同字符串，耗时 {time.perf_counter() - start:.3f}秒"
+    )
+    return catalog
+
+
+def ensure_catalog(json_path, catalog_path=None) -> CourseCatalog:
+    """
+    打开课程数据文件对应的目录，目录不存在或已过期时重新生成
+
+    课程数据文件的修改时间和大小与目录记录的一致时直接打开；不一致时再比较 SHA-256，
+    内容未变（如文件被重新复制）只更新目录记录的修改时间，内容变化才重新生成。
+    """
+    catalog_path = catalog_path or get_catalog_path(json_path)
+    try:
+        meta = read_catalog_meta(catalog_path)
+    except (OSError, ValueError):
+        meta = {}
+    source = meta.get("source") or {}
+    if meta.get("version") == CATALOG_VERSION and source:
+        fingerprint = get_source_fingerprint(json_path, with_hash=False)
+        if all(source.get(key) == value for key, value in fingerprint.items()):
+            return CourseCatalog.load(catalog_path)
+        fingerprint = get_source_fingerprint(json_path)
+        if fingerprint["sha256"] == source.get("sha256"):
+            meta["source"] = fingerprint
+            tmp_file = os.path.join(catalog_path, "meta.json.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_file, os.path.join(catalog_path, "meta.json"))
+            logging.info(f"课程数据 {json_path} 内容未变化，继续使用课程目录")
+            return CourseCatalog.load(catalog_path)
+    logging.info(f"课程目录 {catalog_path} 不存在或已过期，重新生成")
+    build_catalog(json_path, catalog_path)
+    return CourseCatalog.load(catalog_path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    source = sys.argv[1] if len(sys.argv) > 1 else "course_data/all_courses.json"
+    catalog = build_catalog(source)
+    usage = catalog.memory_usage()
+    print(f"列式存储占用: {sum(usage.values()) / 1024:.1f} KB")
+    for name in CATEGORICAL_COLUMNS:
+        if name in catalog.columns:
+            codes = catalog.column(name)
+            print(
+                f"{name}: {len(np.unique(codes))} 个取值，编号数组 {codes.nbytes} 字节"
+            )
@@ -0,0 +1,215 @@
+import re
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+WEEKDAYS = {"一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "日": 7, "天": 7}
+
+# 匹配单个上课时间段，例如 "1-18周 星期四 9-10节"、"13-14单周 星期五 3-4节"
+SKSJ_PATTERN = re.compile(
+    r"([\d,\-]+)([单双]?)周\s*星期([一二三四五六日天])\s*(\d+)(?:-(\d+))?节"
+)
+
+# 周次位图支持的最大周次，第 n 周对应第 n 位
+MAX_WEEK = 63
+ODD_WEEKS = sum(1 << week for week in range(1, MAX_WEEK + 1, 2))
+EVEN_WEEKS = sum(1 << week for week in range(2, MAX_WEEK + 1, 2))
+ALL_WEEKS = ODD_WEEKS | EVEN_WEEKS
+
+
+class ScheduleSlot(NamedTuple):
+    """单个上课时间段"""
+
+    weeks: int  # 周次位图，第 n 周对应第 n 位
+    week_day: int  # 星期，1-7
+    start: int  # 开始节次
+    end: int  # 结束节次
+
+
+def parse_weeks(weeks_str, parity="") -> int:
+    """
+    解析周次字符串为周次位图
+
+    Args:
+        weeks_str: 周次，例如 "1-18"、"1,3,5,7"、"2-6,8"
+        parity: "单" 只保留单周，"双" 只保留双周，空字符串不过滤
+
+    Returns:
+        int: 周次位图，超出 MAX_WEEK 的周次被忽略
+    """
+    mask = 0
+    for part in weeks_str.split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-")[:2]
+            if not start or not end:
+                continue
+            start, end = int(start), min(int(end), MAX_WEEK)
+            if start <= end:
+                mask |= ((1 << (end - start + 1)) - 1) << start
+        elif int(part) <= MAX_WEEK:
+            mask |= 1 << int(part)
+    if parity == "单":
+        mask &= ODD_WEEKS
+    elif parity == "双":
+        mask &= EVEN_WEEKS
+    return mask
+
+
+def weeks_of(mask) -> List[int]:
+    """将周次位图还原为按升序排列的周次列表"""
+    return [week for week in range(1, MAX_WEEK + 1) if mask >> week & 1]
+
+
+def parse_sksj(sksj) -> List[ScheduleSlot]:
+    """解析上课时间字符串，多个时间段以 <br> 分隔"""
+    slots = []
+    for match in SKSJ_PATTERN.finditer(sksj or ""):
+        weeks_str, parity, week_day, start, end = match.groups()
+        slots.append(
+            ScheduleSlot(
+                parse_weeks(weeks_str, parity),
+                WEEKDAYS[week_day],
+                int(start),
+                int(end or start),
+            )
+        )
+    return slots
+
+
+def parse_class_period(class_period):
+    """解析配置中的上课节次，例如 "3-4-"、"9-10-11"，返回节次集合"""
+    return {int(period) for period in re.findall(r"\d+", class_period or "")}
+
+
+def period_mask(start, end) -> int:
+    """节次范围 [start, end] 的位图，第 n 节对应第 n 位"""
+    return ((1 << (end - start + 1)) - 1) << start if start <= end else 0
+
+
+def parse_week_type(week_type) -> Optional[int]:
+    """
+    解析配置中的单双周要求为允许的周次位图
+
+    Args:
+        week_type: "odd" 单周，"even" 双周，"all" 或空不限，
+            其他值按周次字符串解析，例如 "1-8"、"1,3,5"
+
+    Returns:
+        Optional[int]: 允许的周次位图，不限时返回None
+    """
+    if not week_type or week_type == "all":
+        return None
+    if week_type == "odd":
+        return ODD_WEEKS
+    if week_type == "even":
+        return EVEN_WEEKS
+    return parse_weeks(str(week_type))
+
+
+class ScheduleTable:
+    """
+    多个教学班上课时间段的列式存储，供 ScheduleMatcher 向量化匹配
+
+    每个时间段占一行，row 为所属教学班在原始数据中的下标
+    """
+
+    def __init__(self, schedules: List[List[ScheduleSlot]]):
+        slots = [(row, slot) for row, items in enumerate(schedules) for slot in items]
+        self.size = len(schedules)
+        self.row = np.fromiter((row for row, _ in slots), np.int64, len(slots))
+        self.weeks = np.fromiter(
+            (slot.weeks for _, slot in slots), np.uint64, len(slots)
+        )
+        self.week_day = np.fromiter(
+            (slot.week_day for _, slot in slots), np.int8, len(slots)
+        )
+        self.periods = np.fromiter(
+            (period_mask(slot.start, slot.end) for _, slot in slots),
+            np.uint64,
+            len(slots),
+        )
+        self.has_slots = np.zeros(self.size, dtype=bool)
+        self.has_slots[self.row] = True
+
+    @classmethod
+    def from_sksj(cls, sksj_list):
+        """从上课时间字符串列表构建"""
+        return cls([parse_sksj(sksj) for sksj in sksj_list])
+
+
+class ScheduleMatcher:
+    """
+    预编译的上课时间匹配器
+
+    星期、节次、周次要求在构造时编译为整数和位图，之后对单个时间段的匹配
+    只需几次整数比较，对 ScheduleTable 的匹配则完全向量化。
+
+    匹配规则：
+        - 星期：时间段的星期等于配置的星期
+        - 节次：配置的任一节次落在时间段的节次范围内
+        - 周次：时间段的全部周次都在允许的周次内
+        - 没有上课时间的教学班（如实践环节）只在没有任何要求时匹配
+    """
+
+    def __init__(self, week_day="", class_period="", week_type="all"):
+        self.week_day = int(week_day) if str(week_day or "").strip() else 0
+        self.periods = 0
+        for period in parse_class_period(class_period):
+            self.periods |= 1 << period
+        self.allowed_weeks = parse_week_type(week_type)
+
+    @classmethod
+    def for_course(cls, course):
+        """根据课程配置构建匹配器"""
+        return cls(
+            course.get("week_day") or "",
+            course.get("class_period") or "",
+            course.get("week_type") or "all",
+        )
+
+    @property
+    def unrestricted(self):
+        """是否没有任何时间要求"""
+        return not self.week_day and not self.periods and self.allowed_weeks is None
+
+    def match_slot(self, slot: ScheduleSlot) -> bool:
+        """判断单个时间段是否满足要求"""
+        if self.week_day and slot.week_day != self.week_day:
+            return False
+        if self.periods and not self.periods & period_mask(slot.start, slot.end):
+            return False
+        if self.allowed_weeks is not None and (
+            not slot.weeks or slot.weeks & ~self.allowed_weeks
+        ):
+            return False
+        return True
+
+    def match(self, slots: List[ScheduleSlot]) -> bool:
+        """判断教学班的任一时间段是否满足要求"""
+        if not slots:
+            return self.unrestricted
+        return any(self.match_slot(slot) for slot in slots)
+
+    def match_table(self, table: ScheduleTable) -> np.ndarray:
+        """
+        向量化匹配所有教学班
+
+        Returns:
+            np.ndarray: 长度为教学班数量的布尔数组
+        """
+        ok = np.ones(len(table.row), dtype=bool)
+        if self.week_day:
+            ok &= table.week_day == self.week_day
+        if self.periods:
+            ok &= (table.periods & np.uint64(self.periods)) != 0
+        if self.allowed_weeks is not None:
+            ok &= table.weeks != 0
+            ok &= (table.weeks & np.uint64(~self.allowed_weeks & ALL_WEEKS)) == 0
+
+        result = np.zeros(table.size, dtype=bool)
+        np.logical_or.at(result, table.row, ok)
+        if self.unrestricted:
+            result |= ~table.has_slots
+        return result
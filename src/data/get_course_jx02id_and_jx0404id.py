@@ -1,6 +1,21 @@
 import os
 import json
-from src.utils.session_manager import get_session
+from src.utils.session_manager import (
+    get_session,
+    is_page_entered,
+    mark_page_entered,
+    invalidate_entered_pages,
+)
+from src.utils.category_cache import (
+    get_search_category,
+    record_search_category,
+    prefer_category,
+)
+from src.data.course_schedule import ScheduleMatcher, ScheduleTable
+from src.data.local_course_index import (
+    LocalCourseIndex,
+    get_course_jx02id_and_jx0404id_by_local,
+)
 import logging
 
 
@@ -11,40 +26,29 @@ def find_course_jx02id_and_jx0404id(course, course_data):
         if not course_data:
             return None
 
-        # 获取课程的单双周信息
-        week_type = course.get(
-            "week_type", "all"
-        )  # 可选值: "odd"单周, "even"双周, "all"不限
-
-        # 遍历所有匹配的课程数据
-        for data in course_data:
-            # 提取jx02id和jx0404id
-            jx02id = data.get("jx02id")
-            jx0404id = data.get("jx0404id")
-
-            # 基本信息匹配，先判断名称老师是否匹配，以防后面匹配周次强包容性无问题但名称老师不匹配
-            if (
-                data.get("kch") != course["course_id_or_name"]
-                or data.get("skls") != course["teacher_name"]
-            ):
-                continue
-
-            # 从sksj中提取周次信息
-            sksj = data.get("sksj", "")
-
-            # 判断是否匹配周次
-            weeks_match = True
-            if week_type != "all" and "周" in sksj:
-                weeks_str = sksj.split("周")[0].strip()
-                # 单周固定模式："1,3,5,7,9,11,13,15,17"
-                # 双周固定模式："2,4,6,8,10,12,14,16,18"
-                if week_type == "odd" and weeks_str != "1,3,5,7,9,11,13,15,17":
-                    weeks_match = False
-                elif week_type == "even" and weeks_str != "2,4,6,8,10,12,14,16,18":
-                    weeks_match = False
-
-            # 确保两个ID都存在且周次匹配
-            if jx02id and jx0404id and weeks_match:
+        # 课程的单双周要求，可选值: "odd"单周, "even"双周, "all"不限，或自定义周次如 "1-8"
+        # 星期和节次已由API按 skxq/skjc 筛选，这里只匹配周次
+        week_matcher = ScheduleMatcher(week_type=course.get("week_type") or "all")
+
+        # 基本信息匹配，先按名称老师筛选出两个ID都存在的教学班，以防后面匹配周次强包容性无问题但名称老师不匹配
+        candidates = [
+            data
+            for data in course_data
+            if data.get("kch") == course["course_id_or_name"]
+            and data.get("skls") == course["teacher_name"]
+            and data.get("jx02id")
+            and data.get("jx0404id")
+        ]
+
+        if candidates:
+            # 从sksj中解析上课时间段，对所有候选教学班向量化匹配周次，没有上课时间的课程不限制周次
+            table = ScheduleTable.from_sksj(
+                [data.get("sksj", "") for data in candidates]
+            )
+            matched = week_matcher.match_table(table) | ~table.has_slots
+            for row in matched.nonzero()[0]:
+                jx02id = candidates[row]["jx02id"]
+                jx0404id = candidates[row]["jx0404id"]
                 logging.critical(
                     f"找到课程 【{course['course_id_or_name']}-{course['teacher_name']}】 的jx02id: {jx02id} 和 jx0404id: {jx0404id}"
                 )
@@ -61,44 +65,28 @@ def find_course_jx02id_and_jx0404id(course, course_data):
 def get_course_jx02id_and_jx0404id_by_api(course):
     """通过教务系统API获取课程的jx02id和jx0404id"""
     try:
-        # 依次从专业内跨年级选课、本学期计划选课、选修选课、公选课选课、计划外选课、辅修选课搜索课程
-        result = get_course_jx02id_and_jx0404id_xsxkKnjxk_by_api(course)
-        if result:
-            result = find_course_jx02id_and_jx0404id(course, result["aaData"])
-            if result:
-                return result
-
-        result = get_course_jx02id_and_jx0404id_xsxkBxqjhxk_by_api(course)
-        if result:
-            result = find_course_jx02id_and_jx0404id(course, result["aaData"])
-            if result:
-                return result
-
-        result = get_course_jx02id_and_jx0404id_xsxkXxxk_by_api(course)
-        if result:
-            result = find_course_jx02id_and_jx0404id(course, result["aaData"])
-            if result:
-                return result
-
-        result = get_course_jx02id_and_jx0404id_xsxkGgxxkxk_by_api(course)
-        if result:
-            result = find_course_jx02id_and_jx0404id(course, result["aaData"])
-            if result:
-                return result
-
-        result = get_course_jx02id_and_jx0404id_xsxkFawxk_by_api(course)
-        if result:
-            result = find_course_jx02id_and_jx0404id(course, result["aaData"])
+        # 依次从专业内跨年级选课、本学期计划选课、选修选课、公选课选课、计划外选课搜索课程
+        # 上次搜索到该课程的分类优先搜索
+        search_methods = prefer_category(SEARCH_METHODS, get_search_category(course))
+        for category, search_func in search_methods:
+            result = search_func(course)
             if result:
-                return result
+                result = find_course_jx02id_and_jx0404id(course, result["aaData"])
+                if result:
+                    record_search_category(course, category, result["jx0404id"])
+                    return result
     except Exception as e:
         logging.error(f"获取课程的jx02id和jx0404id失败: {e}")
         return None
 
 
 def get_course_jx02id_and_jx0404id(course):
-    """通过API获取课程的jx02id和jx0404id"""
+    """获取课程的jx02id和jx0404id，优先从本地课程数据查找，未找到时通过API获取"""
     try:
+        result = get_course_jx02id_and_jx0404id_by_local(course)
+        if result:
+            return result
+
         result = get_course_jx02id_and_jx0404id_by_api(course)
         if result:
             return result
@@ -112,316 +100,297 @@ def get_course_jx02id_and_jx0404id(course):
         return None
 
 
-def get_course_jx02id_and_jx0404id_xsxkGgxxkxk_by_api(course):
-    """通过教务系统API获取公选课课程的jx02id和jx0404id"""
+# 选修、本学期计划、专业内跨年级、计划外选课列表共用的数据列
+COMMON_COLUMNS = [
+    "kch",
+    "kcmc",
+    "fzmc",
+    "ktmc",
+    "xf",
+    "skls",
+    "sksj",
+    "skdd",
+    "xqmc",
+    "ctsm",
+    "czOper",
+]
+
+# 搜索课程时每页的条数
+SEARCH_PAGE_SIZE = 15
+# 批量获取整个分类的课程列表时每页的条数
+BATCH_PAGE_SIZE = 500
+
+# 各选课分类的搜索请求信息
+SEARCH_CATEGORIES = {
+    "Ggxxkxk": {
+        "name": "公选选课",
+        "page": "comeInGgxxkxk",
+        "list": "xsxkGgxxkxk",
+        "i_columns": 13,
+        "columns": [
+            "kch",
+            "kcmc",
+            "xf",
+            "skls",
+            "sksj",
+            "skdd",
+            "xqmc",
+            "xxrs",
+            "xkrs",
+            "syrs",
+            "ctsm",
+            "szkcflmc",
+            "czOper",
+        ],
+        "extra_params": {"szjylb": ""},
+    },
+    "Xxxk": {
+        "name": "选修选课",
+        "page": "comeInXxxk",
+        "list": "xsxkXxxk",
+        "i_columns": 11,
+        "columns": COMMON_COLUMNS,
+    },
+    "Bxqjhxk": {
+        "name": "本学期计划选课",
+        "page": "comeInBxqjhxk",
+        "list": "xsxkBxqjhxk",
+        "i_columns": 12,
+        "columns": COMMON_COLUMNS,
+    },
+    "Knjxk": {
+        "name": "专业内跨年级选课",
+        "page": "comeInKnjxk",
+        "list": "xsxkKnjxk",
+        "i_columns": 12,
+        "columns": COMMON_COLUMNS,
+    },
+    "Fawxk": {
+        "name": "计划外选课",
+        "page": "comeInFawxk",
+        "list": "xsxkFawxk",
+        "i_columns": 12,
+        "columns": COMMON_COLUMNS,
+    },
+}
+
+
+def build_search_request(
+    category, course=None, display_start=0, display_length=SEARCH_PAGE_SIZE
+):
+    """
+    构造课程搜索请求
+
+    Args:
+        category: 选课分类
+        course: 课程信息，为None时不按课程筛选，返回该分类的全部课程
+        display_start: 分页起始位置
+        display_length: 每页条数
+
+    Returns:
+        tuple: (选课页面地址, 列表数据地址, 请求参数, 表单数据)
+    """
+    spec = SEARCH_CATEGORIES[category]
+    page_url = f"http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/{spec['page']}"
+    list_url = f"http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/{spec['list']}"
+    course = course or {}
+    params = {
+        "kcxx": course.get("course_id_or_name", ""),  # 课程名称
+        "skls": course.get("teacher_name", ""),  # 教师姓名
+        "skxq": course.get("week_day", ""),  # 上课星期
+        "skjc": course.get("class_period", ""),  # 上课节次
+        **spec.get("extra_params", {}),
+        "sfym": "false",  # 是否已满
+        "sfct": "false",  # 是否冲突
+        "sfxx": "false",  # 是否限选
+    }
+    data = {
+        "sEcho": 1,
+        "iColumns": spec["i_columns"],
+        "sColumns": "",
+        "iDisplayStart": display_start,
+        "iDisplayLength": display_length,
+        **{f"mDataProp_{i}": column for i, column in enumerate(spec["columns"])},
+    }
+    return page_url, list_url, params, data
+
+
+def parse_search_response(category, text):
+    """解析课程搜索的列表数据，数据为空或不是JSON格式时返回None"""
+    name = SEARCH_CATEGORIES[category]["name"]
     try:
-        session = get_session()
-        course_id = course["course_id_or_name"]
-        teacher_name = course["teacher_name"]
-        class_period = course["class_period"]
-        week_day = course["week_day"]
-        # 选修选课页面
-        response = session.get(
-            "http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/comeInXxxk",
-        )
-        logging.info(f"获取公选选课页面响应值: {response.status_code}")
-
-        # 请求选课列表数据
-        response = session.post(
-            "http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/xsxkGgxxkxk",
-            params={
-                "kcxx": course_id,  # 课程名称
-                "skls": teacher_name,  # 教师姓名
-                "skxq": week_day,  # 上课星期
-                "skjc": class_period,  # 上课节次
-                "szjylb": "",
-                "sfym": "false",  # 是否已满
-                "sfct": "false",  # 是否冲突
-                "sfxx": "false",  # 是否限选
-            },
-            data={
-                "sEcho": 1,
-                "iColumns": 13,
-                "sColumns": "",
-                "iDisplayStart": 0,
-                "iDisplayLength": 15,
-                "mDataProp_0": "kch",
-                "mDataProp_1": "kcmc",
-                "mDataProp_2": "xf",
-                "mDataProp_3": "skls",
-                "mDataProp_4": "sksj",
-                "mDataProp_5": "skdd",
-                "mDataProp_6": "xqmc",
-                "mDataProp_7": "xxrs",
-                "mDataProp_8": "xkrs",
-                "mDataProp_9": "syrs",
-                "mDataProp_10": "ctsm",
-                "mDataProp_11": "szkcflmc",
-                "mDataProp_12": "czOper",
-            },
-        )
-
-        logging.info(f"获取公选选课列表数据响应值: {response.status_code}")
-        response_data = json.loads(response.text)
-        # 检查aaData是否为空
-        if not response_data.get("aaData"):
-            logging.warning("公选选课的API返回的aaData为空，可能该课程不在该分类")
-            return None
+        response_data = json.loads(text)
+    except ValueError:
+        logging.error(f"{name}的API返回的数据不是有效的JSON格式")
+        return None
 
-        return response_data
-    except Exception as e:
-        logging.error(f"获取公选选课的jx02id和jx0404id失败: {e}")
+    # 检查aaData是否为空
+    if not response_data.get("aaData"):
+        logging.warning(f"{name}的API返回的aaData为空，可能该课程不在该分类")
         return None
 
+    return response_data
 
-def get_course_jx02id_and_jx0404id_xsxkXxxk_by_api(course):
-    """通过教务系统API获取选修课课程的jx02id和jx0404id"""
-    try:
-        session = get_session()
-        course_id = course["course_id_or_name"]
-        teacher_name = course["teacher_name"]
-        class_period = course["class_period"]
-        week_day = course["week_day"]
-
-        # 选修选课页面
-        response = session.get(
-            "http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/comeInXxxk",
-        )
-        logging.info(f"获取选修选课页面响应值: {response.status_code}")
-
-        # 请求选课列表数据
-        response = session.post(
-            "http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/xsxkXxxk",
-            params={
-                "kcxx": course_id,  # 课程名称
-                "skls": teacher_name,  # 教师姓名
-                "skxq": week_day,  # 上课星期
-                "skjc": class_period,  # 上课节次
-                "sfym": "false",  # 是否已满
-                "sfct": "false",  # 是否冲突
-                "sfxx": "false",  # 是否限选
-            },
-            data={
-                "sEcho": 1,
-                "iColumns": 11,
-                "sColumns": "",
-                "iDisplayStart": 0,
-                "iDisplayLength": 15,
-                "mDataProp_0": "kch",
-                "mDataProp_1": "kcmc",
-                "mDataProp_2": "fzmc",
-                "mDataProp_3": "ktmc",
-                "mDataProp_4": "xf",
-                "mDataProp_5": "skls",
-                "mDataProp_6": "sksj",
-                "mDataProp_7": "skdd",
-                "mDataProp_8": "xqmc",
-                "mDataProp_9": "ctsm",
-                "mDataProp_10": "czOper",
-            },
-        )
 
-        logging.info(f"获取选修选课列表数据响应值: {response.status_code}")
-        response_data = json.loads(response.text)
+def is_context_lost(text):
+    """列表请求返回的不是JSON（通常是登录页或提示页）时，说明服务器丢失了选课上下文"""
+    return not text.lstrip().startswith("{")
 
-        # 检查aaData是否为空
-        if not response_data.get("aaData"):
-            logging.warning("选修选课的API返回的aaData为空，可能该课程不在该分类")
-            return None
 
-        return response_data
-    except Exception as e:
-        logging.error(f"获取选修选课的jx02id和jx0404id失败: {e}")
-        return None
+def enter_category_page(session, category, page_url):
+    """进入分类的选课页面，同一会话每个页面只访问一次"""
+    page = SEARCH_CATEGORIES[category]["page"]
+    if is_page_entered(session, page):
+        return
+    response = session.get(page_url)
+    logging.info(
+        f"获取{SEARCH_CATEGORIES[category]['name']}页面响应值: {response.status_code}"
+    )
+    mark_page_entered(session, page)
 
 
-def get_course_jx02id_and_jx0404id_xsxkBxqjhxk_by_api(course):
-    """通过教务系统API获取本学期计划选课课程的jx02id和jx0404id"""
-    try:
-        session = get_session()
-        course_id = course["course_id_or_name"]
-        teacher_name = course["teacher_name"]
-        class_period = course["class_period"]
-        week_day = course["week_day"]
-
-        # 选修选课页面
-        response = session.get(
-            "http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/comeInBxqjhxk",
-        )
-        logging.info(f"获取本学期计划选课页面响应值: {response.status_code}")
-
-        # 请求选课列表数据
-        response = session.post(
-            "http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/xsxkBxqjhxk",
-            params={
-                "kcxx": course_id,  # 课程名称
-                "skls": teacher_name,  # 教师姓名
-                "skxq": week_day,  # 上课星期
-                "skjc": class_period,  # 上课节次
-                "sfym": "false",  # 是否已满
-                "sfct": "false",  # 是否冲突
-                "sfxx": "false",  # 是否限选
-            },
-            data={
-                "sEcho": 1,
-                "iColumns": 12,
-                "sColumns": "",
-                "iDisplayStart": 0,
-                "iDisplayLength": 15,
-                "mDataProp_0": "kch",
-                "mDataProp_1": "kcmc",
-                "mDataProp_2": "fzmc",
-                "mDataProp_3": "ktmc",
-                "mDataProp_4": "xf",
-                "mDataProp_5": "skls",
-                "mDataProp_6": "sksj",
-                "mDataProp_7": "skdd",
-                "mDataProp_8": "xqmc",
-                "mDataProp_9": "ctsm",
-                "mDataProp_10": "czOper",
-            },
-        )
+def post_category_list(session, category, page_url, list_url, params, data):
+    """
+    请求分类的列表数据
 
-        logging.info(f"获取本学期计划选课列表数据响应值: {response.status_code}")
-        response_data = json.loads(response.text)
+    首次请求前进入该分类的选课页面；服务器丢失选课上下文时清除已进入页面的记录，
+    重新进入选课页面后重试一次
+
+    Returns:
+        str: 响应内容
+    """
+    name = SEARCH_CATEGORIES[category]["name"]
+    enter_category_page(session, category, page_url)
+    response = session.post(list_url, params=params, data=data)
+    logging.info(f"获取{name}列表数据响应值: {response.status_code}")
+    if is_context_lost(response.text):
+        logging.warning(f"{name}的选课上下文已丢失，重新进入选课页面")
+        invalidate_entered_pages(session)
+        enter_category_page(session, category, page_url)
+        response = session.post(list_url, params=params, data=data)
+        logging.info(f"获取{name}列表数据响应值: {response.status_code}")
+    return response.text
 
-        # 检查aaData是否为空
-        if not response_data.get("aaData"):
-            logging.warning("本学期计划选课的API返回的aaData为空，可能该课程不在该分类")
-            return None
 
-        return response_data
+def search_course_by_api(category, course=None, display_length=SEARCH_PAGE_SIZE):
+    """通过教务系统API在指定分类中搜索课程，course 为None时获取该分类的全部课程"""
+    name = SEARCH_CATEGORIES[category]["name"]
+    try:
+        session = get_session()
+        page_url, list_url, params, data = build_search_request(
+            category, course, display_length=display_length
+        )
+        text = post_category_list(session, category, page_url, list_url, params, data)
+        return parse_search_response(category, text)
     except Exception as e:
-        logging.error(f"获取本学期计划选课的jx02id和jx0404id失败: {e}")
+        logging.error(f"获取{name}的jx02id和jx0404id失败: {e}")
         return None
 
 
-def get_course_jx02id_and_jx0404id_xsxkKnjxk_by_api(course):
-    """通过教务系统API获取专业内跨年级选课课程的jx02id和jx0404id"""
+def fetch_category_courses(category, page_size=BATCH_PAGE_SIZE, max_pages=0):
+    """
+    分页获取指定分类的全部课程，直到获取的条数达到 iTotalRecords
+
+    Args:
+        max_pages: 最多获取的页数，为0时不限制
+
+    Returns:
+        list: 课程列表数据，请求失败时返回已获取的部分
+    """
+    name = SEARCH_CATEGORIES[category]["name"]
+    rows = []
+    pages = 0
     try:
         session = get_session()
-        course_id = course["course_id_or_name"]
-        teacher_name = course["teacher_name"]
-        class_period = course["class_period"]
-        week_day = course["week_day"]
-
-        # 专业内跨年级选课页面
-        response = session.get(
-            "http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/comeInKnjxk",
-        )
-        logging.info(f"获取专业内跨年级选课页面响应值: {response.status_code}")
-
-        # 请求选课列表数据
-        response = session.post(
-            "http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/xsxkKnjxk",
-            params={
-                "kcxx": course_id,  # 课程名称
-                "skls": teacher_name,  # 教师姓名
-                "skxq": week_day,  # 上课星期
-                "skjc": class_period,  # 上课节次
-                "sfym": "false",  # 是否已满
-                "sfct": "false",  # 是否冲突
-                "sfxx": "false",  # 是否限选
-            },
-            data={
-                "sEcho": 1,
-                "iColumns": 12,
-                "sColumns": "",
-                "iDisplayStart": 0,
-                "iDisplayLength": 15,
-                "mDataProp_0": "kch",
-                "mDataProp_1": "kcmc",
-                "mDataProp_2": "fzmc",
-                "mDataProp_3": "ktmc",
-                "mDataProp_4": "xf",
-                "mDataProp_5": "skls",
-                "mDataProp_6": "sksj",
-                "mDataProp_7": "skdd",
-                "mDataProp_8": "xqmc",
-                "mDataProp_9": "ctsm",
-                "mDataProp_10": "czOper",
-            },
+        page_url, list_url, params, data = build_search_request(
+            category, display_length=page_size
         )
+        while True:
+            text = post_category_list(
+                session, category, page_url, list_url, params, data
+            )
+            response_data = parse_search_response(category, text)
+            if not response_data:
+                break
+            rows.extend(response_data["aaData"])
+            pages += 1
+            total = int(response_data.get("iTotalRecords") or 0)
+            if len(rows) >= total or (max_pages and pages >= max_pages):
+                break
+            data["iDisplayStart"] = len(rows)
+        logging.info(f"获取{name}课程列表 {len(rows)} 条")
+    except Exception as e:
+        logging.error(f"获取{name}课程列表失败: {e}")
+    return rows
+
+
+def resolve_courses_by_api_batch(courses):
+    """
+    批量通过API获取课程的jx02id和jx0404id
+
+    每个分类只分页拉取一次完整的课程列表，在内存中匹配所有课程，
+    请求数只与分类数有关，与课程数无关。所有课程都找到后不再拉取剩余分类。
+
+    Args:
+        courses: 课程配置字典列表，找到的jx02id和jx0404id直接写入字典
+
+    Returns:
+        int: 补全的课程数量
+    """
+    pending = [
+        course
+        for course in courses
+        if not (course.get("jx02id") and course.get("jx0404id"))
+    ]
+    resolved = 0
+    for category, _ in SEARCH_METHODS:
+        if not pending:
+            break
+        index = LocalCourseIndex(fetch_category_courses(category))
+        for course in list(pending):
+            result = index.find(course)
+            if not result:
+                continue
+            logging.critical(
+                f"找到课程 【{course['course_id_or_name']}-{course['teacher_name']}】 的jx02id: {result['jx02id']} 和 jx0404id: {result['jx0404id']}"
+            )
+            course.update(result)
+            record_search_category(course, category, result["jx0404id"])
+            pending.remove(course)
+            resolved += 1
+    return resolved
 
-        logging.info(f"获取专业内跨年级选课列表数据响应值: {response.status_code}")
 
-        # 新增代码：检查响应内容是否为JSON格式
-        try:
-            response_data = json.loads(response.text)
+def get_course_jx02id_and_jx0404id_xsxkGgxxkxk_by_api(course):
+    """通过教务系统API获取公选课课程的jx02id和jx0404id"""
+    return search_course_by_api("Ggxxkxk", course)
 
-            # 检查aaData是否为空
-            if not response_data.get("aaData"):
-                logging.warning(
-                    "专业内跨年级选课的API返回的aaData为空，可能该课程不在该分类"
-                )
-                return None
 
-            return response_data
-        except ValueError:
-            logging.error("API返回的数据不是有效的JSON格式")
-            return None
+def get_course_jx02id_and_jx0404id_xsxkXxxk_by_api(course):
+    """通过教务系统API获取选修课课程的jx02id和jx0404id"""
+    return search_course_by_api("Xxxk", course)
+
+
+def get_course_jx02id_and_jx0404id_xsxkBxqjhxk_by_api(course):
+    """通过教务系统API获取本学期计划选课课程的jx02id和jx0404id"""
+    return search_course_by_api("Bxqjhxk", course)
 
-    except Exception as e:
-        logging.error(f"获取专业内跨年级选课的jx02id和jx0404id失败: {e}")
-        return None
+
+def get_course_jx02id_and_jx0404id_xsxkKnjxk_by_api(course):
+    """通过教务系统API获取专业内跨年级选课课程的jx02id和jx0404id"""
+    return search_course_by_api("Knjxk", course)
 
 
 def get_course_jx02id_and_jx0404id_xsxkFawxk_by_api(course):
     """通过教务系统API获取计划外选课课程的jx02id和jx0404id"""
-    try:
-        session = get_session()
-        course_id = course["course_id_or_name"]
-        teacher_name = course["teacher_name"]
-        class_period = course["class_period"]
-        week_day = course["week_day"]
-
-        # 计划外选课页面
-        response = session.get(
-            "http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/comeInFawxk",
-        )
-        logging.info(f"获取计划外选课页面响应值: {response.status_code}")
-
-        # 请求选课列表数据
-        response = session.post(
-            "http://zhjw.qfnu.edu.cn/jsxsd/xsxkkc/xsxkFawxk",
-            params={
-                "kcxx": course_id,  # 课程名称
-                "skls": teacher_name,  # 教师姓名
-                "skxq": week_day,  # 上课星期
-                "skjc": class_period,  # 上课节次
-                "sfym": "false",  # 是否已满
-                "sfct": "false",  # 是否冲突
-                "sfxx": "false",  # 是否限选
-            },
-            data={
-                "sEcho": 1,
-                "iColumns": 12,
-                "sColumns": "",
-                "iDisplayStart": 0,
-                "iDisplayLength": 15,
-                "mDataProp_0": "kch",
-                "mDataProp_1": "kcmc",
-                "mDataProp_2": "fzmc",
-                "mDataProp_3": "ktmc",
-                "mDataProp_4": "xf",
-                "mDataProp_5": "skls",
-                "mDataProp_6": "sksj",
-                "mDataProp_7": "skdd",
-                "mDataProp_8": "xqmc",
-                "mDataProp_9": "ctsm",
-                "mDataProp_10": "czOper",
-            },
-        )
+    return search_course_by_api("Fawxk", course)
 
-        logging.info(f"获取计划外选课列表数据响应值: {response.status_code}")
-        response_data = json.loads(response.text)
 
-        # 检查aaData是否为空
-        if not response_data.get("aaData"):
-            logging.warning("计划外选课的API返回的aaData为空，可能该课程不在该分类")
-            return None
-
-        return response_data
-    except Exception as e:
-        logging.error(f"获取计划外选课的jx02id和jx0404id失败: {e}")
-        return None
+# 搜索课程的分类及对应的搜索函数，按默认搜索顺序排列
+SEARCH_METHODS = [
+    ("Knjxk", get_course_jx02id_and_jx0404id_xsxkKnjxk_by_api),
+    ("Bxqjhxk", get_course_jx02id_and_jx0404id_xsxkBxqjhxk_by_api),
+    ("Xxxk", get_course_jx02id_and_jx0404id_xsxkXxxk_by_api),
+    ("Ggxxkxk", get_course_jx02id_and_jx0404id_xsxkGgxxkxk_by_api),
+    ("Fawxk", get_course_jx02id_and_jx0404id_xsxkFawxk_by_api),
+]
@@ -0,0 +1,200 @@
+import os
+import json
+import logging
+import threading
+from collections import defaultdict
+from src.data.course_schedule import ScheduleMatcher, parse_sksj
+from src.data.course_catalog import CourseCatalog, ensure_catalog
+
+# 本地课程数据文件，由 course_data/merge_json.py 合并生成
+DEFAULT_COURSE_DATA_PATH = os.path.join("course_data", "all_courses.json")
+
+# 建立索引需要的列
+INDEX_COLUMNS = ["kch", "kcmc", "skls", "sksj", "jx02id", "jx0404id"]
+
+_course_data_path = DEFAULT_COURSE_DATA_PATH
+_index = None
+_index_lock = threading.Lock()
+
+
+class LocalCourseIndex:
+    """基于本地课程数据的内存索引，用于在不请求教务系统的情况下获取jx02id和jx0404id"""
+
+    def __init__(self, records):
+        self.records = []
+        self.by_kch_skls = defaultdict(list)
+        self.by_kcmc = defaultdict(list)
+        self.by_teacher = defaultdict(list)
+
+        for data in records:
+            if not data.get("jx02id") or not data.get("jx0404id"):
+                continue
+            record = {
+                "kch": data.get("kch", ""),
+                "kcmc": data.get("kcmc", ""),
+                "skls": data.get("skls", ""),
+                "sksj": data.get("sksj", ""),
+                "jx02id": data["jx02id"],
+                "jx0404id": data["jx0404id"],
+                "slots": parse_sksj(data.get("sksj", "")),
+            }
+            self.records.append(record)
+            self.by_kch_skls[(record["kch"], record["skls"])].append(record)
+            self.by_kcmc[record["kcmc"]].append(record)
+            self.by_teacher[record["skls"]].append(record)
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def load(cls, path):
+        """
+        从 merge_json.py 生成的课程数据文件加载索引
+
+        优先打开课程数据对应的列式目录（不存在或已过期时自动重新生成），
+        通过目录中的哈希索引按需查询；目录无法生成时读取整个 JSON 文件
+        """
+        try:
+            return MappedCourseIndex(ensure_catalog(path))
+        except OSError as e:
+            logging.warning(f"无法生成课程目录，改为读取课程数据文件: {str(e)}")
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("aaData", []))
+
+    def find_candidates(self, course_id_or_name, teacher_name):
+        """按课程编号或课程名称和教师姓名查找候选教学班"""
+        candidates = self.by_kch_skls.get((course_id_or_name, teacher_name))
+        if candidates:
+            return candidates
+        return [
+            record
+            for record in self.by_teacher.get(teacher_name, [])
+            if record["kcmc"] == course_id_or_name
+        ]
+
+    def find(self, course):
+        """
+        查找课程的jx02id和jx0404id
+
+        Args:
+            course (dict): 课程配置，使用 course_id_or_name、teacher_name、
+                week_day、class_period、week_type 进行匹配
+
+        Returns:
+            Optional[dict]: {"jx02id": ..., "jx0404id": ...}，未找到返回None
+        """
+        matcher = ScheduleMatcher.for_course(course)
+        for record in self.find_candidates(
+            course["course_id_or_name"], course["teacher_name"]
+        ):
+            if matcher.match(record["slots"]):
+                return {"jx02id": record["jx02id"], "jx0404id": record["jx0404id"]}
+        return None
+
+
+class MappedCourseIndex(LocalCourseIndex):
+    """
+    基于课程目录哈希索引的本地课程索引
+
+    目录以内存映射方式打开，查找时只读取命中的教学班，不需要在启动时解析全部课程数据。
+    """
+
+    def __init__(self, catalog: CourseCatalog):
+        self.catalog = catalog
+
+    def __len__(self):
+        valid = self.catalog.column("jx02id") >= 0
+        valid &= self.catalog.column("jx0404id") >= 0
+        return int(valid.sum())
+
+    def _record(self, row):
+        data = self.catalog.get(int(row), INDEX_COLUMNS)
+        if not data.get("jx02id") or not data.get("jx0404id"):
+            return None
+        record = {name: data.get(name, "") for name in INDEX_COLUMNS}
+        record["slots"] = parse_sksj(record["sksj"])
+        return record
+
+    def _records_at(self, rows):
+        records = (self._record(row) for row in rows)
+        return [record for record in records if record]
+
+    def find_candidates(self, course_id_or_name, teacher_name):
+        candidates = self._records_at(
+            self.catalog.lookup("kch_skls", course_id_or_name, teacher_name)
+        )
+        if candidates:
+            return candidates
+        return [
+            record
+            for record in self._records_at(
+                self.catalog.lookup("kcmc", course_id_or_name)
+            )
+            if record["skls"] == teacher_name
+        ]
+
+
+def set_course_data_path(path):
+    """设置本地课程数据文件路径，为空时禁用本地查找"""
+    global _course_data_path, _index
+    with _index_lock:
+        _course_data_path = path
+        _index = None
+
+
+def get_local_course_index():
+    """获取本地课程索引，首次调用时加载，文件不存在时返回None"""
+    global _index, _course_data_path
+    with _index_lock:
+        if _index is None and _course_data_path:
+            if not os.path.exists(_course_data_path):
+                logging.info(f"未找到本地课程数据 {_course_data_path}，跳过本地查找")
+                _course_data_path = ""
+                return None
+            try:
+                _index = LocalCourseIndex.load(_course_data_path)
+                logging.info(
+                    f"已加载本地课程数据 {_course_data_path}，共 {len(_index)} 个教学班"
+                )
+            except (OSError, ValueError) as e:
+                logging.error(f"加载本地课程数据失败: {str(e)}")
+                _course_data_path = ""
+                return None
+        return _index
+
+
+def get_course_jx02id_and_jx0404id_by_local(course):
+    """通过本地课程数据获取课程的jx02id和jx0404id"""
+    index = get_local_course_index()
+    if index is None:
+        return None
+    result = index.find(course)
+    if result:
+        logging.info(
+            f"从本地课程数据找到课程【{course['course_id_or_name']}-{course['teacher_name']}】的jx02id: {result['jx02id']} 和 jx0404id: {result['jx0404id']}"
+        )
+    return result
+
+
+def resolve_courses_locally(courses):
+    """
+    在选课开始前通过本地课程数据补全课程的jx02id和jx0404id
+
+    已手动配置jx02id和jx0404id的课程保持不变，本地未找到的课程在选课时再通过API搜索
+
+    Args:
+        courses: 课程配置字典列表，找到的jx02id和jx0404id直接写入字典
+
+    Returns:
+        int: 通过本地数据补全的课程数量
+    """
+    resolved = 0
+    for course in courses:
+        if course.get("jx02id") and course.get("jx0404id"):
+            continue
+        result = get_course_jx02id_and_jx0404id_by_local(course)
+        if result:
+            course.update(result)
+            resolved += 1
+    return resolved
@@ -0,0 +1,95 @@
+import os
+import json
+import time
+from src.data.course_schedule import (
+    ScheduleMatcher,
+    ScheduleTable,
+    parse_sksj,
+    weeks_of,
+)
+
+if __name__ == "__main__":
+    # 测试数据集：上课时间、匹配要求和预期结果
+    test_cases = [
+        {
+            "name": "测试1：1-18周不是单周课程",
+            "sksj": "1-18周 星期二 5-6节",
+            "filters": {"week_type": "odd"},
+            "expected": False,
+        },
+        {
+            "name": "测试2：单周区间写法",
+            "sksj": "1-17单周 星期二 5-6节",
+            "filters": {"week_type": "odd"},
+            "expected": True,
+        },
+        {
+            "name": "测试3：单周列举写法",
+            "sksj": "1,3,5,7,9,11,13,15,17周 星期二 5-6节",
+            "filters": {"week_type": "odd"},
+            "expected": True,
+        },
+        {
+            "name": "测试4：双周课程不满足单周要求",
+            "sksj": "2-18双周 星期二 5-6节",
+            "filters": {"week_type": "odd"},
+            "expected": False,
+        },
+        {
+            "name": "测试5：自定义周次",
+            "sksj": "1-8周 星期四 7-8节",
+            "filters": {"week_type": "1-9", "week_day": "4", "class_period": "8"},
+            "expected": True,
+        },
+        {
+            "name": "测试6：多个时间段任一满足即可",
+            "sksj": "1-9周 星期四 9-10节<br>10-18周 星期三 9-10节",
+            "filters": {"week_day": "3", "class_period": "9-10-"},
+            "expected": True,
+        },
+        {
+            "name": "测试7：节次不匹配",
+            "sksj": "1-18周 星期一 1-2节",
+            "filters": {"week_day": "1", "class_period": "3-4-"},
+            "expected": False,
+        },
+    ]
+
+    print("开始测试...\n")
+    for test_case in test_cases:
+        print(f"执行: {test_case['name']}")
+        slots = parse_sksj(test_case["sksj"])
+        print(f"上课时间: {test_case['sksj']}")
+        print(
+            f"解析结果: {[(weeks_of(s.weeks), s.week_day, s.start, s.end) for s in slots]}"
+        )
+        matcher = ScheduleMatcher(**test_case["filters"])
+        result = matcher.match(slots)
+        vectorised = bool(matcher.match_table(ScheduleTable([slots]))[0])
+        print(
+            f"预期结果: {test_case['expected']}，实际结果: {result}，向量化结果: {vectorised}"
+        )
+        passed = result == vectorised == test_case["expected"]
+        print(f"测试结果: {'通过' if passed else '失败'}")
+        print("-" * 50 + "\n")
+
+    # 在完整课程数据上比较逐条匹配和向量化匹配的结果与耗时
+    path = os.path.join("course_data", "all_courses.json")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            schedules = [parse_sksj(row.get("sksj")) for row in json.load(f)["aaData"]]
+        table = ScheduleTable(schedules)
+        matcher = ScheduleMatcher(week_day="2", class_period="3", week_type="all")
+
+        start = time.perf_counter()
+        expected = [matcher.match(slots) for slots in schedules]
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = matcher.match_table(table)
+        vector_time = time.perf_counter() - start
+
+        print(f"完整课程数据: {len(schedules)} 个教学班，匹配 {int(result.sum())} 个")
+        print(f"逐条匹配耗时: {scalar_time * 1000:.3f}毫秒")
+        print(f"向量化匹配耗时: {vector_time * 1000:.3f}毫秒")
+        print(f"测试结果: {'通过' if list(result) == expected else '失败'}")
@@ -1,12 +1,166 @@
-import ddddocr
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple
 
-ocr = ddddocr.DdddOcr(show_ad=False)
+from PIL import Image
+
+# 预热用的空白验证码图片尺寸，与教务系统验证码一致
+WARMUP_IMAGE_SIZE = (80, 30)
+
+
+def decode_probability(result) -> Tuple[str, float]:
+    """
+    解码 classification(probability=True) 的识别结果
+
+    与 ddddocr 相同按 CTC 规则解码：取每个时间步概率最大的字符，合并连续重复的字符并去掉
+    空白符（字符集第 0 项）。置信度为输出的各字符概率之积；部分 ddddocr 版本对整个输出
+    而不是每个时间步做 softmax，因此先按时间步重新归一化。
+
+    Returns:
+        tuple: (识别结果, 置信度)
+    """
+    charsets = result["charsets"]
+    text = []
+    confidence = 1.0
+    last = None
+    for probability in result["probability"]:
+        probability = list(probability)
+        index = max(range(len(probability)), key=probability.__getitem__)
+        if index != last and index != 0:
+            text.append(charsets[index])
+            confidence *= float(probability[index]) / float(sum(probability))
+        last = index
+    return "".join(text), confidence
+
+
+class OcrService:
+    """
+    验证码识别服务
+
+    模型在专用的识别线程中加载，加载后用一张空白图片预热，之后的识别请求也在该线程中
+    依次执行。start 只提交加载任务、立即返回，可以在程序启动时调用，使模型加载与登录前的
+    网络请求并行；加载完成前提交的识别请求排在加载任务之后执行。
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr")
+        self._ocr = None
+        self._loaded: Optional[Future] = None
+        self._lock = threading.Lock()
+        self.load_time = None
+        self.warmup_time = None
+        self.recognitions = 0
+        self.inference_time = 0.0
+
+    def start(self) -> Future:
+        """开始在识别线程中加载模型，加载失败后再次调用时重新加载"""
+        with self._lock:
+            if self._loaded is None or (
+                self._loaded.done() and self._loaded.exception() is not None
+            ):
+                self._loaded = self._executor.submit(self._load)
+            return self._loaded
+
+    def _load(self):
+        start = time.perf_counter()
+        # 按需导入，导入 ddddocr 和加载模型耗时较长
+        import ddddocr
+
+        ocr = ddddocr.DdddOcr(show_ad=False)
+        self.load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ocr.classification(Image.new("RGB", WARMUP_IMAGE_SIZE, "white"))
+        self.warmup_time = time.perf_counter() - start
+        self._ocr = ocr
+        logging.info(
+            f"验证码识别模型加载完成，加载耗时 {self.load_time:.3f}秒，"
+            f"预热耗时 {self.warmup_time:.3f}秒"
+        )
+
+    def submit(self, image, probability: bool = False) -> Future:
+        """
+        提交识别请求，返回识别结果的 Future
+
+        Args:
+            probability: 为True时结果为 (识别结果, 置信度)，ddddocr 不支持输出概率时置信度为None
+        """
+        loaded = self.start()
+        submitted = time.perf_counter()
+
+        def classify():
+            # 模型加载失败时抛出加载时的异常
+            loaded.result()
+            start = time.perf_counter()
+            if not probability:
+                result = self._ocr.classification(image)
+            else:
+                try:
+                    result = decode_probability(
+                        self._ocr.classification(image, probability=True)
+                    )
+                except TypeError:
+                    result = (self._ocr.classification(image), None)
+            elapsed = time.perf_counter() - start
+            self.recognitions += 1
+            self.inference_time += elapsed
+            logging.info(
+                f"验证码识别耗时 {elapsed * 1000:.1f}毫秒，"
+                f"排队等待 {(start - submitted) * 1000:.1f}毫秒"
+            )
+            return result
+
+        return self._executor.submit(classify)
+
+    def recognize(self, image, timeout: Optional[float] = None) -> str:
+        """识别验证码，在识别线程中执行并等待结果"""
+        return self.submit(image).result(timeout)
+
+    def recognize_with_confidence(
+        self, image, timeout: Optional[float] = None
+    ) -> Tuple[str, Optional[float]]:
+        """识别验证码并给出置信度"""
+        return self.submit(image, probability=True).result(timeout)
+
+    def stats(self) -> dict:
+        """模型加载和预热耗时、识别次数和平均识别耗时（秒）"""
+        return {
+            "load_time": self.load_time,
+            "warmup_time": self.warmup_time,
+            "recognitions": self.recognitions,
+            "avg_inference_time": (
+                self.inference_time / self.recognitions if self.recognitions else None
+            ),
+        }
+
+
+# 所有账号共享的识别服务
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_ocr_service() -> OcrService:
+    """获取验证码识别服务，首次调用时创建"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = OcrService()
+        return _service
+
+
+def start_ocr_service() -> Future:
+    """在后台开始加载验证码识别模型，立即返回"""
+    return get_ocr_service().start()
 
 
 def get_ocr_res(cap_pic_bytes):  # 识别验证码
-    res = ocr.classification(cap_pic_bytes)
-    return res
+    return get_ocr_service().recognize(cap_pic_bytes)
 
 
 if __name__ == "__main__":
-    get_ocr_res("123")
+    service = get_ocr_service()
+    service.start().result()
+    service.recognize(Image.new("RGB", WARMUP_IMAGE_SIZE, "white"))
+    print(service.stats())
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import logging
+import threading
+
+# 选课分类缓存文件，记录课程所在的搜索分类和选课分类，跨运行保留
+CACHE_PATH = "category_cache.json"
+
+# 选课返回的消息中包含以下关键字时，认为课程不在该分类
+CATEGORY_MISS_KEYWORDS = ("不在", "不存在", "未找到", "无此", "不属于")
+# 根据失败消息推测的选课分类的有效期（秒），过期后重新尝试所有分类确认；
+# 关键字无法覆盖教务系统的所有提示，推测可能有误
+OPER_CATEGORY_TTL = 120
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _load_cache():
+    """加载缓存文件，文件不存在或损坏时返回空缓存"""
+    global _cache
+    if _cache is None:
+        _cache = {"courses": {}, "jx0404ids": {}}
+        if os.path.exists(CACHE_PATH):
+            try:
+                with open(CACHE_PATH, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                _cache["courses"].update(data.get("courses", {}))
+                _cache["jx0404ids"].update(data.get("jx0404ids", {}))
+            except (OSError, ValueError) as e:
+                logging.warning(f"读取选课分类缓存失败，将重新记录: {str(e)}")
+    return _cache
+
+
+def _save_cache():
+    """将缓存写入文件，先写临时文件再替换，避免写入中断导致文件损坏"""
+    tmp_path = f"{CACHE_PATH}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_cache, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError as e:
+        logging.warning(f"保存选课分类缓存失败: {str(e)}")
+
+
+def get_course_cache_key(course):
+    """生成课程在缓存中的键，同一课程不同的上课时间分别记录"""
+    return "-".join(
+        str(course.get(key) or "")
+        for key in (
+            "course_id_or_name",
+            "teacher_name",
+            "week_day",
+            "class_period",
+            "week_type",
+        )
+    )
+
+
+def get_search_category(course):
+    """获取上次搜索到该课程的分类，未记录时返回None"""
+    with _cache_lock:
+        entry = _load_cache()["courses"].get(get_course_cache_key(course))
+    return entry.get("search") if entry else None
+
+
+def record_search_category(course, category, jx0404id):
+    """记录搜索到该课程的分类"""
+    key = get_course_cache_key(course)
+    with _cache_lock:
+        courses = _load_cache()["courses"]
+        if courses.get(key) == {"search": category, "jx0404id": jx0404id}:
+            return
+        courses[key] = {"search": category, "jx0404id": jx0404id}
+        _save_cache()
+    logging.info(f"已记录课程【{key}】的搜索分类: {category}")
+
+
+def _is_oper_entry_valid(entry):
+    """选课成功确认的分类一直有效，根据失败消息推测的分类在 OPER_CATEGORY_TTL 秒内有效"""
+    if entry.get("confirmed"):
+        return True
+    return time.time() - entry.get("time", 0) < OPER_CATEGORY_TTL
+
+
+def get_oper_category(jx0404id):
+    """获取上次接受该教学班选课请求的分类，未记录或推测的分类已过期时返回None"""
+    with _cache_lock:
+        entry = _load_cache()["jx0404ids"].get(str(jx0404id))
+    if not entry or not _is_oper_entry_valid(entry):
+        return None
+    return entry.get("oper")
+
+
+def record_oper_category(jx0404id, category, confirmed=False):
+    """
+    记录接受该教学班选课请求的分类
+
+    Args:
+        confirmed: 是否由选课成功确认，为False时是根据失败消息推测的分类，过期后需要重新确认
+    """
+    jx0404id = str(jx0404id)
+    with _cache_lock:
+        jx0404ids = _load_cache()["jx0404ids"]
+        entry = jx0404ids.get(jx0404id, {})
+        # 分类未变且仍然有效时不重复写入；推测的分类不因再次推测而延长有效期
+        if (
+            entry.get("oper") == category
+            and _is_oper_entry_valid(entry)
+            and (entry.get("confirmed") or not confirmed)
+        ):
+            return
+        if entry.get("oper") and entry.get("oper") != category:
+            logging.info(
+                f"教学班【{jx0404id}】的选课分类由 {entry['oper']} 更正为 {category}"
+            )
+        jx0404ids[jx0404id] = {
+            "oper": category,
+            "confirmed": confirmed,
+            "time": time.time(),
+        }
+        _save_cache()
+    logging.info(f"已记录教学班【{jx0404id}】的选课分类: {category}")
+
+
+def is_category_miss(message):
+    """判断选课返回的消息是否表示课程不在该分类"""
+    return any(keyword in str(message or "") for keyword in CATEGORY_MISS_KEYWORDS)
+
+
+def prefer_category(items, category):
+    """
+    将指定分类的条目移到列表最前面，其余条目保持原有顺序
+
+    Args:
+        items: 以分类名称为第一个元素的元组列表
+        category: 优先的分类，为None时原样返回
+    """
+    if not category:
+        return list(items)
+    return sorted(items, key=lambda item: item[0] != category)
@@ -0,0 +1,101 @@
+import time
+import logging
+import statistics
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# 默认采样次数，每次采样间隔 1 + 1/samples 秒
+DEFAULT_SAMPLES = 5
+
+
+@dataclass
+class ClockOffset:
+    """服务器时钟相对本地时钟的估计结果"""
+
+    offset: float  # 服务器时间 - 本地时间（秒）
+    uncertainty: float  # 估计误差上限（秒），即置信区间的半宽
+    one_way_latency: float  # 单程网络延迟估计（秒），取最小往返时间的一半
+    samples: int  # 有效采样次数
+
+
+def sample_server_date(session, url, timeout=5):
+    """
+    请求一次服务器并读取响应的 Date 头
+
+    Returns:
+        tuple: (发送时的本地时间, 收到响应时的本地时间, Date 头对应的时间戳)，
+            没有 Date 头时返回None
+    """
+    sent = time.time()
+    response = session.head(url, timeout=timeout, allow_redirects=False)
+    received = time.time()
+    date_header = response.headers.get("Date")
+    if not date_header:
+        return None
+    return sent, received, parsedate_to_datetime(date_header).timestamp()
+
+
+def estimate_clock_offset(
+    session, url, samples=DEFAULT_SAMPLES, timeout=5
+) -> Optional[ClockOffset]:
+    """
+    根据服务器 Date 头估计服务器与本地的时钟偏差
+
+    服务器在本地时间 [发送, 接收] 之间的某一时刻生成 Date 头，且 Date 头向下取整到秒，
+    因此每次采样给出偏差的一个区间 (Date - 接收, Date + 1 - 发送)。对所有采样的区间
+    求交集，取交集中点作为偏差估计，半宽作为误差上限。采样分布在秒内的不同相位，
+    交集宽度随采样次数增加逐渐收窄到往返时间量级。
+
+    Args:
+        session: 请求会话
+        url: 采样地址
+        samples: 采样次数
+        timeout: 单次请求超时时间（秒）
+
+    Returns:
+        Optional[ClockOffset]: 估计结果，所有采样都失败时返回None
+    """
+    readings = []
+    for i in range(samples):
+        if i:
+            time.sleep(1 + 1 / samples)
+        try:
+            reading = sample_server_date(session, url, timeout)
+        except Exception as e:
+            logging.warning(f"服务器时间采样失败: {str(e)}")
+            continue
+        if reading:
+            readings.append(reading)
+
+    if not readings:
+        return None
+
+    lower = max(server - received for _, received, server in readings)
+    upper = min(server + 1 - sent for sent, _, server in readings)
+    one_way_latency = min(received - sent for sent, received, _ in readings) / 2
+
+    if lower <= upper:
+        offset = (lower + upper) / 2
+        uncertainty = (upper - lower) / 2
+    else:
+        # 区间没有交集（服务器响应抖动或时钟跳变），退化为各次采样中点的中位数
+        offset = statistics.median(
+            server + 0.5 - (sent + received) / 2 for sent, received, server in readings
+        )
+        uncertainty = 0.5 + one_way_latency
+
+    return ClockOffset(offset, uncertainty, one_way_latency, len(readings))
+
+
+def calibrate_clock(session, url, samples=DEFAULT_SAMPLES) -> Optional[ClockOffset]:
+    """估计服务器时钟偏差并写入日志，失败时返回None"""
+    result = estimate_clock_offset(session, url, samples)
+    if result is None:
+        logging.warning("无法获取服务器时间，使用本地时钟触发选课")
+        return None
+    logging.info(
+        f"服务器时钟偏差: {result.offset * 1000:+.1f}毫秒（±{result.uncertainty * 1000:.1f}毫秒），"
+        f"单程延迟: {result.one_way_latency * 1000:.1f}毫秒，有效采样: {result.samples}"
+    )
+    return result
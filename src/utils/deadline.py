@@ -0,0 +1,75 @@
+import time
+import contextvars
+from contextlib import contextmanager
+
+from src.utils.metrics import increment
+
+# 未指定超时时间的请求使用的默认超时时间（秒）
+DEFAULT_REQUEST_TIMEOUT = 10
+
+# 当前上下文的截止时间（time.monotonic 时间轴），为None时不限制
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """当前上下文的时间预算已用完"""
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """
+    在当前上下文中设置时间预算，期间经过会话发出的请求超时时间不超过剩余预算
+
+    嵌套使用时取更早的截止时间；seconds 为0或None时不设置预算。
+    通过 submit_with_context 提交到线程池的任务沿用提交时的截止时间。
+    """
+    if not seconds or seconds <= 0:
+        yield None
+        return
+
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time():
+    """获取当前上下文的剩余预算（秒），没有预算时返回None"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline():
+    """预算已用完时抛出 DeadlineExceeded 并计入指标"""
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        increment("deadline_exceeded")
+        raise DeadlineExceeded("本次尝试的时间预算已用完")
+    return remaining
+
+
+def get_request_timeout(timeout=DEFAULT_REQUEST_TIMEOUT):
+    """
+    计算单次请求的超时时间，取请求自身的超时时间与剩余预算中的较小者
+
+    Args:
+        timeout: 请求自身的超时时间，可以是秒数或 (连接超时, 读取超时) 元组
+
+    Raises:
+        DeadlineExceeded: 预算已用完
+    """
+    remaining = check_deadline()
+    if remaining is None:
+        return timeout
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+    return min(timeout, remaining)
@@ -1,38 +1,20 @@
-import requests
-import json
 import time
 import hmac
 import hashlib
-import urllib
 import base64
 import urllib.parse
-import logging
+from src.utils.notify_backends import NotifierBackend, get_backend, register_backend
 
 
-# 读取config.json获取钉钉webhook和secret
-def get_dingtalk_config():
-    try:
-        with open("config.json", "r", encoding="utf-8") as f:
-            config = json.load(f)
-        webhook = config.get("dingtalk_webhook")
-        secret = config.get("dingtalk_secret")
-        if not webhook:
-            logging.info("未配置钉钉 webhook，跳过发送通知")
-            return None, None
-        return webhook, secret
-    except FileNotFoundError:
-        logging.info("未找到配置文件，跳过发送通知")
-        return None, None
+@register_backend
+class DingtalkBackend(NotifierBackend):
+    """钉钉自定义机器人，每分钟最多发送 20 条消息"""
 
+    name = "dingtalk"
+    display_name = "钉钉"
+    rate_limits = [(20, 60)]
 
-# 推送到钉钉
-def dingtalk(title, content):
-    try:
-        dingtalk_webhook, dingtalk_secret = get_dingtalk_config()
-        if not dingtalk_webhook:
-            return None
-
-        headers = {"Content-Type": "application/json"}
+    def build_request(self, title, content):
         # 美化markdown消息格式
         formatted_content = (
             f"### {title}\n\n"
@@ -55,37 +37,36 @@ def dingtalk(title, content):
             "markdown": {"title": title, "text": formatted_content},
         }
 
-        if dingtalk_secret:
+        url = self.webhook
+        if self.secret:
             timestamp = str(round(time.time() * 1000))
-            secret_enc = dingtalk_secret.encode("utf-8")
-            string_to_sign = f"{timestamp}\n{dingtalk_secret}"
-            string_to_sign_enc = string_to_sign.encode("utf-8")
-            hmac_code = hmac.new(
-                secret_enc, string_to_sign_enc, digestmod=hashlib.sha256
-            ).digest()
-            sign = urllib.parse.quote_plus(
-                base64.b64encode(hmac_code).decode("utf-8").strip()
-            )
-            dingtalk_webhook = f"{dingtalk_webhook}&timestamp={timestamp}&sign={sign}"
-
-        if not isinstance(dingtalk_webhook, str):
-            return {"error": "钉钉webhook未配置"}
-        response = requests.post(
-            dingtalk_webhook, headers=headers, data=json.dumps(payload)
-        )
+            url = f"{url}&timestamp={timestamp}&sign={sign_dingtalk(timestamp, self.secret)}"
+        return url, payload
+
+    def is_success(self, data):
+        return data.get("errcode") == 0
+
 
-        try:
-            data = response.json()
-            if response.status_code == 200 and data.get("errcode") == 0:
-                logging.info("钉钉发送通知消息成功🎉")
-            else:
-                logging.error(f"钉钉发送通知消息失败😞\n{data.get('errmsg')}")
-        except Exception as e:
-            logging.error(f"钉钉发送通知消息失败😞\n{e}")
-
-        return response.json()
-    except Exception as e:
-        logging.error(f"钉钉发送通知消息失败😞\n{e}")
+def sign_dingtalk(timestamp, secret):
+    """钉钉加签：以 secret 为密钥对 "时间戳\\nsecret" 做 HmacSHA256，Base64 后 URL 编码"""
+    string_to_sign = f"{timestamp}\n{secret}"
+    hmac_code = hmac.new(
+        secret.encode("utf-8"), string_to_sign.encode("utf-8"), digestmod=hashlib.sha256
+    ).digest()
+    return urllib.parse.quote_plus(base64.b64encode(hmac_code).decode("utf-8").strip())
+
+
+# 读取config.json获取钉钉webhook和secret
+def get_dingtalk_config():
+    backend = get_backend(DingtalkBackend.name)
+    if not backend.enabled:
+        return None, None
+    return backend.webhook, backend.secret
+
+
+# 推送到钉钉
+def dingtalk(title, content):
+    return get_backend(DingtalkBackend.name).send(title, content)
 
 
 if __name__ == "__main__":
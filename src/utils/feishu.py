@@ -2,25 +2,57 @@ import time
 import hmac
 import hashlib
 import base64
-import requests
-import json
-import logging
+from src.utils.notify_backends import NotifierBackend, get_backend, register_backend
+
+
+@register_backend
+class FeishuBackend(NotifierBackend):
+    """飞书自定义机器人，每分钟最多 100 条、每秒最多 5 条消息"""
+
+    name = "feishu"
+    display_name = "飞书"
+    rate_limits = [(100, 60), (5, 1)]
+
+    def build_request(self, title, content):
+        msg = {
+            "msg_type": "post",
+            "content": {
+                "post": {
+                    "zh_cn": {
+                        "title": title,
+                        "content": [[{"tag": "text", "text": content}]],
+                    }
+                }
+            },
+        }
+        if self.secret:
+            timestamp = str(int(time.time()))
+            msg = {
+                "timestamp": timestamp,
+                "sign": sign_feishu(timestamp, self.secret),
+                **msg,
+            }
+        return self.webhook, msg
+
+    def is_success(self, data):
+        return data.get("code", data.get("StatusCode")) == 0
+
+
+def sign_feishu(timestamp, secret):
+    """飞书签名校验：以 "时间戳\\nsecret" 为密钥对空字符串做 HmacSHA256，再 Base64"""
+    string_to_sign = f"{timestamp}\n{secret}"
+    hmac_code = hmac.new(
+        string_to_sign.encode("utf-8"), digestmod=hashlib.sha256
+    ).digest()
+    return base64.b64encode(hmac_code).decode("utf-8")
 
 
 # 读取config.json获取飞书webhook和secret
 def get_feishu_config():
-    try:
-        with open("config.json", "r", encoding="utf-8") as f:
-            config = json.load(f)
-        webhook = config.get("feishu_webhook")
-        secret = config.get("feishu_secret")
-        if not webhook:
-            logging.info("未配置飞书 webhook，跳过发送通知")
-            return None, None
-        return webhook, secret
-    except FileNotFoundError:
-        logging.info("未找到配置文件，跳过发送通知")
+    backend = get_backend(FeishuBackend.name)
+    if not backend.enabled:
         return None, None
+    return backend.webhook, backend.secret
 
 
 def feishu(title: str, content: str) -> dict:
@@ -28,50 +60,13 @@ def feishu(title: str, content: str) -> dict:
     发送飞书机器人消息
 
     Args:
-        webhook_url: 飞书机器人的webhook地址
-        secret: 安全设置中的签名校验密钥
         title: 消息标题
         content: 消息内容
 
     Returns:
         dict: 接口返回结果
     """
-    feishu_webhook, feishu_secret = get_feishu_config()
-    timestamp = str(int(time.time()))
-
-    # 计算签名
-    string_to_sign = f"{timestamp}\n{feishu_secret}"
-    hmac_code = hmac.new(
-        string_to_sign.encode("utf-8"), digestmod=hashlib.sha256
-    ).digest()
-    sign = base64.b64encode(hmac_code).decode("utf-8")
-
-    # 构建请求头
-    headers = {"Content-Type": "application/json"}
-
-    # 构建消息内容
-    msg = {
-        "timestamp": timestamp,
-        "sign": sign,
-        "msg_type": "post",
-        "content": {
-            "post": {
-                "zh_cn": {
-                    "title": title,
-                    "content": [[{"tag": "text", "text": content}]],
-                }
-            }
-        },
-    }
-
-    # 发送请求
-    try:
-        if not isinstance(feishu_webhook, str):
-            return {"error": "飞书webhook未配置"}
-        response = requests.post(feishu_webhook, headers=headers, data=json.dumps(msg))
-        return response.json()
-    except Exception as e:
-        return {"error": str(e)}
+    return get_backend(FeishuBackend.name).send(title, content)
 
 
 if __name__ == "__main__":
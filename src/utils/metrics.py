@@ -0,0 +1,36 @@
+import logging
+import threading
+from collections import Counter
+
+# 进程内的运行指标计数器，所有线程共享
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def increment(name, value=1):
+    """累加指定指标"""
+    with _counters_lock:
+        _counters[name] += value
+
+
+def get_metrics():
+    """获取所有指标的当前值"""
+    with _counters_lock:
+        return dict(_counters)
+
+
+def reset_metrics():
+    """清空所有指标"""
+    with _counters_lock:
+        _counters.clear()
+
+
+def log_metrics():
+    """将所有指标写入日志"""
+    metrics = get_metrics()
+    if not metrics:
+        return
+    logging.info(
+        "运行指标: "
+        + "，".join(f"{name} {value}" for name, value in sorted(metrics.items()))
+    )
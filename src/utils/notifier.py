@@ -0,0 +1,286 @@
+import time
+import queue
+import logging
+import itertools
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.notify_backends import NotifierBackend, get_enabled_backends
+from src.utils.metrics import increment
+
+# 选课失败消息的汇总间隔（秒），同一课程在间隔内的多次失败合并为一条
+DIGEST_INTERVAL = 60
+# 每个渠道队列中普通消息的最大数量，超出时丢弃新消息；选课成功消息不受限制
+MAX_QUEUE_SIZE = 100
+FAILURE_TITLE = "选课失败 😭 😢 😔"
+
+
+class RateLimiter:
+    """滑动窗口限流，同时满足多个时间窗口的限制"""
+
+    def __init__(self, limits: List[Tuple[int, float]]):
+        self.limits = limits
+        self._sent = deque()
+
+    def delay(self) -> float:
+        """距离下一次允许发送还需等待的秒数"""
+        now = time.monotonic()
+        longest = max((window for _, window in self.limits), default=0)
+        while self._sent and self._sent[0] <= now - longest:
+            self._sent.popleft()
+        wait = 0.0
+        for count, window in self.limits:
+            recent = [sent for sent in self._sent if sent > now - window]
+            if len(recent) >= count:
+                wait = max(wait, recent[-count] + window - now)
+        return wait
+
+    def record(self):
+        """记录一次发送"""
+        self._sent.append(time.monotonic())
+
+
+class NotificationChannel:
+    """
+    单个通知渠道的发送线程
+
+    各渠道在自己的线程中按频率限制依次发送，某个渠道限流或响应缓慢时不影响其他渠道。
+    选课成功消息优先发送且不会被丢弃，普通消息达到 max_queue_size 条时丢弃新消息。
+    """
+
+    def __init__(self, backend: NotifierBackend, max_queue_size: int = MAX_QUEUE_SIZE):
+        self.backend = backend
+        self.max_queue_size = max_queue_size
+        self.limiter = RateLimiter(backend.rate_limits)
+        # 队列元素为 (优先级, 序号, 标题, 内容)，优先级 0 为选课成功消息，1 为普通消息，
+        # 2 为停止信号，排在所有消息之后
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._normal = 0
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.dropped = 0
+        self._thread = threading.Thread(
+            target=self._run, name=f"notifier-{backend.name}", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def put(self, title, content, urgent=False) -> bool:
+        """
+        将消息放入发送队列
+
+        Returns:
+            bool: 是否放入队列
+        """
+        if not urgent:
+            with self._lock:
+                if self._normal >= self.max_queue_size:
+                    self.dropped += 1
+                    increment("notify_dropped")
+                    logging.warning(
+                        f"{self.backend.display_name}通知队列已满，丢弃消息: {title}"
+                    )
+                    return False
+                self._normal += 1
+        self._queue.put((0 if urgent else 1, next(self._sequence), title, content))
+        return True
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stop(self):
+        """发送队列中剩余的消息后停止"""
+        self._queue.put((2, next(self._sequence), None, None))
+
+    def join(self, timeout: float):
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            priority, _, title, content = self._queue.get()
+            if title is None:
+                return
+            if priority == 1:
+                with self._lock:
+                    self._normal -= 1
+            wait = self.limiter.delay()
+            if wait > 0:
+                time.sleep(wait)
+            self.limiter.record()
+            try:
+                self.backend.send(title, content)
+            except Exception as e:
+                logging.error(f"发送{self.backend.display_name}通知失败: {str(e)}")
+            with self._lock:
+                self.sent += 1
+
+
+class NotificationDispatcher:
+    """
+    后台通知发送
+
+    选课线程只把消息放入各渠道的队列，由各渠道的发送线程通过共享的HTTP客户端发送，
+    不阻塞选课请求。选课失败消息按课程合并，每 digest_interval 秒汇总发送一次，
+    课程随后选课成功时丢弃其未发送的失败消息。
+    """
+
+    def __init__(
+        self,
+        backends: List[NotifierBackend],
+        digest_interval: float = DIGEST_INTERVAL,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+    ):
+        """
+        Args:
+            backends: 启用的通知渠道
+        """
+        self.channels = [
+            NotificationChannel(backend, max_queue_size) for backend in backends
+        ]
+        self.digest_interval = digest_interval
+        self._failures: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stats = {"coalesced": 0, "digests": 0}
+        self._thread = threading.Thread(
+            target=self._run, name="notifier-digest", daemon=True
+        )
+
+    @property
+    def backend_names(self) -> List[str]:
+        return [channel.backend.name for channel in self.channels]
+
+    def start(self):
+        for channel in self.channels:
+            channel.start()
+        self._thread.start()
+
+    def notify(self, title, content) -> bool:
+        """
+        将普通消息放入各渠道的发送队列
+
+        Returns:
+            bool: 是否放入全部渠道的队列，队列中的普通消息达到上限的渠道丢弃该消息
+        """
+        results = [channel.put(title, content) for channel in self.channels]
+        return all(results)
+
+    def notify_success(self, course_key, title, content):
+        """课程选课成功，消息优先发送，并丢弃该课程尚未汇总发送的失败消息"""
+        with self._lock:
+            self._failures.pop(course_key, None)
+        for channel in self.channels:
+            channel.put(title, content, urgent=True)
+
+    def notify_failure(self, course_key, content):
+        """记录一次选课失败，与同一课程的其他失败合并后定期汇总发送"""
+        with self._lock:
+            entry = self._failures.setdefault(course_key, {"count": 0, "last": ""})
+            entry["count"] += 1
+            entry["last"] = content
+            self._stats["coalesced"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """队列长度、待汇总的课程数以及发送、丢弃、合并的消息数"""
+        with self._lock:
+            return {
+                "queue_depth": sum(channel.depth() for channel in self.channels),
+                "pending_failures": len(self._failures),
+                "sent": sum(channel.sent for channel in self.channels),
+                "dropped": sum(channel.dropped for channel in self.channels),
+                **self._stats,
+            }
+
+    def stop(self, timeout: float = 10):
+        """发送队列中剩余的消息和未汇总的失败消息后停止，最多等待 timeout 秒"""
+        deadline = time.monotonic() + timeout
+        self._stop.set()
+        self._thread.join(timeout)
+        self._flush_digest()
+        for channel in self.channels:
+            channel.stop()
+        for channel in self.channels:
+            channel.join(max(deadline - time.monotonic(), 0))
+
+    def _build_digest(self) -> Optional[str]:
+        with self._lock:
+            failures, self._failures = self._failures, {}
+        if not failures:
+            return None
+        return f"过去 {self.digest_interval:g} 秒内以下课程选课失败：\n\n" + "\n\n".join(
+            f"课程【{course_key}】失败 {entry['count']} 次，最近一次：\n{entry['last']}"
+            for course_key, entry in failures.items()
+        )
+
+    def _flush_digest(self):
+        digest = self._build_digest()
+        if digest:
+            for channel in self.channels:
+                channel.put(FAILURE_TITLE, digest, urgent=True)
+            with self._lock:
+                self._stats["digests"] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.digest_interval):
+            self._flush_digest()
+
+
+# 所有账号共享的通知线程，首次使用时创建
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """获取通知线程，首次调用时读取通知配置并启动，未配置任何渠道时消息直接丢弃"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = NotificationDispatcher(get_enabled_backends())
+            _dispatcher.start()
+        return _dispatcher
+
+
+def start_notifier():
+    """程序启动时读取通知配置并启动通知线程"""
+    dispatcher = get_dispatcher()
+    if dispatcher.channels:
+        logging.info(f"已启用通知渠道: {', '.join(dispatcher.backend_names)}")
+
+
+def notify(title, content) -> bool:
+    """发送通知，消息放入队列后立即返回"""
+    dispatcher = get_dispatcher()
+    if not dispatcher.channels:
+        return False
+    return dispatcher.notify(title, content)
+
+
+def notify_success(course_key, title, content):
+    """发送选课成功通知，优先于其他消息发送"""
+    dispatcher = get_dispatcher()
+    if dispatcher.channels:
+        dispatcher.notify_success(course_key, title, content)
+
+
+def notify_failure(course_key, content):
+    """记录选课失败，与同一课程的其他失败合并后定期汇总发送"""
+    dispatcher = get_dispatcher()
+    if dispatcher.channels:
+        dispatcher.notify_failure(course_key, content)
+
+
+def get_notifier_stats() -> Dict[str, int]:
+    """通知线程的统计信息"""
+    return get_dispatcher().stats()
+
+
+def stop_notifier(timeout: float = 10):
+    """程序退出前发送剩余的通知"""
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        dispatcher.stop(timeout)
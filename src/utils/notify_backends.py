@@ -0,0 +1,162 @@
+import abc
+import json
+import logging
+import importlib
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.metrics import increment
+
+CONFIG_PATH = "config.json"
+# 发送通知的超时时间（秒）
+NOTIFY_TIMEOUT = 5
+# 通知客户端每个主机保持的最大连接数
+NOTIFY_POOL_SIZE = 4
+# 内置通知渠道所在的模块，导入时注册到渠道表
+BUILTIN_BACKEND_MODULES = ["src.utils.dingtalk", "src.utils.feishu"]
+
+# 渠道名称 -> 渠道类
+_registry: Dict[str, type] = {}
+# 渠道名称 -> 按配置文件创建的渠道实例
+_instances: Dict[str, "NotifierBackend"] = {}
+_registry_lock = threading.Lock()
+
+# 所有通知渠道共享的HTTP客户端
+_client = None
+_client_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_notify_config(path=CONFIG_PATH) -> dict:
+    """读取配置文件中的通知配置，只在首次调用时读取"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logging.info("未找到配置文件，跳过发送通知")
+    except ValueError as e:
+        logging.error(f"配置文件格式错误，跳过发送通知: {str(e)}")
+    return {}
+
+
+def get_http_client() -> requests.Session:
+    """获取所有通知渠道共享的HTTP客户端，复用到各机器人服务器的连接"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=NOTIFY_POOL_SIZE, pool_maxsize=NOTIFY_POOL_SIZE
+            )
+            _client.mount("http://", adapter)
+            _client.mount("https://", adapter)
+            _client.headers.update({"Content-Type": "application/json"})
+        return _client
+
+
+class NotifierBackend(abc.ABC):
+    """
+    通知渠道基类
+
+    子类设置渠道名称和频率限制，实现 build_request 构建带签名的请求和 is_success
+    判断发送结果，未实现时创建渠道实例即报错；webhook 和 secret 默认从配置文件的
+    {name}_webhook 和 {name}_secret 读取
+    """
+
+    # 渠道名称，同时是配置项的前缀
+    name = ""
+    # 日志中显示的渠道名称
+    display_name = ""
+    # 频率限制：[(时间窗口内最多发送的消息数, 时间窗口秒数)]
+    rate_limits: List[Tuple[int, float]] = []
+
+    def __init__(self, webhook: Optional[str] = None, secret: Optional[str] = None):
+        config = load_notify_config()
+        self.webhook = webhook or config.get(f"{self.name}_webhook")
+        self.secret = secret or config.get(f"{self.name}_secret")
+
+    @property
+    def enabled(self) -> bool:
+        return isinstance(self.webhook, str) and bool(self.webhook)
+
+    @abc.abstractmethod
+    def build_request(self, title: str, content: str) -> Tuple[str, dict]:
+        """
+        构建发送请求
+
+        Returns:
+            tuple: (请求地址, 请求体)
+        """
+
+    @abc.abstractmethod
+    def is_success(self, data: dict) -> bool:
+        """根据接口返回结果判断是否发送成功"""
+
+    def send(self, title: str, content: str) -> Optional[dict]:
+        """
+        通过共享的HTTP客户端同步发送一条消息
+
+        Returns:
+            dict: 接口返回结果，未配置 webhook 时返回None
+        """
+        if not self.enabled:
+            logging.info(f"未配置{self.display_name} webhook，跳过发送通知")
+            return None
+        try:
+            url, payload = self.build_request(title, content)
+            response = get_http_client().post(
+                url,
+                # 以 bytes 发送使请求头和请求体合并为一次写入，避免长连接上 Nagle 算法
+                # 与延迟确认叠加导致的约 40ms 延迟
+                data=json.dumps(payload).encode("utf-8"),
+                timeout=NOTIFY_TIMEOUT,
+            )
+            data = response.json()
+        except requests.Timeout as e:
+            increment("notify_timeouts")
+            logging.error(f"{self.display_name}发送通知消息超时😞\n{e}")
+            return {"error": str(e)}
+        except Exception as e:
+            logging.error(f"{self.display_name}发送通知消息失败😞\n{e}")
+            return {"error": str(e)}
+
+        if response.status_code == 200 and self.is_success(data):
+            logging.info(f"{self.display_name}发送通知消息成功🎉")
+        else:
+            logging.error(f"{self.display_name}发送通知消息失败😞\n{data}")
+        return data
+
+
+def register_backend(cls):
+    """注册通知渠道，可用作类装饰器"""
+    with _registry_lock:
+        _registry[cls.name] = cls
+        _instances.pop(cls.name, None)
+    return cls
+
+
+def _load_builtin_backends():
+    for module in BUILTIN_BACKEND_MODULES:
+        importlib.import_module(module)
+
+
+def get_backend(name) -> NotifierBackend:
+    """获取按配置文件创建的通知渠道实例"""
+    _load_builtin_backends()
+    with _registry_lock:
+        if name not in _instances:
+            _instances[name] = _registry[name]()
+        return _instances[name]
+
+
+def get_enabled_backends() -> List[NotifierBackend]:
+    """已配置 webhook 的全部通知渠道"""
+    _load_builtin_backends()
+    with _registry_lock:
+        names = list(_registry)
+    backends = [get_backend(name) for name in names]
+    return [backend for backend in backends if backend.enabled]
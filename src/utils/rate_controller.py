@@ -0,0 +1,167 @@
+import time
+import logging
+import threading
+
+from requests.exceptions import ConnectionError, Timeout
+
+# 默认的速率下限与上限（次/秒）
+DEFAULT_RATE_FLOOR = 0.5
+DEFAULT_RATE_CEILING = 50.0
+# 响应时间超过该值（秒）视为服务器过载
+SLOW_RESPONSE_THRESHOLD = 2.0
+# 两次降速之间的最短间隔（秒），避免同一波过载响应连续多次降速
+DECREASE_COOLDOWN = 1.0
+
+
+def is_overloaded_response(status_code, content_type="", expects_json=False):
+    """
+    根据响应判断服务器是否过载
+
+    5xx、429，以及请求JSON却返回HTML页面（教务系统过载时返回的错误页）都视为过载
+    """
+    if status_code >= 500 or status_code == 429:
+        return True
+    return expects_json and "text/html" in (content_type or "")
+
+
+def is_overloaded_error(error):
+    """请求超时和连接失败视为服务器过载"""
+    return isinstance(error, (Timeout, ConnectionError, TimeoutError))
+
+
+class RateController:
+    """
+    AIMD 自适应速率控制器
+
+    正常响应时每秒速率加性增加 increase，遇到过载信号（错误响应、超时、响应过慢）时
+    速率乘以 decrease，速率始终限制在 [floor, ceiling] 之间。调用方每次发送前调用
+    acquire 取得发送时刻，多个线程共享同一个控制器时按当前速率均匀排队。
+    """
+
+    def __init__(
+        self,
+        floor=DEFAULT_RATE_FLOOR,
+        ceiling=DEFAULT_RATE_CEILING,
+        initial=None,
+        increase=1.0,
+        decrease=0.5,
+        slow_threshold=SLOW_RESPONSE_THRESHOLD,
+    ):
+        if floor <= 0 or ceiling < floor:
+            raise ValueError(f"速率范围无效: [{floor}, {ceiling}]")
+        self.floor = floor
+        self.ceiling = ceiling
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_threshold = slow_threshold
+        self._rate = self._clamp(ceiling if initial is None else initial)
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+        self._last_decrease = 0.0
+        self._successes = 0
+        self._overloads = 0
+
+    def _clamp(self, rate):
+        return min(max(rate, self.floor), self.ceiling)
+
+    @property
+    def rate(self):
+        """当前速率（次/秒）"""
+        return self._rate
+
+    def reserve(self):
+        """预约下一个发送时刻，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1 / self._rate
+            return slot - now
+
+    def acquire(self, stop_event=None):
+        """
+        等待到下一个发送时刻
+
+        Returns:
+            bool: 是否可以发送，等待期间 stop_event 被设置时返回False
+        """
+        delay = self.reserve()
+        if delay <= 0:
+            return True
+        if stop_event is None:
+            time.sleep(delay)
+            return True
+        return not stop_event.wait(delay)
+
+    def record(self, latency, overloaded=False):
+        """记录一次请求的结果，据此调整速率"""
+        overloaded = overloaded or latency > self.slow_threshold
+        with self._lock:
+            if not overloaded:
+                self._successes += 1
+                self._rate = self._clamp(self._rate + self.increase / self._rate)
+                return
+
+            self._overloads += 1
+            now = time.monotonic()
+            if now - self._last_decrease < DECREASE_COOLDOWN:
+                return
+            self._last_decrease = now
+            self._rate = self._clamp(self._rate * self.decrease)
+            # 已排队的发送时刻按新速率重新计算，避免降速后仍按旧速率发出积压的请求
+            self._next_slot = max(self._next_slot, now + 1 / self._rate)
+            rate = self._rate
+        logging.warning(f"检测到服务器过载，选课速率降至 {rate:.2f} 次/秒")
+
+    def observe(self, latency, response=None, error=None):
+        """会话层的响应观察者，根据响应或异常判断是否过载并记录"""
+        if error is not None:
+            if is_overloaded_error(error):
+                self.record(latency, True)
+            return
+        expects_json = (
+            response.request.headers.get("X-Requested-With") == "XMLHttpRequest"
+        )
+        self.record(
+            latency,
+            is_overloaded_response(
+                response.status_code,
+                response.headers.get("Content-Type", ""),
+                expects_json,
+            ),
+        )
+
+    def stats(self):
+        """获取控制器统计信息"""
+        with self._lock:
+            return {
+                "rate": self._rate,
+                "successes": self._successes,
+                "overloads": self._overloads,
+            }
+
+
+# 所有账号共享的速率控制器，为None时不限速
+_rate_controller = None
+
+
+def configure_rate_controller(floor, ceiling, initial=None):
+    """创建所有账号共享的速率控制器，并注册为会话层的响应观察者"""
+    global _rate_controller
+    from src.utils.session_manager import (
+        add_response_observer,
+        remove_response_observer,
+    )
+
+    if _rate_controller is not None:
+        remove_response_observer(_rate_controller.observe)
+    _rate_controller = RateController(floor, ceiling, initial)
+    add_response_observer(_rate_controller.observe)
+    logging.info(
+        f"选课速率范围: {floor}~{ceiling} 次/秒，初始速率: {_rate_controller.rate:.2f} 次/秒"
+    )
+    return _rate_controller
+
+
+def get_rate_controller():
+    """获取共享的速率控制器"""
+    return _rate_controller
@@ -0,0 +1,65 @@
+import os
+import json
+import time
+import logging
+import datetime
+
+# 距离触发时间小于该值（秒）后不再休眠，改为忙等待以获得毫秒级精度
+SPIN_THRESHOLD = 0.02
+# 休眠阶段每次最多休眠的时间（秒），期间定期重新计算剩余时间并回调
+TICK_INTERVAL = 1.0
+
+TRIGGER_SKEW_LOG = os.path.join("logs", "trigger_skew.jsonl")
+
+
+def wait_until(target: datetime.datetime, on_tick=None) -> float:
+    """
+    高精度等待到指定时间
+
+    先以较粗的粒度休眠，距离目标时间不足 SPIN_THRESHOLD 后改为基于
+    time.perf_counter 的忙等待，避免 time.sleep 的调度抖动。
+
+    Args:
+        target: 触发时间（本地时间）
+        on_tick: 休眠阶段每隔 TICK_INTERVAL 秒调用一次的回调，参数为剩余秒数
+
+    Returns:
+        float: 实际触发时间与目标时间的偏差（秒），正数表示晚于目标时间
+    """
+    target_ts = target.timestamp()
+    while True:
+        remaining = target_ts - time.time()
+        if remaining <= SPIN_THRESHOLD:
+            break
+        if on_tick:
+            on_tick(remaining)
+        time.sleep(min(remaining - SPIN_THRESHOLD, TICK_INTERVAL))
+
+    # 换算到 perf_counter 时间轴上忙等待，不受系统时钟调整影响
+    deadline = time.perf_counter() + (target_ts - time.time())
+    while time.perf_counter() < deadline:
+        pass
+    return time.time() - target_ts
+
+
+def record_trigger_skew(target: datetime.datetime, skew: float, offset_ms: float = 0):
+    """记录本次触发的时间偏差，追加到 logs/trigger_skew.jsonl"""
+    logging.info(
+        f"定时触发完成，目标时间: {target.strftime('%H:%M:%S.%f')[:-3]}，"
+        f"偏差: {skew * 1000:.3f}毫秒，提前/延后: {offset_ms}毫秒"
+    )
+    try:
+        os.makedirs(os.path.dirname(TRIGGER_SKEW_LOG), exist_ok=True)
+        with open(TRIGGER_SKEW_LOG, "a", encoding="utf-8") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "target": target.isoformat(),
+                        "skew_ms": round(skew * 1000, 3),
+                        "offset_ms": offset_ms,
+                    }
+                )
+                + "\n"
+            )
+    except OSError as e:
+        logging.warning(f"记录触发偏差失败: {str(e)}")
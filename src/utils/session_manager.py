@@ -1,31 +1,114 @@
 from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import Timeout
+import time
+import weakref
+import logging
 import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.deadline import (
+    DEFAULT_REQUEST_TIMEOUT,
+    DeadlineExceeded,
+    get_request_timeout,
+    remaining_time,
+)
+from src.utils.metrics import increment
+
+# 会话默认请求头
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36 Edg/132.0.0.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Connection": "keep-alive",
+}
 
 # 全局session变量
 _session = None
 _session_lock = threading.Lock()
 
+# 当前上下文绑定的session，多账号模式下每个账号在各自的上下文中使用独立的session
+_current_session = contextvars.ContextVar("current_session", default=None)
+
+# 所有session共享的在途请求数上限，为None时不限制
+_inflight_semaphore = None
+
+# 新建session的连接池大小：pool_connections 为缓存的主机连接池个数，
+# pool_maxsize 为每个主机保持的最大连接数，并发请求数超过该值时多出的连接用完即关闭
+_pool_settings = {"pool_connections": 10, "pool_maxsize": 10}
+
+# 每个会话已进入的选课页面，会话被回收后自动清除
+_entered_pages = weakref.WeakKeyDictionary()
+_entered_pages_lock = threading.Lock()
+
+# 响应观察者，每次请求结束后以 (耗时, 响应, 异常) 调用，用于自适应速率控制等
+_response_observers = []
+
+
+class LimitedSession(Session):
+    """
+    受全局在途请求数上限约束的会话
+
+    未指定超时时间的请求使用 DEFAULT_REQUEST_TIMEOUT，且超时时间不超过当前上下文的剩余预算，
+    请求超时计入 request_timeouts 指标
+    """
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs["timeout"] = get_request_timeout(
+            kwargs.get("timeout", DEFAULT_REQUEST_TIMEOUT)
+        )
+        semaphore = _inflight_semaphore
+        if semaphore is not None and not semaphore.acquire(timeout=remaining_time()):
+            increment("deadline_exceeded")
+            raise DeadlineExceeded("等待在途请求名额时时间预算已用完")
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception as e:
+            if isinstance(e, Timeout):
+                increment("request_timeouts")
+            _notify_observers(time.perf_counter() - start, None, e)
+            raise
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+        _notify_observers(time.perf_counter() - start, response, None)
+        return response
+
+
+def _notify_observers(latency, response, error):
+    for observer in list(_response_observers):
+        try:
+            observer(latency, response, error)
+        except Exception as e:
+            logging.warning(f"响应观察者执行失败: {str(e)}")
+
+
+def create_session():
+    """创建一个新的会话，拥有独立的cookie"""
+    session = LimitedSession()
+    adapter = HTTPAdapter(**_pool_settings)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
 
 def init_session():
     """初始化全局会话"""
     global _session
     with _session_lock:
         if _session is None:
-            _session = Session()
-            _session.headers.update(
-                {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36 Edg/132.0.0.0",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-                    "Connection": "keep-alive",
-                }
-            )
+            _session = create_session()
         return _session
 
 
 def get_session():
-    """获取当前会话，如果不存在则初始化"""
-    global _session
+    """获取当前会话，优先返回当前上下文绑定的会话，否则返回全局会话"""
+    session = _current_session.get()
+    if session is not None:
+        return session
     if _session is None:
         return init_session()
     return _session
@@ -38,3 +121,119 @@ def reset_session():
         if _session is not None:
             _session.close()
         _session = None
+
+
+@contextmanager
+def use_session(session):
+    """在当前上下文中绑定会话，期间 get_session 返回该会话"""
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
+
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """向线程池提交任务，任务在提交时的上下文中执行，从而沿用当前绑定的会话"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def set_max_inflight_requests(limit):
+    """设置所有会话共享的在途请求数上限，为0时不限制"""
+    global _inflight_semaphore
+    _inflight_semaphore = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+
+def merge_inflight_limits(limits) -> int:
+    """多个账号的在途请求数上限取最严格的一个，均为0（不限制）时返回0"""
+    limits = [limit for limit in limits if limit > 0]
+    return min(limits) if limits else 0
+
+
+def is_page_entered(session, page):
+    """会话是否已进入过指定页面"""
+    with _entered_pages_lock:
+        return page in _entered_pages.get(session, ())
+
+
+def mark_page_entered(session, page):
+    """记录会话已进入指定页面，同一次登录内不再重复访问"""
+    with _entered_pages_lock:
+        _entered_pages.setdefault(session, set()).add(page)
+
+
+def invalidate_entered_pages(session):
+    """清除会话已进入页面的记录，服务器丢失选课上下文（如重新登录、会话过期）时调用"""
+    with _entered_pages_lock:
+        _entered_pages.pop(session, None)
+
+
+def add_response_observer(observer):
+    """注册响应观察者，所有会话的请求结束后都会调用"""
+    _response_observers.append(observer)
+
+
+def remove_response_observer(observer):
+    """移除响应观察者"""
+    if observer in _response_observers:
+        _response_observers.remove(observer)
+
+
+def configure_connection_pool(pool_connections=10, pool_maxsize=10):
+    """设置之后新建会话的连接池大小"""
+    _pool_settings["pool_connections"] = pool_connections
+    _pool_settings["pool_maxsize"] = pool_maxsize
+
+
+def prewarm_connections(session, url, count, timeout=5):
+    """
+    并发请求指定地址，预先建立 count 个保持连接，后续请求直接复用，省去TCP握手
+
+    count 不应超过 pool_maxsize，否则多出的连接在请求结束后会被关闭；count 不大于0时不预热
+
+    Returns:
+        int: 成功建立的连接数
+    """
+    if count <= 0:
+        return 0
+
+    def open_connection(_):
+        try:
+            session.head(url, timeout=timeout, allow_redirects=False)
+            return True
+        except Exception as e:
+            logging.warning(f"预热连接失败: {str(e)}")
+            return False
+
+    with ThreadPoolExecutor(
+        max_workers=count, thread_name_prefix="prewarm"
+    ) as executor:
+        opened = sum(executor.map(open_connection, range(count)))
+    logging.info(f"已预先建立 {opened}/{count} 个到 {url} 的保持连接")
+    return opened
+
+
+def get_connection_stats(session):
+    """
+    统计会话的连接复用情况
+
+    Returns:
+        dict: requests 为发出的请求数，connections 为新建的连接数，
+            reused 为复用已有连接的请求数
+    """
+    requests_count = connections = 0
+    for adapter in set(session.adapters.values()):
+        pools = getattr(adapter, "poolmanager", None)
+        if pools is None:
+            continue
+        for key in pools.pools.keys():
+            pool = pools.pools.get(key)
+            if pool is None:
+                continue
+            requests_count += pool.num_requests
+            connections += pool.num_connections
+    return {
+        "requests": requests_count,
+        "connections": connections,
+        "reused": max(requests_count - connections, 0),
+    }
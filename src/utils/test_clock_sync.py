@@ -0,0 +1,58 @@
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests import Session
+from src.utils.clock_sync import estimate_clock_offset
+
+
+def start_stub_server(skew, delay=0.0):
+    """
+    启动本地测试服务器，返回的 Date 头比本地时钟快 skew 秒，每次响应前等待 delay 秒
+
+    Returns:
+        tuple: (服务器对象, 服务器地址)
+    """
+
+    class SkewedDateHandler(BaseHTTPRequestHandler):
+        def date_time_string(self, timestamp=None):
+            return super().date_time_string(time.time() + skew)
+
+        def do_HEAD(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SkewedDateHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+if __name__ == "__main__":
+    # 测试数据集：服务器时钟偏差（秒）和响应延迟（秒）
+    test_cases = [
+        {"name": "测试1：服务器时钟快3.25秒", "skew": 3.25, "delay": 0.0},
+        {"name": "测试2：服务器时钟慢1.6秒", "skew": -1.6, "delay": 0.0},
+        {"name": "测试3：服务器时钟一致，响应延迟50毫秒", "skew": 0.0, "delay": 0.05},
+    ]
+
+    print("开始测试...\n")
+    session = Session()
+    for test_case in test_cases:
+        print(f"执行: {test_case['name']}")
+        server, url = start_stub_server(test_case["skew"], test_case["delay"])
+        try:
+            result = estimate_clock_offset(session, url, samples=5)
+        finally:
+            server.shutdown()
+
+        print(f"预期偏差: {test_case['skew'] * 1000:.1f}毫秒")
+        print(
+            f"估计偏差: {result.offset * 1000:.1f}毫秒（±{result.uncertainty * 1000:.1f}毫秒）"
+        )
+        print(f"单程延迟: {result.one_way_latency * 1000:.1f}毫秒")
+        error = abs(result.offset - test_case["skew"])
+        print(f"测试结果: {'通过' if error <= result.uncertainty + 0.01 else '失败'}")
+        print("-" * 50 + "\n")
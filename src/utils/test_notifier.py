@@ -0,0 +1,99 @@
+import time
+import urllib.parse
+from src.utils.dingtalk import DingtalkBackend, sign_dingtalk
+from src.utils.feishu import FeishuBackend, sign_feishu
+from src.utils.notifier import FAILURE_TITLE, NotificationDispatcher
+from src.utils.webhook_stub import WebhookStub
+
+
+def check_dingtalk(stub):
+    """钉钉：签名参数附加在地址上，内容为 markdown"""
+    backend = DingtalkBackend(stub.url("dingtalk?access_token=test"), "SECtest")
+    data = backend.send("选课成功", "课程【测试】选课成功")
+    request = stub.requests[-1]
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(request["path"]).query)
+    expected_sign = urllib.parse.unquote_plus(
+        sign_dingtalk(query["timestamp"][0], "SECtest")
+    )
+    return (
+        data == {"errcode": 0, "errmsg": "ok"}
+        and query["sign"][0] == expected_sign
+        and request["body"]["msgtype"] == "markdown"
+        and "<font color='green'>成功</font>" in request["body"]["markdown"]["text"]
+    )
+
+
+def check_feishu(stub):
+    """飞书：签名和时间戳放在请求体中"""
+    backend = FeishuBackend(stub.url("feishu/hook/test"), "test")
+    data = backend.send("测试", "测试内容")
+    body = stub.requests[-1]["body"]
+    return (
+        data.get("code") == 0
+        and body["sign"] == sign_feishu(body["timestamp"], "test")
+        and body["content"]["post"]["zh_cn"]["title"] == "测试"
+    )
+
+
+def check_dispatcher(stub):
+    """后台发送：各渠道都收到消息，失败消息合并，选课成功后丢弃该课程的失败消息"""
+    dispatcher = NotificationDispatcher(
+        [
+            DingtalkBackend(stub.url("dingtalk?access_token=test")),
+            FeishuBackend(stub.url("feishu/hook/test")),
+        ],
+        digest_interval=0.2,
+    )
+    dispatcher.start()
+    for _ in range(3):
+        dispatcher.notify_failure("课程A", "课程A选课失败")
+        dispatcher.notify_failure("课程B", "课程B选课失败")
+    dispatcher.notify_success("课程B", "选课成功", "课程B选课成功")
+    dispatcher.notify("测试", "普通消息")
+    time.sleep(0.5)
+    dispatcher.stop()
+
+    titles = {}
+    for request in stub.requests:
+        name = request["path"].lstrip("/").split("/")[0].split("?")[0]
+        body = request["body"]
+        title = (
+            body["markdown"]["title"]
+            if name == "dingtalk"
+            else body["content"]["post"]["zh_cn"]["title"]
+        )
+        titles.setdefault(name, []).append(title)
+    digests = [
+        request["body"]
+        for request in stub.requests
+        if "课程【课程A】" in str(request["body"])
+    ]
+    stats = dispatcher.stats()
+    return (
+        all(
+            titles.get(name) == ["选课成功", "测试", FAILURE_TITLE]
+            for name in ("dingtalk", "feishu")
+        )
+        and len(digests) == 2
+        and all("3 次" in str(digest) for digest in digests)
+        and not any("课程【课程B】" in str(digest) for digest in digests)
+        and stats["sent"] == 6
+        and stats["digests"] == 1
+    )
+
+
+if __name__ == "__main__":
+    test_cases = [
+        {"name": "测试1：钉钉签名和消息格式", "check": check_dingtalk},
+        {"name": "测试2：飞书签名和消息格式", "check": check_feishu},
+        {"name": "测试3：后台发送和失败消息合并", "check": check_dispatcher},
+    ]
+
+    print("开始测试...\n")
+    for test_case in test_cases:
+        print(f"执行: {test_case['name']}")
+        with WebhookStub() as stub:
+            passed = test_case["check"](stub)
+            print(f"收到请求: {len(stub.requests)} 个，新建连接: {stub.connections} 个")
+        print(f"测试结果: {'通过' if passed else '失败'}")
+        print("-" * 50 + "\n")
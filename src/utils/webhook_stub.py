@@ -0,0 +1,186 @@
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# 按请求路径的第一段返回对应机器人接口的成功响应
+STUB_RESPONSES = {
+    "dingtalk": {"errcode": 0, "errmsg": "ok"},
+    "feishu": {"code": 0, "msg": "success", "data": {}},
+}
+
+
+class WebhookStub:
+    """
+    本地模拟的机器人 webhook 服务器
+
+    记录收到的每个请求并返回机器人接口的成功响应，用于在没有网络时测试通知渠道、
+    压测通知发送的吞吐量和延迟。支持 HTTP/1.1 长连接，可以体现连接复用的效果。
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口，为0时自动分配
+            delay: 每次响应前等待的秒数，模拟网络和服务器延迟
+        """
+        self.delay = delay
+        self.requests = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    def _handler_class(self):
+        stub = self
+
+        class WebhookHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    payload = None
+                with stub._lock:
+                    stub.requests.append(
+                        {"path": self.path, "body": payload, "time": time.time()}
+                    )
+                if stub.delay:
+                    time.sleep(stub.delay)
+
+                name = self.path.lstrip("/").split("/")[0].split("?")[0]
+                data = json.dumps(
+                    STUB_RESPONSES.get(name, {"errcode": 0, "code": 0})
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return WebhookHandler
+
+    def url(self, path=""):
+        """模拟服务器上某个路径的地址，如 url("dingtalk?access_token=test")"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/{path}"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="webhook-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+def benchmark(backend, count, post=None):
+    """
+    同步发送 count 条消息，统计吞吐量和单条延迟
+
+    Args:
+        backend: 通知渠道实例
+        post: 发送请求的函数，为None时使用渠道的 send（共享的HTTP客户端）
+
+    Returns:
+        dict: 吞吐量（条/秒）和延迟的 p50、p95、最大值（毫秒）
+    """
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        sent_at = time.perf_counter()
+        if post is None:
+            backend.send(f"压测消息 {i}", "压测内容")
+        else:
+            url, payload = backend.build_request(f"压测消息 {i}", "压测内容")
+            post(url, payload).json()
+        latencies.append(time.perf_counter() - sent_at)
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput": count / elapsed,
+        "p50": _percentile(latencies, 50) * 1000,
+        "p95": _percentile(latencies, 95) * 1000,
+        "max": max(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="启动本地模拟 webhook 服务器并压测通知发送的吞吐量和延迟"
+    )
+    parser.add_argument("-n", "--count", type=int, default=200, help="每项发送的消息数")
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="模拟服务器每次响应的延迟（秒）"
+    )
+    args = parser.parse_args()
+
+    from src.utils.dingtalk import DingtalkBackend
+    from src.utils.feishu import FeishuBackend
+
+    with WebhookStub(delay=args.delay) as stub:
+        backends = [
+            DingtalkBackend(stub.url("dingtalk?access_token=test"), "SECtest"),
+            FeishuBackend(stub.url("feishu/hook/test"), "test"),
+        ]
+
+        def post_without_pool(url, payload):
+            return requests.post(
+                url,
+                data=json.dumps(payload).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                timeout=5,
+            )
+
+        print(f"模拟服务器: {stub.url()}，每项发送 {args.count} 条消息\n")
+        for backend in backends:
+            for label, post in [
+                ("共享连接池", None),
+                ("每次新建连接", post_without_pool),
+            ]:
+                connections = stub.connections
+                result = benchmark(backend, args.count, post)
+                print(
+                    f"{backend.display_name}（{label}）: {result['throughput']:.0f} 条/秒，"
+                    f"延迟 p50 {result['p50']:.2f}ms，p95 {result['p95']:.2f}ms，"
+                    f"最大 {result['max']:.2f}ms，新建连接 {stub.connections - connections} 个"
+                )
+        print(f"\n模拟服务器共收到 {len(stub.requests)} 个请求")
+
+
+if __name__ == "__main__":
+    # 压测时不输出每条消息的发送日志
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    main()
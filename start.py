@@ -1,10 +1,15 @@
 import json
 import os
-import time
-import subprocess
 from datetime import datetime, timedelta
 
+# 在倒计时开始前导入选课模块，提前完成依赖导入，到点后无需冷启动
+import main as selector
+from src.utils.captcha_ocr import start_ocr_service
+from src.utils.scheduler import wait_until
+
 CONFIG_PATH = "config.json"
+# 默认提前多少分钟启动预热阶段（登录、获取选课编号和课程编号）
+DEFAULT_WARMUP_MINUTES = 2
 
 def create_default_config():
     """创建符合严格JSON格式的默认配置文件"""
@@ -14,6 +19,7 @@ def create_default_config():
         "user_password": "",
         "select_semester": "",
         "mode": "fast",
+        "warmup_minutes": DEFAULT_WARMUP_MINUTES,
         "courses": [
             {"course_id_or_name": "", "teacher_name": ""},
             {"course_id_or_name": "", "teacher_name": ""},
@@ -36,8 +42,10 @@ def load_config():
         raise ValueError(f"JSON格式错误，请检查 {CONFIG_PATH} 文件（错误详情：{str(e)}）")
 
 def validate_required_fields(config: dict):
-    """验证必填字段"""
-    required = ["schedule_time", "user_account", "user_password"]
+    """验证必填字段，多账号模式下账号密码在 accounts 中填写"""
+    required = ["schedule_time"]
+    if not config.get("accounts"):
+        required += ["user_account", "user_password"]
     missing = [field for field in required if not config.get(field)]
     if missing:
         raise ValueError(f"缺少必填字段: {', '.join(missing)}")
@@ -54,21 +62,25 @@ def parse_schedule_time(time_str: str) -> datetime:
         raise ValueError("设定时间已过期，请修改为未来的时间")
     return target_datetime
 
-def show_countdown(target: datetime):
-    """动态显示倒计时"""
-    try:
-        while True:
-            remaining = target - datetime.now()
-            if remaining.total_seconds() <= 0:
-                print("\n时间到！执行 main.py...")
-                subprocess.run(["python", "main.py"], check=True)
-                break
+def get_warmup_time(target: datetime, warmup_minutes: float) -> datetime:
+    """计算预热阶段开始时间，距选课时间不足预热时长时立即开始"""
+    return max(target - timedelta(minutes=warmup_minutes), datetime.now())
 
-            hours, rem = divmod(int(remaining.total_seconds()), 3600)
-            mins, secs = divmod(rem, 60)
-            countdown = f"{hours:02}:{mins:02}:{secs:02}"
-            print(f"\r倒计时: {countdown}", end="", flush=True)
-            time.sleep(1)
+def print_countdown(remaining_seconds: float):
+    """显示倒计时"""
+    hours, rem = divmod(int(remaining_seconds), 3600)
+    mins, secs = divmod(rem, 60)
+    countdown = f"{hours:02}:{mins:02}:{secs:02}"
+    print(f"\r倒计时: {countdown}", end="", flush=True)
+
+def show_countdown(warmup: datetime, target: datetime, user_configs):
+    """动态显示倒计时，到达预热时间后在当前进程内开始预热，并在选课时间准时发送选课请求"""
+    try:
+        # 倒计时期间在后台加载验证码识别模型，预热阶段登录时模型已加载完成
+        start_ocr_service()
+        wait_until(warmup, on_tick=print_countdown)
+        print("\n开始预热！")
+        selector.run_accounts(user_configs, target)
     except KeyboardInterrupt:
         print("\n用户手动中断")
 
@@ -77,8 +89,13 @@ def main():
         config = load_config()
         validate_required_fields(config)
         target_time = parse_schedule_time(config["schedule_time"])
+        user_configs = selector.load_configs()
+        warmup_time = get_warmup_time(
+            target_time, float(config.get("warmup_minutes", DEFAULT_WARMUP_MINUTES))
+        )
         print(f"任务计划执行时间: {target_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        show_countdown(target_time)
+        print(f"预热开始时间: {warmup_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        show_countdown(warmup_time, target_time, user_configs)
     except Exception as e:
         print(f"\n错误: {str(e)}")
         if isinstance(e, FileNotFoundError):